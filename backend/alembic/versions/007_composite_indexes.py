@@ -0,0 +1,91 @@
+"""composite indexes for hot query shapes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, kwargs)
+COMPOSITE_INDEXES = [
+    ('ix_chapters_author_id_published_at', 'chapters', ['author_id', sa.text('published_at DESC')], {}),
+    ('ix_notifications_user_id_read_created_at', 'notifications', ['user_id', 'read', sa.text('created_at DESC')], {}),
+    ('ix_btl_messages_thread_id_created_at', 'btl_messages', ['thread_id', 'created_at'], {}),
+    ('ix_margins_chapter_id_created_at', 'margins', ['chapter_id', 'created_at'], {}),
+    ('ix_btl_invites_sender_recipient_status', 'btl_invites', ['sender_id', 'recipient_id', 'status'], {}),
+    # create_invite checks for a pending invite before inserting
+    ('uq_btl_invites_pending_pair', 'btl_invites', ['sender_id', 'recipient_id'], {
+        'unique': True,
+        'postgresql_where': sa.text("status = 'PENDING'"),
+    }),
+]
+
+# Single-column indexes that are a leading prefix of a composite index or
+# unique constraint (uq_heart_user_chapter, uq_follow_relationship, ...)
+REDUNDANT_INDEXES = [
+    ('ix_chapters_author_id', 'chapters', ['author_id']),
+    ('ix_notifications_user_id', 'notifications', ['user_id']),
+    ('ix_notifications_read', 'notifications', ['read']),
+    ('ix_btl_messages_thread_id', 'btl_messages', ['thread_id']),
+    ('ix_margins_chapter_id', 'margins', ['chapter_id']),
+    ('ix_btl_invites_sender_id', 'btl_invites', ['sender_id']),
+    ('ix_hearts_user_id', 'hearts', ['user_id']),
+    ('ix_follows_follower_id', 'follows', ['follower_id']),
+    ('ix_bookmarks_user_id', 'bookmarks', ['user_id']),
+    ('ix_shelves_user_id', 'shelves', ['user_id']),
+    ('ix_blocks_blocker_id', 'blocks', ['blocker_id']),
+]
+
+
+def upgrade() -> None:
+    # uq_btl_invites_pending_pair cannot be built over duplicate pending
+    # invites; keep the first one of each pair (the one create_invite found)
+    op.execute("""
+        DELETE FROM btl_invites i
+        USING btl_invites first
+        WHERE i.status = 'PENDING' AND first.status = 'PENDING'
+          AND first.sender_id = i.sender_id AND first.recipient_id = i.recipient_id
+          AND first.id < i.id
+    """)
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        # A failed concurrent build (e.g. a duplicate pending invite) leaves
+        # an INVALID index that if_not_exists would skip; drop it to rebuild
+        if not op.get_context().as_sql:
+            invalid = op.get_bind().execute(sa.text("""
+                SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = ANY(:names) AND NOT i.indisvalid
+            """), {"names": [name for name, _, _, _ in COMPOSITE_INDEXES]}).scalars().all()
+            for name in invalid:
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+        for name, table, columns, kwargs in COMPOSITE_INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs
+            )
+
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+        for name, table, _, _ in reversed(COMPOSITE_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
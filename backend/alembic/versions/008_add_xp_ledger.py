@@ -0,0 +1,47 @@
+"""add xp ledger
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'xp_events',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('xp', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('applied_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_xp_events_user_id_id', 'xp_events', ['user_id', 'id'])
+    op.create_index(
+        'ix_xp_events_unapplied', 'xp_events', ['id'],
+        postgresql_where=sa.text('applied_at IS NULL')
+    )
+    
+    # Carry existing XP into the ledger so replays reproduce current totals
+    op.execute("""
+        INSERT INTO xp_events (user_id, action, xp, created_at, applied_at)
+        SELECT id, 'baseline', muse_xp, now(), now() FROM users WHERE muse_xp <> 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_xp_events_unapplied', 'xp_events')
+    op.drop_index('ix_xp_events_user_id_id', 'xp_events')
+    op.drop_table('xp_events')
@@ -0,0 +1,37 @@
+"""lazy open pages accrual
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # last_open_page_grant is now the accrual anchor: pages accrue one per
+    # day from it. Start every below-cap balance accruing from today.
+    op.execute("""
+        UPDATE users SET last_open_page_grant = now()
+        WHERE open_pages < 3 OR last_open_page_grant IS NULL
+    """)
+
+
+def downgrade() -> None:
+    # Materialize accrued pages so the stored balance is correct again
+    op.execute("""
+        UPDATE users SET open_pages = LEAST(
+            3,
+            open_pages + GREATEST(
+                floor(extract(epoch FROM now() - COALESCE(last_open_page_grant, now())) / 86400), 0
+            )::int
+        )
+    """)
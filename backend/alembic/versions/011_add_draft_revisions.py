@@ -0,0 +1,37 @@
+"""add draft revision history
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing drafts get no backfill: their next save is stored as a full
+    # snapshot (record_revision snapshots whenever the chain is missing).
+    op.create_table(
+        'draft_revisions',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('draft_id', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('is_snapshot', sa.Boolean(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['draft_id'], ['drafts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('draft_id', 'revision', name='uq_draft_revision')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('draft_revisions')
@@ -0,0 +1,41 @@
+"""add denormalized book stats
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('books', sa.Column('chapter_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('last_chapter_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('books', sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('shelf_count', sa.Integer(), server_default='0', nullable=False))
+    
+    op.execute("""
+        UPDATE books AS b SET
+            chapter_count = (SELECT COUNT(*) FROM chapters c WHERE c.author_id = b.user_id),
+            last_chapter_at = (SELECT MAX(published_at) FROM chapters c WHERE c.author_id = b.user_id),
+            follower_count = (SELECT COUNT(*) FROM follows f WHERE f.followed_id = b.user_id),
+            following_count = (SELECT COUNT(*) FROM follows f WHERE f.follower_id = b.user_id),
+            shelf_count = (SELECT COUNT(*) FROM shelves s WHERE s.book_owner_id = b.user_id)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('books', 'shelf_count')
+    op.drop_column('books', 'following_count')
+    op.drop_column('books', 'follower_count')
+    op.drop_column('books', 'last_chapter_at')
+    op.drop_column('books', 'chapter_count')
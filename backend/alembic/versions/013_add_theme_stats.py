@@ -0,0 +1,47 @@
+"""add maintained theme stats
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('themes', sa.Column('chapter_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('themes', sa.Column('recent_chapter_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('themes', sa.Column('recent_since', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.add_column('themes', sa.Column('last_chapter_at', sa.DateTime(timezone=True), nullable=True))
+    
+    op.execute("UPDATE themes SET recent_since = now() - interval '7 days'")
+    op.execute("""
+        UPDATE themes AS t SET
+            chapter_count = s.chapter_count,
+            recent_chapter_count = s.recent_chapter_count,
+            last_chapter_at = s.last_chapter_at
+        FROM (
+            SELECT ct.theme_id,
+                COUNT(*) AS chapter_count,
+                COUNT(*) FILTER (WHERE c.published_at >= now() - interval '7 days') AS recent_chapter_count,
+                MAX(c.published_at) AS last_chapter_at
+            FROM chapter_themes ct JOIN chapters c ON c.id = ct.chapter_id
+            GROUP BY ct.theme_id
+        ) AS s
+        WHERE t.id = s.theme_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('themes', 'last_chapter_at')
+    op.drop_column('themes', 'recent_since')
+    op.drop_column('themes', 'recent_chapter_count')
+    op.drop_column('themes', 'chapter_count')
@@ -0,0 +1,34 @@
+"""add publish-time derived chapter fields
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+Existing chapters are filled by scripts/backfill_chapter_derived.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('chapters', sa.Column('excerpt', sa.Text(), nullable=True))
+    op.add_column('chapters', sa.Column('word_count', sa.Integer(), nullable=True))
+    op.add_column('chapters', sa.Column('reading_time_minutes', sa.Integer(), nullable=True))
+    op.add_column('chapters', sa.Column('block_summary', sa.JSON(), nullable=True))
+    op.add_column('chapters', sa.Column('first_image_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chapters', 'first_image_url')
+    op.drop_column('chapters', 'block_summary')
+    op.drop_column('chapters', 'reading_time_minutes')
+    op.drop_column('chapters', 'word_count')
+    op.drop_column('chapters', 'excerpt')
@@ -0,0 +1,42 @@
+"""add chapters.blocks_snapshot
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('chapters', sa.Column('blocks_snapshot', postgresql.JSONB(), nullable=True))
+    
+    # Same shape as app.services.chapter_derived.blocks_snapshot
+    op.execute("""
+        UPDATE chapters AS c SET blocks_snapshot = s.blocks
+        FROM (
+            SELECT chapter_id, jsonb_agg(jsonb_build_object(
+                'id', id,
+                'position', position,
+                'block_type', lower(block_type::text),
+                'content', content::jsonb,
+                'created_at', created_at
+            ) ORDER BY position) AS blocks
+            FROM chapter_blocks
+            GROUP BY chapter_id
+        ) AS s
+        WHERE c.id = s.chapter_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('chapters', 'blocks_snapshot')
@@ -0,0 +1,72 @@
+"""JSONB block content with structured-query indexes
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+The type change rewrites chapter_blocks and draft_blocks under an
+exclusive lock; schedule it for a quiet window on large databases.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+
+# (name, columns, kwargs) on chapter_blocks; see app.chapters.queries
+CONTENT_INDEXES = [
+    ('ix_chapter_blocks_content_path', ['content'], {
+        'postgresql_using': 'gin',
+        'postgresql_ops': {'content': 'jsonb_path_ops'},
+    }),
+    ('ix_chapter_blocks_media_duration', [sa.text("((content->>'duration')::float)")], {
+        'postgresql_where': sa.text("block_type IN ('AUDIO', 'VIDEO')"),
+    }),
+    ('ix_chapter_blocks_text_search', [sa.text("to_tsvector('english', content->>'text')")], {
+        'postgresql_using': 'gin',
+        'postgresql_where': sa.text("block_type IN ('TEXT', 'QUOTE')"),
+    }),
+]
+
+
+def upgrade() -> None:
+    for table in ('chapter_blocks', 'draft_blocks'):
+        op.alter_column(
+            table, 'content',
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using='content::jsonb'
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in CONTENT_INDEXES:
+            op.create_index(
+                name, 'chapter_blocks', columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(CONTENT_INDEXES):
+            op.drop_index(name, table_name='chapter_blocks', postgresql_concurrently=True, if_exists=True)
+
+    for table in ('draft_blocks', 'chapter_blocks'):
+        op.alter_column(
+            table, 'content',
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using='content::json'
+        )
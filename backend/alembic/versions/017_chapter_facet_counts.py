@@ -0,0 +1,61 @@
+"""add chapter_facet_counts and browse indexes
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+# Result pages for a mood or time period filter, newest first
+BROWSE_INDEXES = [
+    ('ix_chapters_mood_published_at', ['mood', sa.text('published_at DESC')]),
+    ('ix_chapters_time_period_published_at', ['time_period', sa.text('published_at DESC')]),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'chapter_facet_counts',
+        sa.Column('theme_id', sa.Integer(), nullable=False),
+        sa.Column('mood', sa.String(), nullable=False),
+        sa.Column('time_period', sa.String(), nullable=False),
+        sa.Column('chapter_count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('theme_id', 'mood', 'time_period')
+    )
+    op.create_index('ix_chapter_facet_counts_mood_time_period', 'chapter_facet_counts', ['mood', 'time_period'])
+    
+    # Same counts as app.services.facet_counts.repair_facet_counts
+    op.execute("""
+        INSERT INTO chapter_facet_counts (theme_id, mood, time_period, chapter_count)
+        SELECT 0, COALESCE(mood, ''), COALESCE(time_period, ''), COUNT(*)
+        FROM chapters
+        GROUP BY 2, 3
+        UNION ALL
+        SELECT ct.theme_id, COALESCE(c.mood, ''), COALESCE(c.time_period, ''), COUNT(*)
+        FROM chapter_themes ct JOIN chapters c ON c.id = ct.chapter_id
+        GROUP BY 1, 2, 3
+    """)
+    
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in BROWSE_INDEXES:
+            op.create_index(name, 'chapters', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(BROWSE_INDEXES):
+            op.drop_index(name, table_name='chapters', postgresql_concurrently=True, if_exists=True)
+    
+    op.drop_index('ix_chapter_facet_counts_mood_time_period', table_name='chapter_facet_counts')
+    op.drop_table('chapter_facet_counts')
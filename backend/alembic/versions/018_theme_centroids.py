@@ -0,0 +1,45 @@
+"""add theme_centroids
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19
+
+Centroids start from tagged chapters' embeddings; description seeds are
+added by scripts/seed_theme_centroids.py (needs the OpenAI API).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'theme_centroids',
+        sa.Column('theme_id', sa.Integer(), nullable=False),
+        sa.Column('seed', Vector(1536), nullable=True),
+        sa.Column('centroid', Vector(1536), nullable=False),
+        sa.Column('chapter_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['theme_id'], ['themes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('theme_id')
+    )
+    
+    # Same as app.muse.theme_centroids.refresh_theme_centroids without seeds
+    op.execute("""
+        INSERT INTO theme_centroids (theme_id, centroid, chapter_count)
+        SELECT ct.theme_id, AVG(ce.embedding), COUNT(*)
+        FROM chapter_themes ct JOIN chapter_embeddings ce ON ce.chapter_id = ct.chapter_id
+        GROUP BY ct.theme_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('theme_centroids')
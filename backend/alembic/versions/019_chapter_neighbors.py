@@ -0,0 +1,37 @@
+"""add chapter_neighbors
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19
+
+Empty at first; fill it with the build_chapter_graph job
+(python scripts/run_job.py build_chapter_graph). Until then
+/chapters/{id}/related returns no chapters.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'chapter_neighbors',
+        sa.Column('chapter_id', sa.Integer(), nullable=False),
+        sa.Column('neighbor_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('scores', postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['chapter_id'], ['chapters.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('chapter_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('chapter_neighbors')
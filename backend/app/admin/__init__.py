@@ -0,0 +1 @@
+"""Admin module - operator diagnostics"""
@@ -0,0 +1,114 @@
+"""Admin routes - Operator diagnostics"""
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import User
+from app.auth.security import get_admin_user
+from app.slow_queries import get_slow_queries, clear_slow_queries
+from app.services.muse_progression import get_xp_history, replay_xp
+from app.services.chapter_cache import get_cache_stats, reset_cache_stats
+from app.services.search_cache import get_search_cache_stats, reset_search_cache_stats
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ============================================================================
+# SLOW QUERIES
+# ============================================================================
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=200),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Most recent slow SQL statements on this worker, newest first.
+    
+    - SQL, normalized parameters, duration and calling route
+    - EXPLAIN (ANALYZE, BUFFERS) output for a sampled subset
+    """
+    return get_slow_queries(limit)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    admin: User = Depends(get_admin_user)
+):
+    """Clear the slow query buffer on this worker"""
+    clear_slow_queries()
+    return None
+
+
+# ============================================================================
+# XP LEDGER
+# ============================================================================
+
+@router.get("/users/{user_id}/xp")
+async def get_user_xp_ledger(
+    user_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Audit a user's XP: ledger entries with running totals, plus any
+    difference between the stored snapshot and a replay of the ledger.
+    """
+    return {
+        "events": get_xp_history(db, user_id, limit),
+        "mismatch": next(iter(replay_xp(db, [user_id])), None),
+    }
+
+
+# ============================================================================
+# CHAPTER CACHE
+# ============================================================================
+
+@router.get("/cache/chapters")
+async def chapter_cache_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Chapter cache effectiveness on this worker.
+    
+    - Local LRU hits, Redis hits and misses, and the hit ratio
+    - Average lookup time for hits and misses, and the estimated time saved
+    """
+    return get_cache_stats()
+
+
+@router.delete("/cache/chapters/stats", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_chapter_cache_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """Reset the chapter cache counters on this worker"""
+    reset_cache_stats()
+    return None
+
+
+# ============================================================================
+# SEARCH CACHE
+# ============================================================================
+
+@router.get("/cache/search")
+async def search_cache_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Search result cache effectiveness on this worker, per query class
+    (search, browse).
+    
+    - Hits, misses and the hit ratio
+    - Average lookup time for hits and misses, and the estimated time saved
+    """
+    return get_search_cache_stats()
+
+
+@router.delete("/cache/search/stats", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_search_cache_stats_endpoint(
+    admin: User = Depends(get_admin_user)
+):
+    """Reset the search cache counters on this worker"""
+    reset_search_cache_stats()
+    return None
@@ -14,6 +14,7 @@ from app.auth.security import (
     verify_token,
     get_current_user,
 )
+from app.services.open_pages import check_open_pages
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -149,8 +150,11 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     
     - Requires valid access token
     - Returns user profile data
+    - open_pages includes pages accrued since the last publish
     """
-    return current_user
+    response = UserResponse.model_validate(current_user)
+    response.open_pages = check_open_pages(current_user)
+    return response
 
 
 @router.post("/logout")
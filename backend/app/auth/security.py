@@ -106,3 +106,14 @@ async def get_current_user(
         )
     
     return user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Require the current user to be an operator (see settings.admin_user_ids)"""
+    if current_user.id not in settings.admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    
+    return current_user
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
+from sqlalchemy.exc import IntegrityError
 from typing import List
 from datetime import datetime, timezone
 
@@ -88,13 +89,23 @@ async def create_invite(
         status='pending'
     )
     db.add(invite)
-    db.commit()
-    db.refresh(invite)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request created the pending invite first (uq_btl_invites_pending_pair)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You already have a pending invite to this user"
+        )
     
     # Notify recipient
     from app.services.notification_service import notify_btl_invite
     notify_btl_invite(db, invite.id, current_user.id, recipient.id)
     
+    db.commit()
+    db.refresh(invite)
+    
     return invite
 
 
@@ -288,14 +299,15 @@ async def create_message(
         content=message_data.content
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
     
     # Notify the other participant
     recipient_id = thread.participant2_id if current_user.id == thread.participant1_id else thread.participant1_id
     from app.services.notification_service import notify_btl_reply
     notify_btl_reply(db, thread_id, current_user.id, recipient_id)
     
+    db.commit()
+    db.refresh(message)
+    
     return message
 
 
@@ -4,7 +4,7 @@ from sqlalchemy import and_, or_
 import redis
 from datetime import datetime, timezone
 
-from app.models import User, Follow, Chapter, Block as BlockModel
+from app.models import User, Follow, Book, Block as BlockModel
 from app.config import settings
 
 # Redis client for rate limiting
@@ -28,11 +28,11 @@ def check_mutual_follow(user1_id: int, user2_id: int, db: Session) -> bool:
 
 def check_chapter_minimum(user_id: int, db: Session) -> bool:
     """Check if user has at least 3 published chapters"""
-    count = db.query(Chapter).filter(
-        Chapter.author_id == user_id
-    ).count()
+    count = db.query(Book.chapter_count).filter(
+        Book.user_id == user_id
+    ).scalar()
     
-    return count >= 3
+    return (count or 0) >= 3
 
 
 def check_not_blocked(user1_id: int, user2_id: int, db: Session) -> bool:
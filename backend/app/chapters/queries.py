@@ -0,0 +1,63 @@
+"""
+Chapter queries - structured lookups on block content
+
+Block content is JSONB. Each helper returns a condition on ChapterBlock
+shaped to match an index from migration 016:
+
+- quote_by:            content @> {"author": ...}      GIN (jsonb_path_ops)
+- media_longer_than:   (content->>'duration')::float   partial btree (audio, video)
+- block_text_matches:  to_tsvector('english', text)    partial GIN (text, quote)
+
+Keys and the text search config are SQL literals, not bind parameters,
+so the expressions are identical to the indexed ones.
+"""
+from typing import Optional
+
+from sqlalchemy import Float, and_, cast, func, literal_column, select
+
+from app.models import Chapter, ChapterBlock
+from app.models.chapter import BlockType
+
+MEDIA_BLOCK_TYPES = (BlockType.AUDIO, BlockType.VIDEO)
+TEXT_BLOCK_TYPES = (BlockType.TEXT, BlockType.QUOTE)
+
+
+def _field(key: str):
+    return ChapterBlock.content.op("->>")(literal_column(f"'{key}'"))
+
+
+block_duration = cast(_field("duration"), Float)
+block_tsvector = func.to_tsvector(literal_column("'english'"), _field("text"))
+
+
+def quote_by(author: str):
+    """Quote blocks attributed to `author` (exact match)"""
+    return and_(
+        ChapterBlock.block_type == BlockType.QUOTE,
+        ChapterBlock.content.contains({"author": author})
+    )
+
+
+def media_longer_than(seconds: float, block_type: Optional[BlockType] = None):
+    """Audio or video blocks (or only `block_type`) longer than `seconds`"""
+    types = [block_type] if block_type else list(MEDIA_BLOCK_TYPES)
+    return and_(ChapterBlock.block_type.in_(types), block_duration > seconds)
+
+
+def block_text_matches(query: str):
+    """Text and quote blocks matching a plain-language full-text query"""
+    return and_(
+        ChapterBlock.block_type.in_(TEXT_BLOCK_TYPES),
+        block_tsvector.op("@@")(func.plainto_tsquery(literal_column("'english'"), query))
+    )
+
+
+def chapters_with_blocks(*conditions):
+    """
+    Condition on Chapter: for each block condition, the chapter has at
+    least one block meeting it (different blocks may meet different ones).
+    """
+    return and_(*(
+        Chapter.id.in_(select(ChapterBlock.chapter_id).where(condition))
+        for condition in conditions
+    ))
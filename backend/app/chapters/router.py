@@ -1,14 +1,26 @@
 """Chapter routes"""
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response, Query
+from sqlalchemy.orm import Session, undefer
 from datetime import datetime, timezone, timedelta
 from typing import List
 
 from app.database import get_db
 from app.models import User, Chapter, ChapterBlock
 from app.auth.security import get_current_user
-from app.chapters.schemas import ChapterCreate, ChapterUpdate, ChapterResponse
-from app.services.open_pages import consume_open_page, can_publish
+from app.chapters.schemas import ChapterCreate, ChapterUpdate, ChapterResponse, RelatedChaptersResponse
+from app.chapters.service import publish_chapter, chapter_response
+from app.services.open_pages import can_publish, check_open_pages
+from app.services.heart_counters import current_heart_counts
+from app.services.block_sync import reconcile_blocks
+from app.services.chapter_cache import get_chapter_entry, get_viewer_state
+from app.events import emit, CHAPTER_UPDATED, CHAPTER_DELETED
+from app.engagement.service import get_engagement_states
+from app.services.book_stats import chapter_deleted
+from app.services.theme_stats import themes_removed
+from app.services.facet_counts import facet_keys, facet_counts_changed
+from app.services.chapter_derived import apply_derived_fields, blocks_snapshot
+from app.muse.related_chapters import get_related_ids
+from app.search.router import hydrate_chapters, search_results
 
 router = APIRouter(prefix="/chapters", tags=["Chapters"])
 
@@ -27,48 +39,34 @@ async def create_chapter(
     - Validates media durations (audio ≤5min, video ≤3min)
     - Checks and consumes 1 Open Page
     - Sets edit window to 30 minutes
+    - Awards publish XP
     - Queues embedding generation in background
     """
     # Check if user can publish
     if not can_publish(current_user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"No Open Pages available. You have {current_user.open_pages} Open Pages."
+            detail=f"No Open Pages available. You have {check_open_pages(current_user)} Open Pages."
         )
     
-    # Create chapter
-    chapter = Chapter(
-        author_id=current_user.id,
+    chapter, book_id = publish_chapter(
+        db,
+        current_user,
+        blocks=[block.model_dump() for block in chapter_data.blocks],
         title=chapter_data.title,
         mood=chapter_data.mood,
         theme=chapter_data.theme,
         time_period=chapter_data.time_period,
-        edit_window_expires=datetime.now(timezone.utc) + timedelta(minutes=30)
     )
-    db.add(chapter)
-    db.flush()  # Get chapter ID
-    
-    # Create blocks
-    for block_data in chapter_data.blocks:
-        block = ChapterBlock(
-            chapter_id=chapter.id,
-            position=block_data.position,
-            block_type=block_data.block_type,
-            content=block_data.content
-        )
-        db.add(block)
-    
-    # Consume Open Page
-    consume_open_page(current_user, db)
+    response = chapter_response(chapter, book_id, current_user.username)
     
     db.commit()
-    db.refresh(chapter)
     
     # Queue embedding generation in background
     from app.muse.embeddings import generate_chapter_embedding
     background_tasks.add_task(generate_chapter_embedding, chapter, db)
     
-    return chapter
+    return response
 
 
 @router.get("/{chapter_id}", response_model=ChapterResponse)
@@ -82,56 +80,69 @@ async def get_chapter(
     
     - Returns chapter with blocks ordered by position
     - Includes author information (username, book_id)
-    - Includes is_hearted and is_bookmarked status for current user
+    - Includes is_hearted, is_bookmarked and is_shelved status for current user
     - Does NOT include margins (fetched separately)
-    - Checks access permissions based on Book privacy (TODO)
-    """
-    from app.models.engagement import Heart, Bookmark
+    - Private books are visible to the author and followers only
     
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    The chapter body comes from the chapter cache; viewer flags and the
+    heart count are looked up fresh in one query.
+    """
+    entry = get_chapter_entry(db, chapter_id)
+    viewer = get_viewer_state(db, chapter_id, entry["author_id"], current_user.id) if entry else None
     
-    if not chapter:
+    if not entry or not viewer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # TODO: Check access permissions based on Book privacy
-    
-    # Check if current user has hearted this chapter
-    is_hearted = db.query(Heart).filter(
-        Heart.user_id == current_user.id,
-        Heart.chapter_id == chapter.id
-    ).first() is not None
-    
-    # Check if current user has bookmarked this chapter
-    is_bookmarked = db.query(Bookmark).filter(
-        Bookmark.user_id == current_user.id,
-        Bookmark.chapter_id == chapter.id
-    ).first() is not None
-    
-    # Build response with author info
-    response_data = {
-        "id": chapter.id,
-        "author_id": chapter.author_id,
-        "title": chapter.title,
-        "cover_url": chapter.cover_url,
-        "mood": chapter.mood,
-        "theme": chapter.theme,
-        "time_period": chapter.time_period,
-        "heart_count": chapter.heart_count,
-        "is_hearted": is_hearted,
-        "is_bookmarked": is_bookmarked,
-        "published_at": chapter.published_at,
-        "edit_window_expires": chapter.edit_window_expires,
-        "blocks": chapter.blocks,
-        "author": {
-            "username": chapter.author.username,
-            "book_id": chapter.author.id
-        }
+    is_author = entry["author_id"] == current_user.id
+    if viewer["is_blocked"] or (entry["is_private"] and not is_author and not viewer["is_following"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this chapter"
+        )
+    
+    return {
+        **entry,
+        "heart_count": viewer["heart_count"],
+        "is_hearted": viewer["is_hearted"],
+        "is_bookmarked": viewer["is_bookmarked"],
+        "margin_count": viewer["margin_count"],
+        "is_shelved": viewer["is_shelved"],
     }
+
+
+@router.get("/{chapter_id}/related", response_model=RelatedChaptersResponse)
+async def get_related_chapters(
+    chapter_id: int,
+    limit: int = Query(6, ge=1, le=20),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Chapters most like this one ("more like this"), most similar first.
+    
+    Neighbours are precomputed from chapter embeddings (see
+    app.muse.related_chapters), so this is one row lookup plus one
+    hydrate query. Chapters the viewer can't see (blocked authors,
+    private books they don't follow) are left out; new chapters have no
+    related chapters until Muse has read them.
+    """
+    related_ids = get_related_ids(db, chapter_id)
+    
+    # The chapter itself goes through the same visibility filter
+    chapters = hydrate_chapters(db, [chapter_id] + related_ids, current_user.id)
+    if not chapters or chapters[0].id != chapter_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found"
+        )
     
-    return response_data
+    return RelatedChaptersResponse(
+        chapter_id=chapter_id,
+        chapters=search_results(db, chapters[1:limit + 1], current_user.id)
+    )
 
 
 @router.get("", response_model=dict)
@@ -159,9 +170,12 @@ async def list_chapters(
     
     # Apply pagination
     offset = (page - 1) * per_page
-    chapters = query.order_by(Chapter.published_at.desc()).offset(offset).limit(per_page).all()
+    chapters = query.options(undefer(Chapter.blocks_snapshot)).order_by(
+        Chapter.published_at.desc()
+    ).offset(offset).limit(per_page).all()
+    states = get_engagement_states(db, current_user.id, [chapter.id for chapter in chapters])
     
-    # Build response with author info
+    # Build response with author info and viewer state
     chapters_data = []
     for chapter in chapters:
         chapters_data.append({
@@ -170,12 +184,16 @@ async def list_chapters(
             "title": chapter.title,
             "mood": chapter.mood,
             "theme": chapter.theme,
+            "excerpt": chapter.excerpt,
+            "word_count": chapter.word_count,
+            "reading_time_minutes": chapter.reading_time_minutes,
             "published_at": chapter.published_at,
-            "blocks": chapter.blocks,
+            "blocks": chapter.blocks_snapshot if chapter.blocks_snapshot is not None else blocks_snapshot(chapter.blocks),
             "author": {
                 "username": chapter.author.username,
                 "book_id": chapter.author.id
-            }
+            },
+            **states[chapter.id]
         })
     
     return {
@@ -190,6 +208,7 @@ async def list_chapters(
 async def update_chapter(
     chapter_id: int,
     chapter_data: ChapterUpdate,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -199,8 +218,9 @@ async def update_chapter(
     - Only author can update
     - Must be within 30 minutes of publication
     - Can update title, mood, theme, and blocks
+    - Blocks are reconciled, not replaced; X-Blocks-Touched reports rows written
     """
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    chapter = db.query(Chapter).options(undefer(Chapter.blocks_snapshot)).filter(Chapter.id == chapter_id).first()
     
     if not chapter:
         raise HTTPException(
@@ -223,6 +243,8 @@ async def update_chapter(
             detail="Edit window has expired (30 minutes after publication)"
         )
     
+    facets_before = (chapter.mood, chapter.time_period)
+    
     # Update fields
     if chapter_data.title is not None:
         chapter.title = chapter_data.title
@@ -233,25 +255,38 @@ async def update_chapter(
     if chapter_data.time_period is not None:
         chapter.time_period = chapter_data.time_period
     
-    # Update blocks if provided
+    # Update blocks if provided (only changed rows are written)
     if chapter_data.blocks is not None:
-        # Delete existing blocks
-        db.query(ChapterBlock).filter(ChapterBlock.chapter_id == chapter.id).delete()
-        
-        # Create new blocks
-        for block_data in chapter_data.blocks:
-            block = ChapterBlock(
-                chapter_id=chapter.id,
-                position=block_data.position,
-                block_type=block_data.block_type,
-                content=block_data.content
+        sync = reconcile_blocks(
+            chapter.blocks,
+            [block.model_dump() for block in chapter_data.blocks],
+            lambda item: ChapterBlock(
+                position=item["position"],
+                block_type=item["block_type"],
+                content=item["content"]
             )
-            db.add(block)
+        )
+        response.headers["X-Blocks-Touched"] = sync.as_header()
+        apply_derived_fields(chapter)
+    
+    if (chapter.mood, chapter.time_period) != facets_before:
+        theme_ids = [theme.id for theme in chapter.themes]
+        facet_counts_changed(
+            db,
+            removed=facet_keys(*facets_before, theme_ids),
+            added=facet_keys(chapter.mood, chapter.time_period, theme_ids)
+        )
+    
+    emit(db, CHAPTER_UPDATED, chapter_id=chapter.id)
     
+    db.flush()
+    if chapter_data.blocks is not None:
+        chapter.blocks_snapshot = blocks_snapshot(chapter.blocks)  # New blocks have ids now
+    result = chapter_response(chapter, current_user.book.id if current_user.book else 0, current_user.username)
+    result["heart_count"] = current_heart_counts([chapter])[chapter.id]
     db.commit()
-    db.refresh(chapter)
     
-    return chapter
+    return result
 
 
 @router.delete("/{chapter_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -281,7 +316,14 @@ async def delete_chapter(
             detail="You can only delete your own chapters"
         )
     
+    theme_ids = [theme.id for theme in chapter.themes]
+    
     db.delete(chapter)
+    db.flush()
+    chapter_deleted(db, chapter.author_id)
+    themes_removed(db, theme_ids, chapter.published_at)
+    facet_counts_changed(db, removed=facet_keys(chapter.mood, chapter.time_period, theme_ids))
+    emit(db, CHAPTER_DELETED, chapter_id=chapter.id, theme_ids=theme_ids)
     db.commit()
     
     return None
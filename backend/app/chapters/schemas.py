@@ -3,10 +3,37 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from app.models.chapter import BlockType
+from app.search.schemas import ChapterSearchResult
+
+
+def validate_block_content(block_type: Optional[BlockType], v: dict) -> dict:
+    """Check a block's content has the fields its type needs (raises ValueError)"""
+    if block_type == BlockType.TEXT:
+        if 'text' not in v:
+            raise ValueError("TEXT block must have 'text' field")
+    elif block_type == BlockType.IMAGE:
+        if 'url' not in v:
+            raise ValueError("IMAGE block must have 'url' field")
+    elif block_type == BlockType.AUDIO:
+        if 'url' not in v or 'duration' not in v:
+            raise ValueError("AUDIO block must have 'url' and 'duration' fields")
+        if v['duration'] > 300:  # 5 minutes
+            raise ValueError("Audio duration cannot exceed 5 minutes (300 seconds)")
+    elif block_type == BlockType.VIDEO:
+        if 'url' not in v or 'duration' not in v:
+            raise ValueError("VIDEO block must have 'url' and 'duration' fields")
+        if v['duration'] > 180:  # 3 minutes
+            raise ValueError("Video duration cannot exceed 3 minutes (180 seconds)")
+    elif block_type == BlockType.QUOTE:
+        if 'text' not in v:
+            raise ValueError("QUOTE block must have 'text' field")
+    
+    return v
 
 
 class ChapterBlockCreate(BaseModel):
     """Create a chapter block"""
+    id: Optional[int] = Field(None, description="Existing block id when updating (keeps margins attached)")
     position: int = Field(..., ge=0, description="Position in chapter (0-indexed)")
     block_type: BlockType
     content: dict = Field(..., description="Block content as JSON")
@@ -15,29 +42,7 @@ class ChapterBlockCreate(BaseModel):
     @classmethod
     def validate_content(cls, v, info):
         """Validate content based on block type"""
-        block_type = info.data.get('block_type')
-        
-        if block_type == BlockType.TEXT:
-            if 'text' not in v:
-                raise ValueError("TEXT block must have 'text' field")
-        elif block_type == BlockType.IMAGE:
-            if 'url' not in v:
-                raise ValueError("IMAGE block must have 'url' field")
-        elif block_type == BlockType.AUDIO:
-            if 'url' not in v or 'duration' not in v:
-                raise ValueError("AUDIO block must have 'url' and 'duration' fields")
-            if v['duration'] > 300:  # 5 minutes
-                raise ValueError("Audio duration cannot exceed 5 minutes (300 seconds)")
-        elif block_type == BlockType.VIDEO:
-            if 'url' not in v or 'duration' not in v:
-                raise ValueError("VIDEO block must have 'url' and 'duration' fields")
-            if v['duration'] > 180:  # 3 minutes
-                raise ValueError("Video duration cannot exceed 3 minutes (180 seconds)")
-        elif block_type == BlockType.QUOTE:
-            if 'text' not in v:
-                raise ValueError("QUOTE block must have 'text' field")
-        
-        return v
+        return validate_block_content(info.data.get('block_type'), v)
 
 
 class ChapterCreate(BaseModel):
@@ -144,9 +149,15 @@ class ChapterResponse(BaseModel):
     mood: Optional[str]
     theme: Optional[str]
     time_period: Optional[str]
+    word_count: Optional[int] = None
+    reading_time_minutes: Optional[int] = None
+    block_summary: Optional[dict] = None  # Block count per type
+    first_image_url: Optional[str] = None
     heart_count: int
     is_hearted: bool = False
     is_bookmarked: bool = False
+    margin_count: int = 0
+    is_shelved: bool = False
     published_at: datetime
     edit_window_expires: datetime
     blocks: List[ChapterBlockResponse]
@@ -154,3 +165,9 @@ class ChapterResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class RelatedChaptersResponse(BaseModel):
+    """Chapters similar to a chapter ("more like this")"""
+    chapter_id: int
+    chapters: List[ChapterSearchResult]
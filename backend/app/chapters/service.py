@@ -0,0 +1,152 @@
+"""Chapter service - Publishing"""
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import User, Chapter, ChapterBlock
+from app.events import emit, CHAPTER_PUBLISHED
+from app.services.open_pages import consume_open_page
+from app.services.muse_progression import award_xp
+from app.services.book_stats import chapter_published
+from app.services.chapter_derived import derive_chapter_fields, blocks_snapshot
+from app.services.facet_counts import facet_keys, facet_counts_changed
+
+EDIT_WINDOW = timedelta(minutes=30)
+
+
+def publish_chapter(
+    db: Session,
+    user: User,
+    blocks: list[dict],
+    title: Optional[str] = None,
+    mood: Optional[str] = None,
+    theme: Optional[str] = None,
+    time_period: Optional[str] = None,
+) -> tuple[Chapter, int]:
+    """
+    Publish a chapter in a fixed number of statements, whatever the block count:
+
+    1. UPDATE users ... RETURNING (consume an Open Page, 400 if none)
+    2. UPDATE books ... RETURNING (chapter_count / last_chapter_at, book id)
+    3. INSERT INTO chapters ... RETURNING
+    4. INSERT INTO chapter_blocks VALUES (...), (...) RETURNING (skipped without blocks)
+    5. INSERT INTO chapter_facet_counts ... ON CONFLICT (mood / time period counts)
+    6. UPDATE chapters SET blocks_snapshot (flushed at commit)
+    7. INSERT INTO xp_events (flushed at commit)
+
+    Nothing is committed here; the caller commits once, which also
+    delivers the chapter.published event.
+
+    Args:
+        blocks: Dicts with position, block_type and content (already validated)
+
+    Returns:
+        (chapter, book_id) with chapter.blocks populated
+    """
+    consume_open_page(user, db)
+
+    now = datetime.now(timezone.utc)
+    book_id = chapter_published(db, user.id, now)
+    derived = derive_chapter_fields(
+        (block["block_type"], block["content"])
+        for block in sorted(blocks, key=lambda block: block["position"])
+    )
+
+    chapter = db.scalars(
+        insert(Chapter)
+        .values(
+            author_id=user.id,
+            title=title,
+            mood=mood,
+            theme=theme,
+            time_period=time_period,
+            heart_count=0,
+            theme_count=0,
+            published_at=now,
+            edit_window_expires=now + EDIT_WINDOW,
+            created_at=now,
+            updated_at=now,
+            **derived,
+        )
+        .returning(Chapter)
+    ).one()
+
+    # An empty parameter list would render INSERT ... DEFAULT VALUES (an empty draft)
+    chapter_blocks = list(db.scalars(
+        insert(ChapterBlock).returning(ChapterBlock, sort_by_parameter_order=True),
+        [
+            {
+                "chapter_id": chapter.id,
+                "position": block["position"],
+                "block_type": block["block_type"],
+                "content": block["content"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for block in blocks
+        ]
+    )) if blocks else []
+    chapter_blocks.sort(key=lambda block: block.position)
+    set_committed_value(chapter, "blocks", chapter_blocks)
+    chapter.blocks_snapshot = blocks_snapshot(chapter_blocks)
+    set_committed_value(chapter, "author", user)
+    
+    facet_counts_changed(db, added=facet_keys(mood, time_period))
+
+    award_xp(db, user, "publish_chapter")
+
+    emit(
+        db, CHAPTER_PUBLISHED,
+        chapter_id=chapter.id, author_id=user.id, title=title, mood=mood, time_period=time_period
+    )
+
+    return chapter, book_id or 0
+
+
+def chapter_response(chapter: Chapter, book_id: int, username: str) -> dict:
+    """
+    ChapterResponse payload without viewer state.
+
+    Blocks come from chapter.blocks_snapshot (undefer it when querying);
+    chapters without a snapshot fall back to loading chapter.blocks.
+    """
+    if chapter.blocks_snapshot is not None:
+        blocks = chapter.blocks_snapshot
+    else:
+        blocks = [
+            {
+                "id": block.id,
+                "position": block.position,
+                "block_type": block.block_type,
+                "content": block.content,
+                "created_at": block.created_at,
+            }
+            for block in chapter.blocks
+        ]
+
+    return {
+        "id": chapter.id,
+        "author_id": chapter.author_id,
+        "title": chapter.title,
+        "cover_url": chapter.cover_url,
+        "mood": chapter.mood,
+        "theme": chapter.theme,
+        "time_period": chapter.time_period,
+        "word_count": chapter.word_count,
+        "reading_time_minutes": chapter.reading_time_minutes,
+        "block_summary": chapter.block_summary,
+        "first_image_url": chapter.first_image_url,
+        "heart_count": chapter.heart_count,
+        "is_hearted": False,
+        "is_bookmarked": False,
+        "published_at": chapter.published_at,
+        "edit_window_expires": chapter.edit_window_expires,
+        "blocks": blocks,
+        "author": {
+            "username": username,
+            "book_id": book_id,
+        },
+    }
@@ -13,10 +13,71 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str
+    database_replica_urls: list[str] = []  # Read replicas for heavy GET endpoints
+    replica_max_lag_seconds: float = 5.0  # Skip replicas lagging more than this
+    replica_health_check_interval: int = 10  # seconds
+    read_your_writes_window: int = 5  # seconds a writer's reads stay on the primary
+    n_plus_one_threshold: int = 5  # Warn when one statement shape repeats more than this per request
+    slow_query_threshold_ms: int = 200
+    slow_query_explain_sample_rate: float = 0.1  # Fraction of slow SELECTs to EXPLAIN ANALYZE
+    slow_query_explain_timeout_ms: int = 5000
+    slow_query_explain_queue_size: int = 10  # Pending EXPLAINs; further samples are dropped
+    slow_query_buffer_size: int = 200
+    
+    # Admin
+    admin_user_ids: list[int] = []  # Users allowed on /admin endpoints
     
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
+    # Background jobs
+    scheduler_enabled: bool = True  # Run periodic jobs inside the API process
+    heart_counter_flush_interval: float = 5.0  # seconds between Redis -> Postgres heart flushes
+    heart_counter_reconcile_interval: float = 3600.0  # seconds between full recounts
+    xp_aggregate_interval: float = 10.0  # seconds between XP ledger folds
+    book_stats_repair_interval: float = 86400.0  # seconds between book stats verify-and-repair runs
+    theme_stats_refresh_interval: float = 3600.0  # seconds between theme recounts (slides the recent window)
+    
+    # Theme catalog
+    theme_recent_days: int = 7  # window for themes' recent_chapter_count
+    theme_catalog_check_interval: float = 2.0  # seconds between a worker's catalog version checks
+    theme_catalog_max_age: float = 300.0  # reload a worker's catalog at least this often
+    theme_list_size: int = 1000  # newest chapter ids kept per theme in Redis
+    theme_list_check_interval: float = 3600.0  # seconds between theme list consistency checks
+    theme_centroid_refresh_interval: float = 21600.0  # seconds between full theme centroid recomputes
+    theme_suggestion_min_score: float = 0.3  # cosine similarity a suggested theme must reach
+    
+    # Related chapters
+    related_chapters_k: int = 20  # neighbours stored per chapter (more than shown, to survive filtering)
+    related_chapters_block_size: int = 512  # chapters scored per matrix product when rebuilding
+    related_chapters_rebuild_interval: float = 604800.0  # seconds between full neighbour graph rebuilds
+    related_chapters_update_interval: float = 600.0  # seconds between catch-up runs for new chapters
+    
+    # Faceted browse
+    facet_values_limit: int = 20  # values listed per facet, most chapters first
+    facet_counts_repair_interval: float = 86400.0  # seconds between facet count verify-and-repair runs
+    
+    # Search suggestions
+    suggest_check_interval: float = 1.0  # seconds between a worker's checks for new snapshots and titles
+    suggest_snapshot_interval: float = 900.0  # seconds between shared suggestion index snapshots
+    suggest_max_titles: int = 200000  # most recent distinct chapter titles in the index
+    
+    # Search cache
+    search_cache_enabled: bool = True
+    search_cache_ttl: int = 60  # seconds a query's cached id pages live in Redis
+    
+    # Chapter cache
+    chapter_cache_enabled: bool = True
+    chapter_cache_ttl: int = 3600  # seconds a serialized chapter lives in Redis
+    chapter_cache_local_size: int = 2000  # chapters held in each worker's LRU
+    chapter_cache_local_ttl: float = 30.0  # upper bound on local staleness if an invalidation is missed
+    
+    # Draft history
+    draft_snapshot_interval: int = 20  # full snapshot every N revisions, deltas in between
+    draft_history_retention_days: int = 30  # older history is thinned to snapshots only
+    draft_history_keep_snapshots: int = 10  # snapshots kept per draft beyond the retention window
+    draft_history_prune_interval: float = 21600.0  # seconds between pruning runs
+    
     # JWT
     secret_key: str
     algorithm: str = "HS256"
@@ -1,9 +1,16 @@
 """Database configuration and session management"""
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
+from app.logging_config import logger
 
 # Create database engine
 engine = create_engine(
@@ -20,6 +27,98 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class Replica:
+    """A read replica with its last known health and replication lag"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(
+            url,
+            pool_pre_ping=True,
+            pool_size=10,
+            max_overflow=20
+        )
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.lag_bytes: Optional[int] = None
+        self.checked_at = 0.0
+
+    def check(self) -> None:
+        """
+        Probe the replica and record its replication lag.
+
+        A replica that has replayed the primary's current WAL position has
+        no lag, however long ago the last transaction was (an idle primary
+        writes none). Otherwise the lag is the age of the last replayed
+        transaction.
+        """
+        try:
+            with engine.connect() as conn:
+                primary_lsn = conn.execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+            with self.engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT pg_wal_lsn_diff(CAST(:primary_lsn AS pg_lsn), pg_last_wal_replay_lsn()) AS bytes_behind,
+                           COALESCE(EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())), 0) AS replay_age
+                """), {"primary_lsn": primary_lsn}).one()
+            self.lag_bytes = max(int(row.bytes_behind or 0), 0)
+            self.lag_seconds = float(row.replay_age) if self.lag_bytes else 0.0
+            self.healthy = self.lag_seconds <= settings.replica_max_lag_seconds
+        except Exception as e:
+            logger.warning(f"Read replica {self.engine.url.host} failed health check: {e}")
+            self.lag_seconds = None
+            self.lag_bytes = None
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+
+
+class ReplicaRouter:
+    """
+    Round-robin router over read replicas.
+
+    Replicas are health-checked lazily (at most every
+    `replica_health_check_interval` seconds) and skipped while they are
+    down or lagging more than `replica_max_lag_seconds`. With no healthy
+    replica, reads fall back to the primary.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+
+    def _refresh(self, replica: Replica) -> None:
+        if time.monotonic() - replica.checked_at >= settings.replica_health_check_interval:
+            replica.check()
+
+    def session(self):
+        """Open a session on the next healthy replica (or the primary)"""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            self._refresh(replica)
+            if replica.healthy:
+                return replica.session_factory()
+        return SessionLocal()
+
+    def status(self) -> list[dict]:
+        """Health and lag of every replica (for the metrics endpoint)"""
+        results = []
+        for replica in self.replicas:
+            self._refresh(replica)
+            results.append({
+                "host": replica.engine.url.host,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag_seconds,
+                "lag_bytes": replica.lag_bytes,
+            })
+        return results
+
+
+replica_router = ReplicaRouter(settings.database_replica_urls)
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -27,3 +126,20 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Dependency for read-only database sessions.
+
+    Routed to a read replica, unless the caller wrote recently and is
+    pinned to the primary (see ReadYourWritesMiddleware).
+    """
+    if getattr(request.state, "read_from_primary", False):
+        db = SessionLocal()
+    else:
+        db = replica_router.session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,13 +1,17 @@
 """Engagement routes - Hearts, Follows, Bookmarks"""
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from app.database import get_db
-from app.models import User, Chapter, Heart, Follow, Bookmark, Book
+from app.models import User, Follow, Bookmark, Book
 from app.auth.security import get_current_user
-from app.engagement.schemas import HeartResponse, FollowResponse, BookmarkResponse
+from app.engagement import service
+from app.engagement.schemas import (
+    HeartResponse, FollowResponse, BookmarkResponse, BookmarkListItem,
+    ChapterEngagementState, EngagementStateRequest, EngagementStateResponse,
+    EngagementBatch, EngagementActionResult, EngagementBatchResponse
+)
 
 router = APIRouter(prefix="/engagement", tags=["Engagement"])
 
@@ -23,46 +27,25 @@ async def heart_chapter(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Heart a chapter (toggle on)"""
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    """Heart a chapter (toggle on, idempotent)"""
+    result = service.add_heart(db, current_user, chapter_id)
     
-    if not chapter:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # Check if already hearted
-    existing = db.query(Heart).filter(
-        Heart.user_id == current_user.id,
-        Heart.chapter_id == chapter_id
-    ).first()
-    
-    if existing:
-        return existing
-    
-    # Create heart
-    heart = Heart(
-        user_id=current_user.id,
-        chapter_id=chapter_id
-    )
-    db.add(heart)
-    
-    # Increment heart count
-    chapter.heart_count += 1
-    
-    db.commit()
-    db.refresh(heart)
+    heart, created = result
+    response = HeartResponse.model_validate(heart)
     
-    # Award XP for hearting
-    from app.services.muse_progression import award_xp
-    award_xp(db, current_user, 'bookmark')  # Using bookmark XP (3 points)
+    if created:
+        db.commit()
+        
+        # Update taste profile in background
+        background_tasks.add_task(service.record_taste_interaction, current_user, chapter_id, 'heart', db)
     
-    # Update taste profile in background
-    from app.muse.embeddings import update_taste_profile
-    background_tasks.add_task(update_taste_profile, current_user, chapter, 'heart', db)
-    
-    return heart
+    return response
 
 
 @router.delete("/chapters/{chapter_id}/heart", status_code=status.HTTP_204_NO_CONTENT)
@@ -72,31 +55,12 @@ async def unheart_chapter(
     db: Session = Depends(get_db)
 ):
     """Remove heart from a chapter (toggle off)"""
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
-    
-    if not chapter:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chapter not found"
-        )
-    
-    heart = db.query(Heart).filter(
-        Heart.user_id == current_user.id,
-        Heart.chapter_id == chapter_id
-    ).first()
-    
-    if not heart:
+    if not service.remove_heart(db, current_user, chapter_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Heart not found"
         )
     
-    db.delete(heart)
-    
-    # Decrement heart count
-    if chapter.heart_count > 0:
-        chapter.heart_count -= 1
-    
     db.commit()
     return None
 
@@ -111,40 +75,25 @@ async def follow_book(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Follow a book"""
-    book = db.query(Book).filter(Book.id == book_id).first()
+    """Follow a book (idempotent)"""
+    follow, outcome = service.add_follow(db, current_user, book_id)
     
-    if not book:
+    if outcome == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
     
-    # Prevent self-follow
-    if book.user_id == current_user.id:
+    if outcome == "self":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot follow your own book"
         )
     
-    # Check if already following
-    existing = db.query(Follow).filter(
-        Follow.follower_id == current_user.id,
-        Follow.followed_id == book.user_id
-    ).first()
-    
-    if existing:
-        return existing
-    
-    # Create follow
-    follow = Follow(
-        follower_id=current_user.id,
-        followed_id=book.user_id
-    )
-    db.add(follow)
-    db.commit()
-    db.refresh(follow)
-    return follow
+    response = FollowResponse.model_validate(follow)
+    if outcome == "created":
+        db.commit()
+    return response
 
 
 @router.delete("/books/{book_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
@@ -154,26 +103,12 @@ async def unfollow_book(
     db: Session = Depends(get_db)
 ):
     """Unfollow a book"""
-    book = db.query(Book).filter(Book.id == book_id).first()
-    
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Book not found"
-        )
-    
-    follow = db.query(Follow).filter(
-        Follow.follower_id == current_user.id,
-        Follow.followed_id == book.user_id
-    ).first()
-    
-    if not follow:
+    if not service.remove_follow(db, current_user, book_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Follow not found"
         )
     
-    db.delete(follow)
     db.commit()
     return None
 
@@ -233,38 +168,25 @@ async def bookmark_chapter(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Bookmark a chapter (can bookmark from unfollowed books)"""
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    """Bookmark a chapter (can bookmark from unfollowed books, idempotent)"""
+    result = service.add_bookmark(db, current_user, chapter_id)
     
-    if not chapter:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # Check if already bookmarked
-    existing = db.query(Bookmark).filter(
-        Bookmark.user_id == current_user.id,
-        Bookmark.chapter_id == chapter_id
-    ).first()
-    
-    if existing:
-        return existing
+    bookmark, created = result
+    response = BookmarkResponse.model_validate(bookmark)
     
-    # Create bookmark
-    bookmark = Bookmark(
-        user_id=current_user.id,
-        chapter_id=chapter_id
-    )
-    db.add(bookmark)
-    db.commit()
-    db.refresh(bookmark)
-    
-    # Update taste profile in background
-    from app.muse.embeddings import update_taste_profile
-    background_tasks.add_task(update_taste_profile, current_user, chapter, 'bookmark', db)
+    if created:
+        db.commit()
+        
+        # Update taste profile in background
+        background_tasks.add_task(service.record_taste_interaction, current_user, chapter_id, 'bookmark', db)
     
-    return bookmark
+    return response
 
 
 @router.delete("/bookmarks/{bookmark_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -293,17 +215,28 @@ async def delete_bookmark(
     return None
 
 
-@router.get("/bookmarks", response_model=List[BookmarkResponse])
+@router.get("/bookmarks", response_model=List[BookmarkListItem])
 async def list_bookmarks(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List user's bookmarks in chronological order"""
+    """List user's bookmarks in chronological order, with engagement state"""
     bookmarks = db.query(Bookmark).filter(
         Bookmark.user_id == current_user.id
     ).order_by(Bookmark.created_at.desc()).all()
     
-    return bookmarks
+    states = service.get_engagement_states(db, current_user.id, [b.chapter_id for b in bookmarks])
+    
+    return [
+        BookmarkListItem(
+            id=bookmark.id,
+            user_id=bookmark.user_id,
+            chapter_id=bookmark.chapter_id,
+            created_at=bookmark.created_at,
+            **states[bookmark.chapter_id]
+        )
+        for bookmark in bookmarks
+    ]
 
 
 # ============================================================================
@@ -317,47 +250,28 @@ async def add_to_shelf(
     db: Session = Depends(get_db)
 ):
     """Add a Book to your Shelf (curated collection)"""
-    from app.models.shelf import Shelf
+    shelf_item, outcome = service.add_to_shelf(db, current_user, book_id)
     
-    # Get the book
-    book = db.query(Book).filter(Book.id == book_id).first()
-    
-    if not book:
+    if outcome == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
     
     # Can't add own book to shelf
-    if book.user_id == current_user.id:
+    if outcome == "self":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot add your own Book to your Shelf"
         )
     
-    # Check if already on shelf
-    existing = db.query(Shelf).filter(
-        Shelf.user_id == current_user.id,
-        Shelf.book_owner_id == book.user_id
-    ).first()
+    if outcome == "exists":
+        return {"message": "Book already on your Shelf", "shelf_id": shelf_item.id}
     
-    if existing:
-        return {"message": "Book already on your Shelf", "shelf_id": existing.id}
-    
-    # Create shelf entry
-    shelf_item = Shelf(
-        user_id=current_user.id,
-        book_owner_id=book.user_id
-    )
-    db.add(shelf_item)
+    shelf_id = shelf_item.id
     db.commit()
-    db.refresh(shelf_item)
-    
-    # Create notification for book owner
-    from app.services.notification_service import notify_shelf_add
-    notify_shelf_add(db, book.user_id, current_user.id)
     
-    return {"message": "Book added to your Shelf", "shelf_id": shelf_item.id}
+    return {"message": "Book added to your Shelf", "shelf_id": shelf_id}
 
 
 @router.delete("/books/{book_id}/shelf", status_code=status.HTTP_204_NO_CONTENT)
@@ -367,30 +281,12 @@ async def remove_from_shelf(
     db: Session = Depends(get_db)
 ):
     """Remove a Book from your Shelf"""
-    from app.models.shelf import Shelf
-    
-    # Get the book
-    book = db.query(Book).filter(Book.id == book_id).first()
-    
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Book not found"
-        )
-    
-    # Find shelf entry
-    shelf_item = db.query(Shelf).filter(
-        Shelf.user_id == current_user.id,
-        Shelf.book_owner_id == book.user_id
-    ).first()
-    
-    if not shelf_item:
+    if not service.remove_from_shelf(db, current_user, book_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not on your Shelf"
         )
     
-    db.delete(shelf_item)
     db.commit()
     return None
 
@@ -449,3 +345,61 @@ async def check_shelf_status(
     ).first()
     
     return {"on_shelf": shelf_item is not None}
+
+
+# ============================================================================
+# VIEWER STATE
+# ============================================================================
+
+@router.post("/state", response_model=EngagementStateResponse)
+async def get_engagement_state(
+    request: EngagementStateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Heart, bookmark, margin-count and Shelf state for up to 100 chapters.
+    
+    One query per kind of state regardless of how many ids are sent.
+    Unknown chapter ids are returned with default (empty) state.
+    """
+    states = service.get_engagement_states(db, current_user.id, request.chapter_ids)
+    
+    return EngagementStateResponse(states=[
+        ChapterEngagementState(chapter_id=chapter_id, **states[chapter_id])
+        for chapter_id in dict.fromkeys(request.chapter_ids)
+    ])
+
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+@router.post("/batch", response_model=EngagementBatchResponse)
+async def apply_engagement_batch(
+    batch: EngagementBatch,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply queued engagement actions in order, in a single transaction.
+    
+    Each action is idempotent, so replaying a queue is safe. Per-action
+    status is one of applied, noop, not_found or invalid.
+    """
+    results = []
+    
+    for item in batch.actions:
+        outcome = service.apply_engagement_action(db, current_user, item.action, item.target_id)
+        results.append(EngagementActionResult(action=item.action, target_id=item.target_id, status=outcome))
+    
+    db.commit()
+    
+    for result in results:
+        if result.status == "applied" and result.action in ("heart", "bookmark"):
+            background_tasks.add_task(
+                service.record_taste_interaction, current_user, result.target_id, result.action, db
+            )
+    
+    return EngagementBatchResponse(results=results)
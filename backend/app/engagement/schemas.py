@@ -1,6 +1,7 @@
 """Engagement schemas"""
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Literal
 
 
 class HeartResponse(BaseModel):
@@ -34,3 +35,58 @@ class BookmarkResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class BookmarkListItem(BookmarkResponse):
+    """Bookmark with the viewer's state for the bookmarked chapter"""
+    is_hearted: bool = False
+    is_bookmarked: bool = True
+    margin_count: int = 0
+    is_shelved: bool = False
+
+
+class ChapterEngagementState(BaseModel):
+    """The current user's engagement state for one chapter"""
+    chapter_id: int
+    is_hearted: bool
+    is_bookmarked: bool
+    margin_count: int
+    is_shelved: bool  # the chapter's book is on the user's Shelf
+
+
+class EngagementStateRequest(BaseModel):
+    """Chapters to look up"""
+    chapter_ids: List[int] = Field(..., min_length=1, max_length=100)
+
+
+class EngagementStateResponse(BaseModel):
+    """Engagement state, in request order (duplicate ids collapsed)"""
+    states: List[ChapterEngagementState]
+
+
+class EngagementAction(BaseModel):
+    """One queued engagement action"""
+    action: Literal[
+        "heart", "unheart",
+        "bookmark", "unbookmark",
+        "follow", "unfollow",
+        "shelf", "unshelf",
+    ]
+    target_id: int  # chapter id for heart/bookmark, book id for follow/shelf
+
+
+class EngagementBatch(BaseModel):
+    """Engagement actions to apply in order (e.g. an offline queue)"""
+    actions: List[EngagementAction] = Field(..., min_length=1, max_length=100)
+
+
+class EngagementActionResult(BaseModel):
+    """Outcome of one batched action"""
+    action: str
+    target_id: int
+    status: str  # applied, noop, not_found, invalid
+
+
+class EngagementBatchResponse(BaseModel):
+    """Batch response"""
+    results: List[EngagementActionResult]
@@ -0,0 +1,327 @@
+"""Engagement service - Idempotent heart, bookmark, follow and shelf writes
+
+Each write is a single INSERT ... ON CONFLICT DO NOTHING RETURNING (or
+DELETE ... RETURNING) guarded by the target's existence, so double-taps
+are no-ops instead of races. XP grants happen in the caller's transaction;
+callers commit once. heart_count changes are buffered and written behind
+(see app.services.heart_counters).
+
+get_engagement_states reads a viewer's state for a page of chapters in a
+fixed number of queries, for list endpoints and the bulk state endpoint.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import select, delete, literal, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import User, Chapter, Heart, Bookmark, Follow, Book, Shelf
+from app.services.muse_progression import award_xp
+from app.services.heart_counters import buffer_heart_delta
+from app.services.book_stats import follows_changed, shelf_changed
+
+
+# ============================================================================
+# HEARTS
+# ============================================================================
+
+def add_heart(db: Session, user: User, chapter_id: int) -> Optional[tuple[Heart, bool]]:
+    """
+    Heart a chapter.
+
+    Returns:
+        (heart, created), or None if the chapter does not exist
+    """
+    heart = db.scalars(
+        insert(Heart)
+        .from_select(
+            ["user_id", "chapter_id", "created_at"],
+            select(literal(user.id), Chapter.id, literal(datetime.now(timezone.utc)))
+            .where(Chapter.id == chapter_id)
+        )
+        .on_conflict_do_nothing(constraint="uq_heart_user_chapter")
+        .returning(Heart)
+    ).first()
+
+    if heart is None:
+        existing = db.query(Heart).filter(
+            Heart.user_id == user.id,
+            Heart.chapter_id == chapter_id
+        ).first()
+        return (existing, False) if existing else None
+
+    buffer_heart_delta(db, chapter_id, 1)
+
+    # Hearting earns bookmark XP (3 points)
+    award_xp(db, user, "bookmark")
+
+    return heart, True
+
+
+def remove_heart(db: Session, user: User, chapter_id: int) -> bool:
+    """Remove a heart. Returns False if there was nothing to remove."""
+    removed = db.execute(
+        delete(Heart)
+        .where(Heart.user_id == user.id, Heart.chapter_id == chapter_id)
+        .returning(Heart.id)
+    ).first()
+
+    if removed is None:
+        return False
+
+    buffer_heart_delta(db, chapter_id, -1)
+    return True
+
+
+# ============================================================================
+# BOOKMARKS
+# ============================================================================
+
+def add_bookmark(db: Session, user: User, chapter_id: int) -> Optional[tuple[Bookmark, bool]]:
+    """
+    Bookmark a chapter.
+
+    Returns:
+        (bookmark, created), or None if the chapter does not exist
+    """
+    bookmark = db.scalars(
+        insert(Bookmark)
+        .from_select(
+            ["user_id", "chapter_id", "created_at"],
+            select(literal(user.id), Chapter.id, literal(datetime.now(timezone.utc)))
+            .where(Chapter.id == chapter_id)
+        )
+        .on_conflict_do_nothing(constraint="uq_bookmark_user_chapter")
+        .returning(Bookmark)
+    ).first()
+
+    if bookmark is None:
+        existing = db.query(Bookmark).filter(
+            Bookmark.user_id == user.id,
+            Bookmark.chapter_id == chapter_id
+        ).first()
+        return (existing, False) if existing else None
+
+    return bookmark, True
+
+
+def remove_bookmark(db: Session, user: User, chapter_id: int) -> bool:
+    """Remove a bookmark by chapter. Returns False if there was nothing to remove."""
+    removed = db.execute(
+        delete(Bookmark)
+        .where(Bookmark.user_id == user.id, Bookmark.chapter_id == chapter_id)
+        .returning(Bookmark.id)
+    ).first()
+    return removed is not None
+
+
+# ============================================================================
+# FOLLOWS AND SHELF
+# ============================================================================
+
+def _book_owner_id(db: Session, book_id: int) -> Optional[int]:
+    return db.execute(select(Book.user_id).where(Book.id == book_id)).scalar()
+
+
+def add_follow(db: Session, user: User, book_id: int) -> tuple[Optional[Follow], str]:
+    """
+    Follow a book.
+
+    Returns:
+        (follow, status) where status is "created", "exists",
+        "not_found" or "self"
+    """
+    follow = db.scalars(
+        insert(Follow)
+        .from_select(
+            ["follower_id", "followed_id", "created_at"],
+            select(literal(user.id), Book.user_id, literal(datetime.now(timezone.utc)))
+            .where(Book.id == book_id, Book.user_id != user.id)
+        )
+        .on_conflict_do_nothing(constraint="uq_follow_relationship")
+        .returning(Follow)
+    ).first()
+
+    if follow is not None:
+        follows_changed(db, [(follow.follower_id, follow.followed_id)], 1)
+        return follow, "created"
+
+    owner_id = _book_owner_id(db, book_id)
+    if owner_id is None:
+        return None, "not_found"
+    if owner_id == user.id:
+        return None, "self"
+
+    existing = db.query(Follow).filter(
+        Follow.follower_id == user.id,
+        Follow.followed_id == owner_id
+    ).first()
+    return existing, "exists"
+
+
+def remove_follow(db: Session, user: User, book_id: int) -> bool:
+    """Unfollow a book. Returns False if there was nothing to remove."""
+    removed = db.execute(
+        delete(Follow)
+        .where(
+            Follow.follower_id == user.id,
+            Follow.followed_id == select(Book.user_id).where(Book.id == book_id).scalar_subquery()
+        )
+        .returning(Follow.follower_id, Follow.followed_id)
+    ).first()
+
+    if removed is None:
+        return False
+
+    follows_changed(db, [tuple(removed)], -1)
+    return True
+
+
+def add_to_shelf(db: Session, user: User, book_id: int) -> tuple[Optional[Shelf], str]:
+    """
+    Add a book to the user's Shelf and notify the owner.
+
+    Returns:
+        (shelf_item, status) where status is "created", "exists",
+        "not_found" or "self"
+    """
+    shelf_item = db.scalars(
+        insert(Shelf)
+        .from_select(
+            ["user_id", "book_owner_id", "created_at"],
+            select(literal(user.id), Book.user_id, literal(datetime.now(timezone.utc)))
+            .where(Book.id == book_id, Book.user_id != user.id)
+        )
+        .on_conflict_do_nothing(constraint="uq_shelf_user_book")
+        .returning(Shelf)
+    ).first()
+
+    if shelf_item is not None:
+        shelf_changed(db, shelf_item.book_owner_id, 1)
+        from app.services.notification_service import notify_shelf_add
+        notify_shelf_add(db, shelf_item.book_owner_id, user.id)
+        return shelf_item, "created"
+
+    owner_id = _book_owner_id(db, book_id)
+    if owner_id is None:
+        return None, "not_found"
+    if owner_id == user.id:
+        return None, "self"
+
+    existing = db.query(Shelf).filter(
+        Shelf.user_id == user.id,
+        Shelf.book_owner_id == owner_id
+    ).first()
+    return existing, "exists"
+
+
+def remove_from_shelf(db: Session, user: User, book_id: int) -> bool:
+    """Remove a book from the user's Shelf. Returns False if it wasn't there."""
+    removed = db.execute(
+        delete(Shelf)
+        .where(
+            Shelf.user_id == user.id,
+            Shelf.book_owner_id == select(Book.user_id).where(Book.id == book_id).scalar_subquery()
+        )
+        .returning(Shelf.book_owner_id)
+    ).first()
+
+    if removed is None:
+        return False
+
+    shelf_changed(db, removed.book_owner_id, -1)
+    return True
+
+
+# ============================================================================
+# VIEWER STATE
+# ============================================================================
+
+def get_engagement_states(db: Session, user_id: int, chapter_ids: Iterable[int]) -> dict[int, dict]:
+    """
+    A viewer's engagement state for many chapters at once.
+
+    One query per kind of state (hearts, bookmarks, margin counts, shelf),
+    each matching the whole id list with = ANY(:ids), however many
+    chapters are on the page.
+
+    Returns:
+        {chapter_id: {"is_hearted", "is_bookmarked", "margin_count", "is_shelved"}};
+        ids that do not exist are reported with default state
+    """
+    ids = list(dict.fromkeys(chapter_ids))
+    states = {
+        chapter_id: {"is_hearted": False, "is_bookmarked": False, "margin_count": 0, "is_shelved": False}
+        for chapter_id in ids
+    }
+    if not ids:
+        return states
+
+    params = {"user_id": user_id, "ids": ids}
+
+    for (chapter_id,) in db.execute(text(
+        "SELECT chapter_id FROM hearts WHERE user_id = :user_id AND chapter_id = ANY(:ids)"
+    ), params):
+        states[chapter_id]["is_hearted"] = True
+
+    for (chapter_id,) in db.execute(text(
+        "SELECT chapter_id FROM bookmarks WHERE user_id = :user_id AND chapter_id = ANY(:ids)"
+    ), params):
+        states[chapter_id]["is_bookmarked"] = True
+
+    for chapter_id, count in db.execute(text(
+        "SELECT chapter_id, COUNT(*) FROM margins WHERE chapter_id = ANY(:ids) GROUP BY chapter_id"
+    ), params):
+        states[chapter_id]["margin_count"] = count
+
+    # Shelves hold books (keyed by owner), so match on each chapter's author
+    for (chapter_id,) in db.execute(text("""
+        SELECT c.id FROM chapters c
+        JOIN shelves s ON s.book_owner_id = c.author_id AND s.user_id = :user_id
+        WHERE c.id = ANY(:ids)
+    """), params):
+        states[chapter_id]["is_shelved"] = True
+
+    return states
+
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+def apply_engagement_action(db: Session, user: User, action: str, target_id: int) -> str:
+    """
+    Apply one queued engagement action (e.g. from an offline mobile queue).
+
+    Returns:
+        "applied", "noop" (already in that state), "not_found" or "invalid"
+    """
+    if action in ("heart", "bookmark"):
+        add = add_heart if action == "heart" else add_bookmark
+        result = add(db, user, target_id)
+        if result is None:
+            return "not_found"
+        return "applied" if result[1] else "noop"
+
+    if action in ("follow", "shelf"):
+        add = add_follow if action == "follow" else add_to_shelf
+        _, outcome = add(db, user, target_id)
+        return {"created": "applied", "exists": "noop", "not_found": "not_found", "self": "invalid"}[outcome]
+
+    remove = {
+        "unheart": remove_heart,
+        "unbookmark": remove_bookmark,
+        "unfollow": remove_follow,
+        "unshelf": remove_from_shelf,
+    }[action]
+    return "applied" if remove(db, user, target_id) else "noop"
+
+
+async def record_taste_interaction(user: User, chapter_id: int, interaction_type: str, db: Session) -> None:
+    """Background task: load the chapter and fold the interaction into the taste profile"""
+    from app.muse.embeddings import update_taste_profile
+
+    chapter = db.get(Chapter, chapter_id)
+    if chapter:
+        await update_taste_profile(user, chapter, interaction_type, db)
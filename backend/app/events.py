@@ -0,0 +1,53 @@
+"""
+In-process domain events
+
+emit() records an event on the session; it is delivered to subscribers
+only after that transaction commits (and dropped on rollback), so
+subscribers never see writes that did not happen.
+
+Subscribers run synchronously in the committing thread and must be quick
+(cache invalidation, counters). Slow work belongs in a background task.
+"""
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.logging_config import logger
+
+CHAPTER_PUBLISHED = "chapter.published"
+CHAPTER_UPDATED = "chapter.updated"
+CHAPTER_DELETED = "chapter.deleted"
+CHAPTER_THEMES_CHANGED = "chapter.themes_changed"
+BOOK_PRIVACY_CHANGED = "book.privacy_changed"
+
+_subscribers: dict[str, list[Callable[[dict], None]]] = defaultdict(list)
+
+
+def subscribe(name: str):
+    """Register handler(payload) for events called `name`"""
+    def decorator(handler):
+        _subscribers[name].append(handler)
+        return handler
+    return decorator
+
+
+def emit(db: Session, name: str, **payload) -> None:
+    """Queue an event for delivery when the session's transaction commits"""
+    db.info.setdefault("pending_events", []).append((name, payload))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_events(session: Session) -> None:
+    for name, payload in session.info.pop("pending_events", []):
+        for handler in _subscribers.get(name, []):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"Event handler {handler.__name__} failed for {name}: {e}", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_events(session: Session) -> None:
+    session.info.pop("pending_events", None)
@@ -1,15 +1,17 @@
 """Library routes - Feed and bookshelf"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Session, joinedload, undefer
+from sqlalchemy import desc
 from typing import List
-from datetime import datetime, timezone
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import User, Book, Chapter, Follow
 from app.auth.security import get_current_user
 from app.library.schemas import SpineResponse, FeedResponse, ChapterFeedItem, PaginationMeta
 from app.chapters.schemas import ChapterResponse
+from app.chapters.service import chapter_response
+from app.engagement.service import get_engagement_states
+from app.services.heart_counters import current_heart_counts
 
 router = APIRouter(prefix="/library", tags=["Library"])
 
@@ -21,7 +23,7 @@ router = APIRouter(prefix="/library", tags=["Library"])
 @router.get("/spines", response_model=List[SpineResponse])
 async def get_bookshelf_spines(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get bookshelf spines (followed books with unread indicators).
@@ -30,48 +32,28 @@ async def get_bookshelf_spines(
     - unread_count: number of chapters published since user's last read
     - last_chapter_at: timestamp of most recent chapter
     """
-    # Get all users the current user follows
-    follows = db.query(Follow).filter(
+    # Followed books with their stored stats, most recent chapter first
+    rows = db.query(Book, User.username).join(
+        Follow, Follow.followed_id == Book.user_id
+    ).join(
+        User, User.id == Book.user_id
+    ).filter(
         Follow.follower_id == current_user.id
-    ).all()
+    ).order_by(Book.last_chapter_at.desc().nulls_last()).all()
     
-    spines = []
-    
-    for follow in follows:
-        # Get the followed user's book
-        book = db.query(Book).filter(Book.user_id == follow.followed_id).first()
-        
-        if not book:
-            continue
-        
-        # Get the most recent chapter
-        last_chapter = db.query(Chapter).filter(
-            Chapter.author_id == follow.followed_id
-        ).order_by(desc(Chapter.published_at)).first()
-        
-        # Calculate unread count (for now, just count all chapters)
-        # TODO: Track user's last read timestamp per book
-        unread_count = db.query(func.count(Chapter.id)).filter(
-            Chapter.author_id == follow.followed_id
-        ).scalar()
-        
-        # Get user info
-        followed_user = db.query(User).filter(User.id == follow.followed_id).first()
-        
-        spine = SpineResponse(
+    return [
+        SpineResponse(
             book_id=book.id,
-            user_id=followed_user.id,
-            username=followed_user.username,
+            user_id=book.user_id,
+            username=username,
             display_name=book.display_name,
-            unread_count=unread_count or 0,
-            last_chapter_at=last_chapter.published_at if last_chapter else None
+            # For now, all chapters count as unread
+            # TODO: Track user's last read timestamp per book
+            unread_count=book.chapter_count,
+            last_chapter_at=book.last_chapter_at
         )
-        spines.append(spine)
-    
-    # Sort by most recent chapter first
-    spines.sort(key=lambda x: x.last_chapter_at or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-    
-    return spines
+        for book, username in rows
+    ]
 
 
 # ============================================================================
@@ -83,7 +65,7 @@ async def get_new_chapters_feed(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get new chapters feed from followed books.
@@ -139,22 +121,28 @@ async def get_new_chapters_feed(
     # Limit to remaining results within 100 bound
     limit = min(per_page, 100 - offset)
     
-    chapters = query.offset(offset).limit(limit).all()
+    chapters = query.options(joinedload(Chapter.author)).offset(offset).limit(limit).all()
+    
+    heart_counts = current_heart_counts(chapters)
+    states = get_engagement_states(db, current_user.id, [chapter.id for chapter in chapters])
     
     # Build feed items
     feed_items = []
     for chapter in chapters:
-        author = db.query(User).filter(User.id == chapter.author_id).first()
-        
         feed_item = ChapterFeedItem(
             id=chapter.id,
             title=chapter.title,
             author_id=chapter.author_id,
-            author_username=author.username,
+            author_username=chapter.author.username,
             mood=chapter.mood,
             theme=chapter.theme,
-            heart_count=chapter.heart_count,
-            published_at=chapter.published_at
+            heart_count=heart_counts[chapter.id],
+            published_at=chapter.published_at,
+            excerpt=chapter.excerpt,
+            word_count=chapter.word_count,
+            reading_time_minutes=chapter.reading_time_minutes,
+            first_image_url=chapter.first_image_url,
+            **states[chapter.id]
         )
         feed_items.append(feed_item)
     
@@ -218,9 +206,20 @@ async def get_book_chapters(
     
     # Apply pagination
     offset = (page - 1) * per_page
-    chapters = query.offset(offset).limit(per_page).all()
-    
-    return chapters
+    chapters = query.options(undefer(Chapter.blocks_snapshot)).offset(offset).limit(per_page).all()
+    
+    heart_counts = current_heart_counts(chapters)
+    states = get_engagement_states(db, current_user.id, [chapter.id for chapter in chapters])
+    owner = db.query(User.username).filter(User.id == book.user_id).scalar()
+    
+    return [
+        {
+            **chapter_response(chapter, book.id, owner),
+            **states[chapter.id],
+            "heart_count": heart_counts[chapter.id],
+        }
+        for chapter in chapters
+    ]
 
 
 
@@ -231,7 +230,7 @@ async def get_book_chapters(
 @router.get("/spines-discovery")
 async def get_spines_discovery(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get Spines - Books you've interacted with (read from, added to Shelf, or seen in Quiet Picks).
@@ -275,20 +274,10 @@ async def get_spines_discovery(
         Book.user_id.in_(discovered_user_ids)
     ).all()
     
-    # Get last chapter dates for all these users in one query
-    last_chapters = db.query(
-        Chapter.author_id,
-        func.max(Chapter.published_at).label('last_published')
-    ).filter(
-        Chapter.author_id.in_(discovered_user_ids)
-    ).group_by(Chapter.author_id).all()
-    
-    last_chapter_map = {author_id: last_pub for author_id, last_pub in last_chapters}
-    
     # Build response
     spines = []
     for book, user in books_with_users:
-        last_chapter_at = last_chapter_map.get(user.id)
+        last_chapter_at = book.last_chapter_at
         spines.append({
             "book_id": book.id,
             "user_id": user.id,
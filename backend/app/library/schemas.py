@@ -36,6 +36,16 @@ class ChapterFeedItem(BaseModel):
     theme: Optional[str]
     heart_count: int
     published_at: datetime
+    excerpt: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_time_minutes: Optional[int] = None
+    first_image_url: Optional[str] = None
+    
+    # Viewer state
+    is_hearted: bool = False
+    is_bookmarked: bool = False
+    margin_count: int = 0
+    is_shelved: bool = False
     
     class Config:
         from_attributes = True
@@ -1,13 +1,24 @@
 """FastAPI application initialization"""
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import sentry_sdk
 
 from app.config import settings
 from app.error_handlers import setup_error_handlers
-from app.middleware import RequestLoggingMiddleware, RateLimitHeaderMiddleware
+from app.middleware import (
+    RequestLoggingMiddleware,
+    RateLimitHeaderMiddleware,
+    ReadYourWritesMiddleware,
+    QueryStatsMiddleware,
+)
+from app.database import replica_router
+from app.auth.security import get_admin_user
+from app.models import User
+from app.scheduler import start_scheduler, stop_scheduler
+from app.services.chapter_cache import start_invalidation_listener, stop_invalidation_listener
 from app.logging_config import logger
 
 
@@ -25,8 +36,12 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events"""
     # Startup
     logger.info(f"🚀 Starting {settings.app_name}")
+    jobs = start_scheduler()
+    cache_listener = start_invalidation_listener()
     yield
     # Shutdown
+    stop_invalidation_listener(cache_listener)
+    await stop_scheduler(jobs)
     logger.info(f"👋 Shutting down {settings.app_name}")
 
 
@@ -50,29 +65,13 @@ app.add_middleware(
 # Add custom middleware
 app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(RateLimitHeaderMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 
 # Setup error handlers
 setup_error_handlers(app)
 
 
-# Create FastAPI app
-app = FastAPI(
-    title=settings.app_name,
-    description="A calm, expressive, AI-assisted social platform built for depth, not dopamine.",
-    version="0.1.0",
-    lifespan=lifespan
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -89,6 +88,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db")
+async def database_health(admin: User = Depends(get_admin_user)):
+    """Read replica health and replication lag (operators only)"""
+    # Health checks are blocking database round trips
+    return {"replicas": await asyncio.to_thread(replica_router.status)}
+
+
 # Include routers
 from app.auth.router import router as auth_router
 from app.users.router import router as users_router
@@ -104,6 +110,7 @@ from app.moderation.router import router as moderation_router
 from app.privacy.router import router as privacy_router
 from app.media.router import router as media_router
 from app.notifications.router import router as notifications_router
+from app.admin.router import router as admin_router
 
 app.include_router(auth_router)
 app.include_router(users_router)
@@ -119,3 +126,4 @@ app.include_router(moderation_router)
 app.include_router(privacy_router)
 app.include_router(media_router)
 app.include_router(notifications_router)
+app.include_router(admin_router)
@@ -86,17 +86,19 @@ async def create_margin(
         content=margin_data.content
     )
     db.add(margin)
-    db.commit()
-    db.refresh(margin)
+    db.flush()
     
     # Award XP for margin
     from app.services.muse_progression import award_xp
-    award_xp(db, current_user, "margin")
+    award_xp(db, current_user, "margin_comment")
     
     # Create notification for chapter author
     from app.services.notification_service import notify_margin_added
     notify_margin_added(db, margin, chapter)
     
+    db.commit()
+    db.refresh(margin)
+    
     return margin
 
 
@@ -1,9 +1,19 @@
 """Custom middleware"""
-from fastapi import Request
+from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 import time
+import redis
+import redis.asyncio
 
+from app.config import settings
 from app.logging_config import logger
+from app.query_stats import start_request_stats, end_request_stats
+
+# Redis client for read-your-writes pins (shared across workers); async so
+# the pin lookup doesn't block the event loop
+redis_client = redis.asyncio.from_url(settings.redis_url)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
@@ -35,6 +45,36 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Count SQL statements and DB time per request.
+    
+    - Adds X-DB-Queries and Server-Timing headers in debug mode
+    - Warns when one statement shape repeats (likely an N+1)
+    """
+    
+    async def dispatch(self, request: Request, call_next):
+        stats, token = start_request_stats(f"{request.method} {request.url.path}")
+        try:
+            response = await call_next(request)
+        finally:
+            end_request_stats(token)
+        
+        for shape, count in stats.repeated_shapes(settings.n_plus_one_threshold):
+            logger.warning(
+                f"Possible N+1 on {request.method} {request.url.path}: "
+                f"{count}x {shape[:200]}"
+            )
+        
+        if settings.debug:
+            response.headers["X-DB-Queries"] = str(stats.count)
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+            )
+        
+        return response
+
+
 class RateLimitHeaderMiddleware(BaseHTTPMiddleware):
     """Add rate limit headers to responses"""
     
@@ -46,3 +86,52 @@ class RateLimitHeaderMiddleware(BaseHTTPMiddleware):
             response.headers["Retry-After"] = "3600"  # 1 hour
         
         return response
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Pin recent writers to the primary database.
+    
+    After a successful write (e.g. publishing a chapter), the author's
+    reads stay on the primary for `read_your_writes_window` seconds so
+    replica lag never hides their own changes.
+    """
+    
+    async def dispatch(self, request: Request, call_next):
+        if not settings.database_replica_urls:
+            return await call_next(request)
+        
+        user_id = _token_user_id(request)
+        request.state.read_from_primary = False
+        
+        if user_id is not None and request.method not in WRITE_METHODS:
+            try:
+                request.state.read_from_primary = bool(await redis_client.exists(f"rw_pin:{user_id}"))
+            except redis.RedisError:
+                # Can't tell if the user just wrote - stay on the primary
+                request.state.read_from_primary = True
+        
+        response = await call_next(request)
+        
+        if user_id is not None and request.method in WRITE_METHODS and response.status_code < 400:
+            try:
+                await redis_client.setex(f"rw_pin:{user_id}", settings.read_your_writes_window, 1)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to pin user {user_id} to primary: {e}")
+        
+        return response
+
+
+def _token_user_id(request: Request):
+    """User ID from the bearer token, or None for anonymous/invalid tokens"""
+    from app.auth.security import verify_token
+    
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    
+    try:
+        return verify_token(token).user_id
+    except HTTPException:
+        return None
@@ -2,7 +2,7 @@
 from app.models.user import User
 from app.models.book import Book
 from app.models.chapter import Chapter, ChapterBlock
-from app.models.study import Draft, DraftBlock, Note, Footnote
+from app.models.study import Draft, DraftBlock, DraftRevision, Note, Footnote
 from app.models.engagement import Follow, Heart, Bookmark
 from app.models.shelf import Shelf
 from app.models.margin import Margin
@@ -14,8 +14,10 @@ from app.models.between_the_lines import (
     BetweenTheLinesPin
 )
 from app.models.moderation import Block, Report
-from app.models.embedding import ChapterEmbedding, UserTasteProfile
+from app.models.embedding import ChapterEmbedding, UserTasteProfile, ThemeCentroid, ChapterNeighbors
 from app.models.notification import Notification, NotificationType
+from app.models.xp_event import XPEvent
+from app.models.facet import ChapterFacetCount
 
 __all__ = [
     "User",
@@ -24,6 +26,7 @@ __all__ = [
     "ChapterBlock",
     "Draft",
     "DraftBlock",
+    "DraftRevision",
     "Note",
     "Footnote",
     "Follow",
@@ -41,6 +44,10 @@ __all__ = [
     "Report",
     "ChapterEmbedding",
     "UserTasteProfile",
+    "ThemeCentroid",
+    "ChapterNeighbors",
     "Notification",
     "NotificationType",
+    "XPEvent",
+    "ChapterFacetCount",
 ]
@@ -1,6 +1,6 @@
 """Between the Lines models - Thread, Invite, Message, Pin"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, CheckConstraint, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -53,9 +53,13 @@ class BetweenTheLinesInvite(Base):
     """Between the Lines invite - invitation to create a connection"""
     __tablename__ = "btl_invites"
     __table_args__ = (
-        Index("ix_btl_invites_sender_id", "sender_id"),
+        Index("ix_btl_invites_sender_recipient_status", "sender_id", "recipient_id", "status"),
         Index("ix_btl_invites_recipient_id", "recipient_id"),
         Index("ix_btl_invites_status", "status"),
+        Index(
+            "uq_btl_invites_pending_pair", "sender_id", "recipient_id",
+            unique=True, postgresql_where=text("status = 'PENDING'")
+        ),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -84,7 +88,7 @@ class BetweenTheLinesMessage(Base):
     """Between the Lines message - chat message in a thread"""
     __tablename__ = "btl_messages"
     __table_args__ = (
-        Index("ix_btl_messages_thread_id", "thread_id"),
+        Index("ix_btl_messages_thread_id_created_at", "thread_id", "created_at"),
         Index("ix_btl_messages_sender_id", "sender_id"),
     )
 
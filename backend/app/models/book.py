@@ -21,6 +21,13 @@ class Book(Base):
     # Privacy settings
     is_private = Column(Boolean, default=False, nullable=False)
     
+    # Denormalized stats, maintained by app.services.book_stats
+    chapter_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_chapter_at = Column(DateTime(timezone=True), nullable=True)
+    follower_count = Column(Integer, default=0, server_default="0", nullable=False)
+    following_count = Column(Integer, default=0, server_default="0", nullable=False)
+    shelf_count = Column(Integer, default=0, server_default="0", nullable=False)  # Shelves this book is on
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -1,7 +1,8 @@
 """Chapter and ChapterBlock models"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, deferred
 import enum
 
 from app.database import Base
@@ -19,9 +20,14 @@ class BlockType(str, enum.Enum):
 class Chapter(Base):
     """Chapter model - a published post"""
     __tablename__ = "chapters"
+    __table_args__ = (
+        Index("ix_chapters_author_id_published_at", "author_id", text("published_at DESC")),
+        Index("ix_chapters_mood_published_at", "mood", text("published_at DESC")),
+        Index("ix_chapters_time_period_published_at", "time_period", text("published_at DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Content
     title = Column(String, nullable=True)
@@ -36,6 +42,17 @@ class Chapter(Base):
     heart_count = Column(Integer, default=0, nullable=False)
     theme_count = Column(Integer, default=0, nullable=False)
     
+    # Derived from blocks at publish/edit time (app.services.chapter_derived); NULL until backfilled
+    excerpt = Column(Text, nullable=True)
+    word_count = Column(Integer, nullable=True)
+    reading_time_minutes = Column(Integer, nullable=True)
+    block_summary = Column(JSON, nullable=True)  # {"text": 3, "image": 1}
+    first_image_url = Column(String, nullable=True)
+    
+    # Blocks as served to readers, written in the same transaction as the block rows
+    # (which stay the source of truth for margins). Deferred: undefer() where needed.
+    blocks_snapshot = deferred(Column(JSONB, nullable=True))
+    
     # Publishing and editing
     published_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     edit_window_expires = Column(DateTime(timezone=True), nullable=False)
@@ -60,6 +77,21 @@ class Chapter(Base):
 class ChapterBlock(Base):
     """ChapterBlock model - individual content blocks within a chapter"""
     __tablename__ = "chapter_blocks"
+    __table_args__ = (
+        # Structured content lookups (see app.chapters.queries)
+        Index(
+            "ix_chapter_blocks_content_path", "content",
+            postgresql_using="gin", postgresql_ops={"content": "jsonb_path_ops"}
+        ),
+        Index(
+            "ix_chapter_blocks_media_duration", text("((content->>'duration')::float)"),
+            postgresql_where=text("block_type IN ('AUDIO', 'VIDEO')")
+        ),
+        Index(
+            "ix_chapter_blocks_text_search", text("to_tsvector('english', content->>'text')"),
+            postgresql_using="gin", postgresql_where=text("block_type IN ('TEXT', 'QUOTE')")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     chapter_id = Column(Integer, ForeignKey("chapters.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -74,7 +106,7 @@ class ChapterBlock(Base):
     # For AUDIO: {"url": "...", "duration": 300, "title": "..."}
     # For VIDEO: {"url": "...", "duration": 180, "thumbnail": "..."}
     # For QUOTE: {"text": "...", "author": "...", "source": "..."}
-    content = Column(JSON, nullable=False)
+    content = Column(JSONB, nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -82,7 +114,7 @@ class ChapterBlock(Base):
     
     # Relationships
     chapter = relationship("Chapter", back_populates="blocks")
-    margins = relationship("Margin", back_populates="block", cascade="all, delete-orphan")
+    margins = relationship("Margin", back_populates="block", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<ChapterBlock(id={self.id}, chapter_id={self.chapter_id}, type={self.block_type}, position={self.position})>"
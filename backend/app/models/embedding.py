@@ -1,6 +1,7 @@
-"""Embedding models - ChapterEmbedding and UserTasteProfile"""
+"""Embedding models - ChapterEmbedding, UserTasteProfile, ThemeCentroid and ChapterNeighbors"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, REAL
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 
@@ -53,3 +54,48 @@ class UserTasteProfile(Base):
     
     def __repr__(self):
         return f"<UserTasteProfile(id={self.id}, user_id={self.user_id})>"
+
+
+class ThemeCentroid(Base):
+    """
+    Centroid embedding of a curated theme, for Muse theme suggestions.
+    
+    centroid is the mean of the seed (the embedded theme description, if
+    any) and the embeddings of the chapters tagged with the theme.
+    Maintained by app.muse.theme_centroids.
+    """
+    __tablename__ = "theme_centroids"
+
+    theme_id = Column(Integer, ForeignKey("themes.id", ondelete="CASCADE"), primary_key=True)
+    
+    seed = Column(Vector(1536), nullable=True)  # Embedding of "name: description"
+    centroid = Column(Vector(1536), nullable=False)
+    chapter_count = Column(Integer, default=0, server_default="0", nullable=False)  # Chapters in the mean
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    
+    def __repr__(self):
+        return f"<ThemeCentroid(theme_id={self.theme_id}, chapter_count={self.chapter_count})>"
+
+
+class ChapterNeighbors(Base):
+    """
+    Precomputed nearest neighbours of a chapter, for "more like this".
+    
+    neighbor_ids and scores (cosine similarity) are parallel arrays, most
+    similar first. Maintained by app.muse.related_chapters; ids of deleted
+    chapters may linger until the next rebuild and are dropped on read.
+    """
+    __tablename__ = "chapter_neighbors"
+
+    chapter_id = Column(Integer, ForeignKey("chapters.id", ondelete="CASCADE"), primary_key=True)
+    
+    neighbor_ids = Column(ARRAY(Integer), nullable=False)
+    scores = Column(ARRAY(REAL), nullable=False)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    
+    def __repr__(self):
+        return f"<ChapterNeighbors(chapter_id={self.chapter_id}, neighbors={len(self.neighbor_ids or [])})>"
@@ -11,7 +11,6 @@ class Follow(Base):
     __tablename__ = "follows"
     __table_args__ = (
         UniqueConstraint("follower_id", "followed_id", name="uq_follow_relationship"),
-        Index("ix_follows_follower_id", "follower_id"),
         Index("ix_follows_followed_id", "followed_id"),
     )
 
@@ -35,7 +34,6 @@ class Heart(Base):
     __tablename__ = "hearts"
     __table_args__ = (
         UniqueConstraint("user_id", "chapter_id", name="uq_heart_user_chapter"),
-        Index("ix_hearts_user_id", "user_id"),
         Index("ix_hearts_chapter_id", "chapter_id"),
     )
 
@@ -59,7 +57,6 @@ class Bookmark(Base):
     __tablename__ = "bookmarks"
     __table_args__ = (
         UniqueConstraint("user_id", "chapter_id", name="uq_bookmark_user_chapter"),
-        Index("ix_bookmarks_user_id", "user_id"),
         Index("ix_bookmarks_chapter_id", "chapter_id"),
     )
 
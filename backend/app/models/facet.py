@@ -0,0 +1,29 @@
+"""Facet count model - maintained chapter counts for faceted browse"""
+from sqlalchemy import Column, Integer, String, Index
+
+from app.database import Base
+
+
+class ChapterFacetCount(Base):
+    """
+    Chapters per (mood, time_period, theme) combination.
+    
+    Every chapter is counted once under theme_id 0 ("any theme") and once
+    per theme it is tagged with; a missing mood or time period is ''.
+    Summing rows answers any combination of browse filters, and grouping
+    them gives the per-value counts. Maintained by
+    app.services.facet_counts.
+    """
+    __tablename__ = "chapter_facet_counts"
+    __table_args__ = (
+        Index("ix_chapter_facet_counts_mood_time_period", "mood", "time_period"),
+    )
+
+    theme_id = Column(Integer, primary_key=True)  # 0 = any theme; no FK, the repair job drops stale themes
+    mood = Column(String, primary_key=True)
+    time_period = Column(String, primary_key=True)
+    chapter_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    def __repr__(self):
+        return (f"<ChapterFacetCount(theme_id={self.theme_id}, mood='{self.mood}', "
+                f"time_period='{self.time_period}', chapter_count={self.chapter_count})>")
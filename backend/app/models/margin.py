@@ -10,7 +10,7 @@ class Margin(Base):
     """Margin model - comments on chapters"""
     __tablename__ = "margins"
     __table_args__ = (
-        Index("ix_margins_chapter_id", "chapter_id"),
+        Index("ix_margins_chapter_id_created_at", "chapter_id", "created_at"),
         Index("ix_margins_author_id", "author_id"),
     )
 
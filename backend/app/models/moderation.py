@@ -20,7 +20,6 @@ class Block(Base):
     __tablename__ = "blocks"
     __table_args__ = (
         UniqueConstraint("blocker_id", "blocked_id", name="uq_block_relationship"),
-        Index("ix_blocks_blocker_id", "blocker_id"),
         Index("ix_blocks_blocked_id", "blocked_id"),
     )
 
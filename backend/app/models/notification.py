@@ -1,5 +1,5 @@
 """Notification model - rare, human, meaningful"""
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -27,9 +27,12 @@ class Notification(Base):
     - No hearts, no follower changes, no performance stats
     """
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_read_created_at", "user_id", "read", text("created_at DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     type = Column(SQLEnum(NotificationType), nullable=False)
     
     # Human-readable message (pre-formatted)
@@ -43,7 +46,7 @@ class Notification(Base):
     actor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)  # Who triggered it
     
     # State
-    read = Column(Boolean, default=False, nullable=False, index=True)
+    read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     
     # Relationships
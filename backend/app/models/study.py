@@ -1,6 +1,10 @@
-"""Study models - Draft, DraftBlock, Note, Footnote"""
+"""Study models - Draft, DraftBlock, DraftRevision, Note, Footnote"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, ARRAY
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Enum, JSON, ARRAY,
+    Boolean, LargeBinary, UniqueConstraint
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -22,6 +26,9 @@ class Draft(Base):
     theme = Column(String, nullable=True)
     time_period = Column(String, nullable=True)
     
+    # Autosave revision, bumped on every save (optimistic concurrency)
+    revision = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -30,6 +37,7 @@ class Draft(Base):
     author = relationship("User", back_populates="drafts")
     blocks = relationship("DraftBlock", back_populates="draft", cascade="all, delete-orphan", order_by="DraftBlock.position")
     footnotes = relationship("Footnote", back_populates="draft", cascade="all, delete-orphan")
+    revisions = relationship("DraftRevision", back_populates="draft", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Draft(id={self.id}, title='{self.title}', author_id={self.author_id})>"
@@ -47,7 +55,7 @@ class DraftBlock(Base):
     block_type = Column(Enum(BlockType), nullable=False)
     
     # Content stored as JSONB (same structure as ChapterBlock)
-    content = Column(JSON, nullable=False)
+    content = Column(JSONB, nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -55,12 +63,42 @@ class DraftBlock(Base):
     
     # Relationships
     draft = relationship("Draft", back_populates="blocks")
-    footnotes = relationship("Footnote", back_populates="draft_block", cascade="all, delete-orphan")
+    footnotes = relationship("Footnote", back_populates="draft_block", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<DraftBlock(id={self.id}, draft_id={self.draft_id}, type={self.block_type}, position={self.position})>"
 
 
+class DraftRevision(Base):
+    """
+    DraftRevision model - one saved revision of a draft.
+    
+    Every few revisions a full snapshot is stored; the rest are forward
+    deltas from the previous revision. Payloads are zlib-compressed JSON
+    (see app.study.history).
+    """
+    __tablename__ = "draft_revisions"
+    __table_args__ = (
+        UniqueConstraint("draft_id", "revision", name="uq_draft_revision"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    draft_id = Column(Integer, ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False)
+    revision = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    
+    # Relationships
+    draft = relationship("Draft", back_populates="revisions")
+    
+    def __repr__(self):
+        kind = "snapshot" if self.is_snapshot else "delta"
+        return f"<DraftRevision(draft_id={self.draft_id}, revision={self.revision}, {kind})>"
+
+
 class Note(Base):
     """Note model - private notes and fragments in Note Nook"""
     __tablename__ = "notes"
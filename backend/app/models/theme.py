@@ -1,6 +1,6 @@
 """Theme models - Curated themes for discovery"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Index, func
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -35,6 +35,12 @@ class Theme(Base):
     # Emoji/icon for visual identity
     emoji = Column(String(10), nullable=True)  # "🌊", "✨", "🕯️"
     
+    # Maintained stats, see app.services.theme_stats
+    chapter_count = Column(Integer, default=0, server_default="0", nullable=False)
+    recent_chapter_count = Column(Integer, default=0, server_default="0", nullable=False)  # published >= recent_since
+    recent_since = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_chapter_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     
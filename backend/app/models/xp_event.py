@@ -0,0 +1,31 @@
+"""XP ledger model - append-only record of every XP award"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, text
+
+from app.database import Base
+
+
+class XPEvent(Base):
+    """
+    One XP award.
+    
+    Rows are never updated except to stamp applied_at when the aggregator
+    folds them into users.muse_xp / users.muse_level.
+    """
+    __tablename__ = "xp_events"
+    __table_args__ = (
+        Index("ix_xp_events_user_id_id", "user_id", "id"),
+        Index("ix_xp_events_unapplied", "id", postgresql_where=text("applied_at IS NULL")),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    action = Column(String, nullable=False)  # XP_REWARDS key, or "baseline" for pre-ledger XP
+    xp = Column(Integer, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    applied_at = Column(DateTime(timezone=True), nullable=True)  # Set once folded into muse_xp
+    
+    def __repr__(self):
+        return f"<XPEvent(user_id={self.user_id}, action='{self.action}', xp={self.xp})>"
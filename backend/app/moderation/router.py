@@ -1,13 +1,14 @@
 """Moderation routes - Blocking and reporting"""
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, delete
 from typing import List
 
 from app.database import get_db
 from app.models import User, Block, Report, Follow, Book, Chapter, Margin
 from app.auth.security import get_current_user
 from app.moderation.schemas import BlockResponse, ReportCreate, ReportResponse
+from app.services.book_stats import follows_changed
 
 router = APIRouter(prefix="/moderation", tags=["Moderation"])
 
@@ -63,12 +64,15 @@ async def block_user(
     db.add(block)
     
     # Remove follow relationships in both directions
-    db.query(Follow).filter(
-        or_(
-            and_(Follow.follower_id == current_user.id, Follow.followed_id == user_id),
-            and_(Follow.follower_id == user_id, Follow.followed_id == current_user.id)
-        )
-    ).delete()
+    removed = db.execute(
+        delete(Follow).where(
+            or_(
+                and_(Follow.follower_id == current_user.id, Follow.followed_id == user_id),
+                and_(Follow.follower_id == user_id, Follow.followed_id == current_user.id)
+            )
+        ).returning(Follow.follower_id, Follow.followed_id)
+    ).all()
+    follows_changed(db, [tuple(row) for row in removed], -1)
     
     db.commit()
     db.refresh(block)
@@ -7,6 +7,7 @@ from datetime import datetime, timezone, timedelta
 
 from app.config import settings
 from app.models import Chapter, ChapterEmbedding, UserTasteProfile, User
+from app.muse.related_chapters import add_chapter_to_graph
 
 # Initialize OpenAI client
 client = OpenAI(api_key=settings.openai_api_key)
@@ -70,6 +71,14 @@ async def generate_chapter_embedding(chapter: Chapter, db: Session) -> List[floa
         db.add(chapter_embedding)
         db.commit()
         
+        # Link it into the related-chapters graph (update_chapter_graph retries on failure)
+        try:
+            add_chapter_to_graph(db, chapter.id, embedding)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  Failed to add chapter {chapter.id} to the related graph: {e}")
+        
         return embedding
     
     except Exception as e:
@@ -0,0 +1,214 @@
+"""
+Related chapters from a precomputed nearest-neighbour graph
+
+chapter_neighbors holds the related_chapters_k most similar chapters of
+every embedded chapter (cosine similarity of their embeddings), so "more
+like this" on a chapter page is a single primary-key lookup instead of a
+vector search per view.
+
+- build_chapter_graph recomputes the whole graph exactly: it loads every
+  embedding into one L2-normalized float32 matrix and scores
+  related_chapters_block_size chapters at a time against all of them
+  (one matrix product per block, top-k by argpartition). Memory is about
+  6 KB per chapter for the matrix plus block size x chapters x 4 bytes
+  for the scores.
+- add_chapter_to_graph inserts one newly embedded chapter: its neighbours
+  come from the HNSW index on chapter_embeddings, and it is merged into
+  the lists of those neighbours it is closer to than their current last
+  entry. generate_chapter_embedding calls it right after storing the
+  embedding; update_chapter_graph catches up on chapters it missed.
+
+The graph is approximate between rebuilds: incremental inserts use the
+ANN index, and neighbours a new chapter would displace beyond its own
+k-list are only found by the next rebuild. Deleted chapters cascade out
+of their own row and are dropped from other lists when read.
+"""
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ChapterEmbedding, ChapterNeighbors
+from app.scheduler import register_job
+
+LOAD_BATCH_SIZE = 10000  # Embeddings fetched per query when loading the matrix
+
+Neighbors = tuple[int, list[int], list[float]]  # (chapter_id, neighbor ids, scores)
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _load_embeddings(db: Session) -> tuple[np.ndarray, np.ndarray]:
+    """(chapter_ids, matrix) of every chapter embedding, rows L2-normalized"""
+    chapter_ids, blocks = [], []
+    after = 0
+    while True:
+        rows = db.query(ChapterEmbedding.chapter_id, ChapterEmbedding.embedding).filter(
+            ChapterEmbedding.chapter_id > after
+        ).order_by(ChapterEmbedding.chapter_id).limit(LOAD_BATCH_SIZE).all()
+        if not rows:
+            break
+        chapter_ids.extend(row.chapter_id for row in rows)
+        blocks.append(_normalized(np.array([row.embedding for row in rows], dtype=np.float32)))
+        after = rows[-1].chapter_id
+
+    if not blocks:
+        return np.empty(0, dtype=np.int64), np.empty((0, 1536), dtype=np.float32)
+    return np.array(chapter_ids, dtype=np.int64), np.vstack(blocks)
+
+
+def top_k_neighbors(chapter_ids: np.ndarray, matrix: np.ndarray, k: int, block_size: int) -> Iterator[Neighbors]:
+    """
+    Exact k nearest neighbours of every row of a normalized matrix, most
+    similar first, scoring `block_size` rows per matrix product.
+    """
+    count = len(chapter_ids)
+    k = min(k, count - 1)
+    for start in range(0, count, block_size):
+        block = matrix[start:start + block_size]
+        rows = np.arange(len(block))
+        scores = block @ matrix.T
+        scores[rows, start + rows] = -np.inf  # Not its own neighbour
+
+        if k <= 0:
+            for i in rows:
+                yield int(chapter_ids[start + i]), [], []
+            continue
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for i in rows:
+            yield (
+                int(chapter_ids[start + i]),
+                chapter_ids[top[i]].tolist(),
+                [round(float(score), 4) for score in top_scores[i]],
+            )
+
+
+def _store(db: Session, neighbors: list[Neighbors]) -> None:
+    if not neighbors:
+        return
+    db.execute(text("""
+        INSERT INTO chapter_neighbors (chapter_id, neighbor_ids, scores, updated_at)
+        VALUES (:chapter_id, :neighbor_ids, :scores, now())
+        ON CONFLICT (chapter_id) DO UPDATE
+        SET neighbor_ids = EXCLUDED.neighbor_ids, scores = EXCLUDED.scores, updated_at = EXCLUDED.updated_at
+    """), [
+        {"chapter_id": chapter_id, "neighbor_ids": neighbor_ids, "scores": scores}
+        for chapter_id, neighbor_ids, scores in neighbors
+    ])
+
+
+def _merged(
+    neighbor_ids: list[int],
+    scores: list[float],
+    chapter_id: int,
+    score: float,
+    k: int
+) -> Optional[tuple[list[int], list[float]]]:
+    """A neighbour list with `chapter_id` inserted by score, or None if it does not make the top k"""
+    pairs = [(s, n) for n, s in zip(neighbor_ids, scores) if n != chapter_id]
+    if len(pairs) >= k and score <= pairs[k - 1][0]:
+        return None
+    pairs.append((score, chapter_id))
+    pairs.sort(key=lambda pair: -pair[0])
+    pairs = pairs[:k]
+    return [n for _, n in pairs], [s for s, _ in pairs]
+
+
+def add_chapter_to_graph(db: Session, chapter_id: int, embedding) -> int:
+    """
+    Give a newly embedded chapter its neighbour list (from the HNSW index)
+    and add it to the lists of chapters it now ranks in. The caller commits.
+
+    Returns:
+        Number of other chapters' lists it was added to
+    """
+    k = settings.related_chapters_k
+    distance = ChapterEmbedding.embedding.cosine_distance(embedding)
+    rows = db.query(ChapterEmbedding.chapter_id, distance.label("distance")).filter(
+        ChapterEmbedding.chapter_id != chapter_id
+    ).order_by(distance).limit(k).all()
+
+    scores = {row.chapter_id: round(1 - float(row.distance), 4) for row in rows}
+    _store(db, [(chapter_id, list(scores), list(scores.values()))])
+    if not scores:
+        return 0
+
+    # Reverse edges, locked in id order so concurrent inserts cannot deadlock
+    updated = 0
+    for row in db.query(ChapterNeighbors).filter(
+        ChapterNeighbors.chapter_id.in_(list(scores))
+    ).order_by(ChapterNeighbors.chapter_id).with_for_update():
+        merged = _merged(row.neighbor_ids, row.scores, chapter_id, scores[row.chapter_id], k)
+        if merged is not None:
+            row.neighbor_ids, row.scores = merged
+            updated += 1
+    return updated
+
+
+def get_related_ids(db: Session, chapter_id: int) -> list[int]:
+    """Stored neighbour ids of a chapter, most similar first (empty until it is embedded)"""
+    neighbor_ids = db.query(ChapterNeighbors.neighbor_ids).filter(
+        ChapterNeighbors.chapter_id == chapter_id
+    ).scalar()
+    return list(neighbor_ids or [])
+
+
+@register_job("build_chapter_graph", interval=settings.related_chapters_rebuild_interval)
+def build_chapter_graph(db: Session) -> dict:
+    """Recompute every chapter's neighbour list exactly, one block of chapters at a time"""
+    started = datetime.now(timezone.utc)
+    chapter_ids, matrix = _load_embeddings(db)
+
+    batch = []
+    for neighbors in top_k_neighbors(chapter_ids, matrix, settings.related_chapters_k, settings.related_chapters_block_size):
+        batch.append(neighbors)
+        if len(batch) == settings.related_chapters_block_size:
+            _store(db, batch)
+            db.commit()  # One short transaction per block
+            batch = []
+    _store(db, batch)
+
+    # Rows of chapters whose embedding is gone (e.g. regenerated under a new model)
+    removed = db.execute(text("""
+        DELETE FROM chapter_neighbors n
+        WHERE NOT EXISTS (SELECT 1 FROM chapter_embeddings e WHERE e.chapter_id = n.chapter_id)
+    """)).rowcount
+    db.commit()
+
+    # Chapters embedded while the matrix was being scored
+    late = db.query(ChapterEmbedding.chapter_id, ChapterEmbedding.embedding).filter(
+        ChapterEmbedding.created_at >= started
+    ).all()
+    for row in late:
+        add_chapter_to_graph(db, row.chapter_id, row.embedding)
+        db.commit()
+
+    return {"chapters": len(chapter_ids), "late": len(late), "removed": removed}
+
+
+@register_job("update_chapter_graph", interval=settings.related_chapters_update_interval)
+def update_chapter_graph(db: Session, limit: int = 1000) -> dict:
+    """Insert embedded chapters that have no neighbour list yet"""
+    rows = db.query(ChapterEmbedding.chapter_id, ChapterEmbedding.embedding).outerjoin(
+        ChapterNeighbors, ChapterNeighbors.chapter_id == ChapterEmbedding.chapter_id
+    ).filter(
+        ChapterNeighbors.chapter_id.is_(None)
+    ).order_by(ChapterEmbedding.chapter_id).limit(limit).all()
+
+    for row in rows:
+        add_chapter_to_graph(db, row.chapter_id, row.embedding)
+        db.commit()
+
+    return {"inserted": len(rows)}
@@ -0,0 +1,248 @@
+"""
+Theme centroid embeddings for Muse theme suggestions
+
+Each curated theme has a centroid: the mean of its seed (the embedded
+"name: description", see scripts/seed_theme_centroids.py) and the
+embeddings of the chapters tagged with it. Every worker holds all
+centroids as one L2-normalized matrix, so suggesting themes for a
+chapter is a single matrix-vector product over a few dozen rows.
+
+Tagging a chapter folds its embedding into the theme's centroid (and
+untagging takes it out) in the same transaction; a periodic job
+recomputes every centroid from scratch, which also covers deleted
+chapters and embeddings generated after tagging. The in-memory matrix is
+version-stamped in Redis like the theme catalog.
+"""
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import redis
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.events import subscribe, CHAPTER_THEMES_CHANGED
+from app.logging_config import logger
+from app.models import ChapterEmbedding, Theme, ThemeCentroid
+from app.scheduler import register_job
+
+redis_client = redis.from_url(settings.redis_url)
+
+VERSION_KEY = "theme_centroids:version"
+
+_lock = threading.Lock()
+_snapshot = {
+    "theme_ids": None,  # np.ndarray of theme ids, one per matrix row
+    "matrix": None,     # float32, rows L2-normalized
+    "version": None,
+    "loaded_at": 0.0,
+    "checked_at": 0.0,
+}
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _remote_version() -> Optional[int]:
+    try:
+        value = redis_client.get(VERSION_KEY)
+    except redis.RedisError:
+        return None
+    return int(value) if value is not None else 0
+
+
+def _load(db: Session) -> tuple[np.ndarray, np.ndarray]:
+    rows = db.query(ThemeCentroid.theme_id, ThemeCentroid.centroid).order_by(ThemeCentroid.theme_id).all()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, 1536), dtype=np.float32)
+    theme_ids = np.array([row.theme_id for row in rows], dtype=np.int64)
+    matrix = _normalized(np.array([row.centroid for row in rows], dtype=np.float32))
+    return theme_ids, matrix
+
+
+def get_centroid_matrix(db: Session) -> tuple[np.ndarray, np.ndarray]:
+    """(theme_ids, matrix) from this worker's snapshot; do not mutate them"""
+    now = time.monotonic()
+    with _lock:
+        loaded = _snapshot["matrix"] is not None
+        fresh = loaded and now - _snapshot["loaded_at"] < settings.theme_catalog_max_age
+        if fresh and now - _snapshot["checked_at"] < settings.theme_catalog_check_interval:
+            return _snapshot["theme_ids"], _snapshot["matrix"]
+        version = _snapshot["version"]
+
+    remote = _remote_version()
+    if fresh and remote is not None and remote == version:
+        with _lock:
+            _snapshot["checked_at"] = now
+            return _snapshot["theme_ids"], _snapshot["matrix"]
+
+    theme_ids, matrix = _load(db)
+    with _lock:
+        _snapshot.update(theme_ids=theme_ids, matrix=matrix, version=remote, loaded_at=now, checked_at=now)
+    return theme_ids, matrix
+
+
+def suggest_themes(
+    db: Session,
+    embedding: np.ndarray,
+    exclude_theme_ids: Iterable[int] = (),
+    limit: int = 3
+) -> list[tuple[int, float]]:
+    """
+    Themes whose centroids are closest to a chapter embedding.
+
+    Returns:
+        Up to `limit` (theme_id, cosine similarity) pairs at or above
+        theme_suggestion_min_score, best first
+    """
+    theme_ids, matrix = get_centroid_matrix(db)
+    if not len(theme_ids):
+        return []
+
+    scores = matrix @ _normalized(np.asarray(embedding, dtype=np.float32))
+    scores[np.isin(theme_ids, list(exclude_theme_ids))] = -np.inf
+
+    best = np.argsort(-scores)[:limit]
+    return [
+        (int(theme_ids[i]), round(float(scores[i]), 4))
+        for i in best
+        if scores[i] >= settings.theme_suggestion_min_score
+    ]
+
+
+def _weight(centroid: ThemeCentroid) -> int:
+    """Vectors averaged into a centroid (the seed counts as one)"""
+    return centroid.chapter_count + (1 if centroid.seed is not None else 0)
+
+
+# Vectors averaged into an existing row (the seed counts as one), for SQL
+_WEIGHT_SQL = "(t.chapter_count + CASE WHEN t.seed IS NULL THEN 0 ELSE 1 END)"
+
+# Incremental mean (centroid * weight + vector) / (weight + 1); pgvector has
+# no vector-by-scalar product, so the factors are filled into vectors.
+_TAG_UPSERT = text(f"""
+    INSERT INTO theme_centroids AS t (theme_id, centroid, chapter_count)
+    VALUES (:theme_id, :vector, 1)
+    ON CONFLICT (theme_id) DO UPDATE SET
+        centroid = t.centroid
+            * array_fill(CAST({_WEIGHT_SQL} AS real) / ({_WEIGHT_SQL} + 1), ARRAY[vector_dims(t.centroid)])::vector
+            + EXCLUDED.centroid
+            * array_fill(CAST(1 AS real) / ({_WEIGHT_SQL} + 1), ARRAY[vector_dims(t.centroid)])::vector,
+        chapter_count = t.chapter_count + 1
+""").bindparams(bindparam("vector", type_=Vector(1536)))
+
+
+def chapter_tagged(db: Session, theme_id: int, chapter_id: int) -> None:
+    """
+    Fold a newly tagged chapter's embedding into the theme centroid. A
+    single upsert, so concurrent first tags of a theme cannot both insert.
+    """
+    vector = db.query(ChapterEmbedding.embedding).filter(ChapterEmbedding.chapter_id == chapter_id).scalar()
+    if vector is None:
+        return  # Not embedded yet; the refresh job picks it up
+
+    db.execute(_TAG_UPSERT, {"theme_id": theme_id, "vector": np.asarray(vector, dtype=np.float32)})
+
+
+def chapter_untagged(db: Session, theme_id: int, chapter_id: int) -> None:
+    """Take an untagged chapter's embedding back out of the theme centroid"""
+    vector = db.query(ChapterEmbedding.embedding).filter(ChapterEmbedding.chapter_id == chapter_id).scalar()
+    centroid = db.query(ThemeCentroid).filter(ThemeCentroid.theme_id == theme_id).with_for_update().first()
+    if vector is None or centroid is None or centroid.chapter_count == 0:
+        return
+
+    weight = _weight(centroid)
+    centroid.chapter_count -= 1
+    if weight == 1:
+        db.delete(centroid)  # That chapter was all there was
+    else:
+        vector = np.asarray(vector, dtype=np.float32)
+        centroid.centroid = (np.asarray(centroid.centroid, dtype=np.float32) * weight - vector) / (weight - 1)
+
+
+def bump_centroid_version() -> None:
+    """Mark every worker's matrix stale (this worker's immediately)"""
+    with _lock:
+        _snapshot["matrix"] = None
+    try:
+        redis_client.incr(VERSION_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Theme centroid version bump failed: {e}")
+
+
+@register_job("refresh_theme_centroids", interval=settings.theme_centroid_refresh_interval)
+def refresh_theme_centroids(db: Session) -> dict:
+    """Recompute every centroid from its seed and its tagged chapters' embeddings"""
+    means = {
+        row.theme_id: (np.asarray(row.mean, dtype=np.float32), row.count)
+        for row in db.execute(text("""
+            SELECT ct.theme_id, AVG(ce.embedding) AS mean, COUNT(*) AS count
+            FROM chapter_themes ct JOIN chapter_embeddings ce ON ce.chapter_id = ct.chapter_id
+            GROUP BY ct.theme_id
+        """).columns(theme_id=Integer, mean=Vector(1536), count=Integer)).all()
+    }
+    centroids = {centroid.theme_id: centroid for centroid in db.query(ThemeCentroid).all()}
+
+    for theme_id in set(means) | set(centroids):
+        mean, count = means.get(theme_id, (None, 0))
+        centroid = centroids.get(theme_id)
+        seed = np.asarray(centroid.seed, dtype=np.float32) if centroid is not None and centroid.seed is not None else None
+
+        if mean is None and seed is None:
+            db.delete(centroid)
+            continue
+
+        vectors = ([seed] if seed is not None else []) + ([mean * count] if mean is not None else [])
+        value = np.sum(vectors, axis=0) / ((1 if seed is not None else 0) + count)
+        if centroid is None:
+            db.add(ThemeCentroid(theme_id=theme_id, centroid=value, chapter_count=count))
+        else:
+            centroid.centroid = value
+            centroid.chapter_count = count
+
+    db.commit()
+    bump_centroid_version()
+    return {"themes": len(set(means) | set(centroids))}
+
+
+def seed_theme_centroids(db: Session, embed: Callable[[list[str]], list[list[float]]], reseed: bool = False) -> int:
+    """
+    Embed themes' "name: description" as their centroid seeds.
+
+    Args:
+        embed: Returns one embedding per input text
+        reseed: Also replace existing seeds (after descriptions change)
+
+    Returns:
+        Number of themes seeded
+    """
+    centroids = {centroid.theme_id: centroid for centroid in db.query(ThemeCentroid).all()}
+    themes = [
+        theme for theme in db.query(Theme).order_by(Theme.id).all()
+        if reseed or theme.id not in centroids or centroids[theme.id].seed is None
+    ]
+    if not themes:
+        return 0
+
+    vectors = embed([f"{theme.name}: {theme.description or theme.name}" for theme in themes])
+    for theme, vector in zip(themes, vectors):
+        vector = np.asarray(vector, dtype=np.float32)
+        centroid = centroids.get(theme.id)
+        if centroid is None:
+            db.add(ThemeCentroid(theme_id=theme.id, seed=vector, centroid=vector, chapter_count=0))
+        else:
+            centroid.seed = vector
+
+    db.commit()
+    refresh_theme_centroids(db)  # Blend the seeds into the centroids
+    return len(themes)
+
+
+@subscribe(CHAPTER_THEMES_CHANGED)
+def _on_themes_changed(payload: dict) -> None:
+    bump_centroid_version()
@@ -3,9 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models import User, Book
+from app.models import User, Book, Chapter
 from app.auth.security import get_current_user
 from app.privacy.schemas import BookPrivacyUpdate, BookResponse
+from app.events import emit, BOOK_PRIVACY_CHANGED
 
 router = APIRouter(prefix="/privacy", tags=["Privacy"])
 
@@ -49,7 +50,14 @@ async def update_book_privacy(
             detail="Book not found"
         )
     
-    book.is_private = privacy_data.is_private
+    if book.is_private != privacy_data.is_private:
+        book.is_private = privacy_data.is_private
+        chapter_ids = [
+            chapter_id for (chapter_id,) in
+            db.query(Chapter.id).filter(Chapter.author_id == current_user.id)
+        ]
+        emit(db, BOOK_PRIVACY_CHANGED, author_id=current_user.id, chapter_ids=chapter_ids)
+    
     db.commit()
     db.refresh(book)
     
@@ -0,0 +1,111 @@
+"""Per-request SQL query statistics and N+1 detection"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.slow_queries import record_slow_query
+
+# Collapse expanded IN-lists and whitespace so repeated shapes compare equal
+_IN_LIST = re.compile(r"\((?:%\(\w+\)s|\?|\$\d+)(?:\s*,\s*(?:%\(\w+\)s|\?|\$\d+))*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement to its shape (parameters already unbound)"""
+    shape = _IN_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statement count, total DB time and statement shapes for one scope"""
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes that ran more than `threshold` times (likely N+1)"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+# Stats for the request being handled (set by QueryStatsMiddleware)
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Process-wide captures opened by count_queries() (used by tests)
+_captures: list[QueryStats] = []
+
+
+def start_request_stats(route: Optional[str] = None) -> tuple[QueryStats, object]:
+    """Begin collecting stats for the current request"""
+    stats = QueryStats(route)
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(token) -> None:
+    _request_stats.reset(token)
+
+
+def current_request_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    for capture in _captures:
+        capture.record(statement, duration)
+
+    if duration * 1000 >= settings.slow_query_threshold_ms:
+        record_slow_query(conn, statement, parameters, duration, stats.route if stats else None)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count every statement executed while the block runs.
+
+    Works across threads (e.g. requests made through TestClient).
+    """
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(budget: int):
+    """Fail if the block executes more than `budget` statements"""
+    with count_queries() as stats:
+        yield stats
+
+    if stats.count > budget:
+        shapes = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common(5))
+        raise AssertionError(
+            f"Expected at most {budget} queries, got {stats.count}. Most frequent:\n{shapes}"
+        )
@@ -0,0 +1,185 @@
+"""
+Periodic background jobs
+
+Jobs register with @register_job and run inside the API process on an
+interval (started from the app lifespan). Each job's last start time is
+kept in Redis (job_last_run:<name>) and claimed atomically, so one worker
+runs it per interval, and a job that came due while workers were
+restarting runs at startup instead of waiting another full interval.
+While a job runs, its worker also holds job_running:<name> (refreshed
+until the run ends), so a run that outlasts its interval is never joined
+by a second copy.
+
+Run a job once from the command line (e.g. from cron):
+
+    python scripts/run_job.py <name>
+"""
+import asyncio
+import importlib
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import redis
+from redis.exceptions import LockError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.logging_config import logger
+
+redis_client = redis.from_url(settings.redis_url)
+
+# Modules whose jobs are loaded by load_jobs()
+JOB_MODULES = [
+    "app.services.heart_counters",
+    "app.services.muse_progression",
+    "app.services.book_stats",
+    "app.services.theme_stats",
+    "app.services.theme_lists",
+    "app.services.facet_counts",
+    "app.services.suggest_index",
+    "app.muse.theme_centroids",
+    "app.muse.related_chapters",
+    "app.study.history",
+]
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[Session], object]
+    interval: float  # seconds
+
+
+JOBS: dict[str, Job] = {}
+
+
+def register_job(name: str, interval: float):
+    """Register func(db) to run every `interval` seconds"""
+    def decorator(func):
+        JOBS[name] = Job(name=name, func=func, interval=interval)
+        return func
+    return decorator
+
+
+def load_jobs() -> dict[str, Job]:
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+    return JOBS
+
+
+def run_job(name: str):
+    """Run one job with its own session"""
+    job = JOBS[name]
+    db = SessionLocal()
+    try:
+        return job.func(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+LAST_RUN_PREFIX = "job_last_run:"
+
+# Record ARGV[1] (now) as the last run if the previous one was at least
+# ARGV[2] seconds ago; returns 1 if this caller claimed the run
+_CLAIM_RUN = redis_client.register_script("""
+local last = redis.call('GET', KEYS[1])
+if last and tonumber(ARGV[1]) - tonumber(last) < tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return 1
+""")
+
+
+def _seconds_until_due(job: Job) -> float:
+    """Time until the job's next run (0 if it has never run or is overdue)"""
+    try:
+        last = redis_client.get(f"{LAST_RUN_PREFIX}{job.name}")
+    except redis.RedisError:
+        return job.interval
+    if last is None:
+        return 0.0
+    return max(float(last) + job.interval - time.time(), 0.0)
+
+
+def _claim(job: Job) -> bool:
+    """Claim this interval's run across workers (runs anyway if Redis is down)"""
+    try:
+        # 10% slack absorbs clock skew between workers
+        return bool(_CLAIM_RUN(keys=[f"{LAST_RUN_PREFIX}{job.name}"], args=[time.time(), job.interval * 0.9]))
+    except redis.RedisError:
+        return True
+
+
+RUNNING_PREFIX = "job_running:"
+RUNNING_LOCK_TIMEOUT = 60  # seconds; refreshed every third of this while the job runs
+
+
+def _running_lock(job: Job):
+    # Not thread-local: acquired, refreshed and released from different threads
+    return redis_client.lock(f"{RUNNING_PREFIX}{job.name}", timeout=RUNNING_LOCK_TIMEOUT, thread_local=False)
+
+
+def _acquire_running(lock) -> bool:
+    """Take the job's running lock (runs anyway if Redis is down)"""
+    try:
+        return lock.acquire(blocking=False)
+    except redis.RedisError:
+        return True
+
+
+def _release_running(lock) -> None:
+    try:
+        lock.release()
+    except (LockError, redis.RedisError):
+        pass  # Expired or unreachable; it times out on its own
+
+
+async def _keep_running_lock(job: Job, lock) -> None:
+    while True:
+        await asyncio.sleep(RUNNING_LOCK_TIMEOUT / 3)
+        try:
+            await asyncio.to_thread(lock.reacquire)
+        except (LockError, redis.RedisError) as e:
+            logger.warning(f"Job {job.name} could not refresh its running lock: {e}")
+
+
+async def _run_periodically(job: Job) -> None:
+    while True:
+        await asyncio.sleep(await asyncio.to_thread(_seconds_until_due, job))
+
+        lock = _running_lock(job)
+        if not await asyncio.to_thread(_acquire_running, lock):
+            # Still running elsewhere, possibly past its interval; check again later
+            await asyncio.sleep(min(job.interval, RUNNING_LOCK_TIMEOUT))
+            continue
+        try:
+            if not await asyncio.to_thread(_claim, job):
+                continue  # Another worker ran it; sleep until the next one is due
+            refresh = asyncio.create_task(_keep_running_lock(job, lock))
+            try:
+                result = await asyncio.to_thread(run_job, job.name)
+                logger.debug(f"Job {job.name} finished: {result}")
+            except Exception as e:
+                logger.error(f"Job {job.name} failed: {e}", exc_info=True)
+            finally:
+                refresh.cancel()
+        finally:
+            await asyncio.to_thread(_release_running, lock)
+
+
+def start_scheduler() -> list[asyncio.Task]:
+    if not settings.scheduler_enabled:
+        return []
+    return [asyncio.create_task(_run_periodically(job)) for job in load_jobs().values()]
+
+
+async def stop_scheduler(tasks: list[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,29 +1,119 @@
 """Search routes - Chapters and Themes"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, or_, and_, select, exists
 from typing import List, Optional
 
-from app.database import get_db
-from app.models import User, Chapter, Theme, Book, chapter_themes
+from app.database import get_db, get_read_db
+from app.models import User, Chapter, ChapterEmbedding, Theme, Book, Follow, Block, chapter_themes
+from app.models.chapter import BlockType
+from app.chapters.queries import (
+    MEDIA_BLOCK_TYPES, quote_by, media_longer_than, block_text_matches, chapters_with_blocks
+)
 from app.auth.security import get_current_user
+from app.services.heart_counters import current_heart_counts
+from app.events import emit, CHAPTER_THEMES_CHANGED
+from app.engagement.service import get_engagement_states
+from app.services.theme_catalog import get_themes, get_theme_by_slug
+from app.services.theme_stats import themes_added, themes_removed
+from app.services.theme_lists import get_theme_page
+from app.services.facet_counts import facet_keys, facet_counts_changed, get_facet_counts
+from app.services.suggest_index import suggest
+from app.services.search_cache import cached_page, normalize_query
+from app.muse.theme_centroids import suggest_themes, chapter_tagged, chapter_untagged
 from app.search.schemas import (
     ThemeResponse,
     ChapterSearchResult,
     SearchResponse,
-    ThemeChaptersResponse
+    ThemeChaptersResponse,
+    FacetValue,
+    BrowseFacets,
+    BrowseResponse,
+    SuggestResponse
 )
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 
+def visible_to(viewer_id: int) -> list:
+    """
+    Chapter conditions for display to `viewer_id`: not by an author the
+    viewer has blocked or been blocked by, and not in a private book the
+    viewer does not follow.
+    """
+    blocked = exists().where(or_(
+        and_(Block.blocker_id == Chapter.author_id, Block.blocked_id == viewer_id),
+        and_(Block.blocker_id == viewer_id, Block.blocked_id == Chapter.author_id)
+    ))
+    hidden_private = exists().where(
+        Book.user_id == Chapter.author_id,
+        Book.is_private.is_(True),
+        Chapter.author_id != viewer_id,
+        ~exists().where(Follow.follower_id == viewer_id, Follow.followed_id == Chapter.author_id)
+    )
+    return [~blocked, ~hidden_private]
+
+
+def hydrate_chapters(db: Session, chapter_ids: List[int], viewer_id: int) -> list:
+    """
+    Load chapters by id in the given order, for display to `viewer_id`.
+    
+    Drops chapters that no longer exist or are not visible_to the viewer.
+    Cached id pages rely on this for per-viewer filtering.
+    """
+    if not chapter_ids:
+        return []
+    
+    by_id = {
+        chapter.id: chapter
+        for chapter in db.query(Chapter).filter(
+            Chapter.id.in_(chapter_ids), *visible_to(viewer_id)
+        ).options(
+            joinedload(Chapter.author).joinedload(User.book),
+            selectinload(Chapter.themes)
+        ).all()
+    }
+    return [by_id[chapter_id] for chapter_id in chapter_ids if chapter_id in by_id]
+
+
+def search_results(db: Session, chapters: list, viewer_id: int) -> List[ChapterSearchResult]:
+    """
+    Format chapters (author, author.book and themes loaded) as search results.
+    
+    Excerpts are stored on the chapter, so blocks are never loaded.
+    """
+    heart_counts = current_heart_counts(chapters)
+    states = get_engagement_states(db, viewer_id, [chapter.id for chapter in chapters])
+    
+    return [
+        ChapterSearchResult(
+            id=chapter.id,
+            title=chapter.title,
+            mood=chapter.mood,
+            cover_url=chapter.cover_url,
+            heart_count=heart_counts[chapter.id],
+            published_at=chapter.published_at,
+            author_id=chapter.author_id,
+            author_username=chapter.author.username,
+            author_book_id=chapter.author.book.id if chapter.author.book else 0,
+            excerpt=chapter.excerpt,
+            word_count=chapter.word_count,
+            reading_time_minutes=chapter.reading_time_minutes,
+            first_image_url=chapter.first_image_url,
+            themes=[t.name for t in chapter.themes],
+            **states[chapter.id]
+        )
+        for chapter in chapters
+    ]
+
+
 # ============================================================================
 # THEMES
 # ============================================================================
 
 @router.get("/themes", response_model=List[ThemeResponse])
 async def list_themes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -31,26 +121,11 @@ async def list_themes(
     
     Themes are curated, not user-generated. They represent universal
     human experiences and emotions, not trending topics.
-    """
-    # Get themes with chapter counts
-    themes = db.query(
-        Theme,
-        func.count(chapter_themes.c.chapter_id).label('chapter_count')
-    ).outerjoin(
-        chapter_themes, Theme.id == chapter_themes.c.theme_id
-    ).group_by(Theme.id).order_by(Theme.name).all()
     
-    return [
-        ThemeResponse(
-            id=theme.id,
-            name=theme.name,
-            slug=theme.slug,
-            description=theme.description,
-            emoji=theme.emoji,
-            chapter_count=count
-        )
-        for theme, count in themes
-    ]
+    Served from the in-memory theme catalog; counts are maintained as
+    chapters are tagged.
+    """
+    return [ThemeResponse(**theme) for theme in get_themes(db)]
 
 
 @router.get("/themes/{slug}", response_model=ThemeChaptersResponse)
@@ -58,7 +133,7 @@ async def get_theme_chapters(
     slug: str,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -67,8 +142,8 @@ async def get_theme_chapters(
     Shows "chapters where people lingered" - no metrics, no trending.
     Ordered by recency to show living, breathing work.
     """
-    # Get theme
-    theme = db.query(Theme).filter(Theme.slug == slug).first()
+    # Get theme (and its maintained chapter count) from the catalog
+    theme = get_theme_by_slug(db, slug)
     
     if not theme:
         raise HTTPException(
@@ -76,54 +151,16 @@ async def get_theme_chapters(
             detail="Theme not found"
         )
     
-    # Get chapters with this theme
-    query = db.query(Chapter).join(
-        chapter_themes, Chapter.id == chapter_themes.c.chapter_id
-    ).filter(
-        chapter_themes.c.theme_id == theme.id
-    ).options(
-        joinedload(Chapter.author).joinedload(User.book),
-        joinedload(Chapter.themes)
-    ).order_by(Chapter.published_at.desc())
+    # Page of chapter ids from the theme's shared precomputed list, hydrated
+    # in one batch and filtered for this viewer
+    total = theme["chapter_count"]
+    chapter_ids = get_theme_page(db, theme, (page - 1) * per_page, per_page)
+    chapters = hydrate_chapters(db, chapter_ids, current_user.id)
     
-    # Pagination
-    total = query.count()
-    chapters = query.offset((page - 1) * per_page).limit(per_page).all()
-    
-    # Format results
-    chapter_results = []
-    for chapter in chapters:
-        # Get first text block for excerpt
-        excerpt = None
-        for block in chapter.blocks:
-            if block.block_type == 'text' and block.content.get('text'):
-                text = block.content['text']
-                excerpt = text[:200] + '...' if len(text) > 200 else text
-                break
-        
-        chapter_results.append(ChapterSearchResult(
-            id=chapter.id,
-            title=chapter.title,
-            mood=chapter.mood,
-            cover_url=chapter.cover_url,
-            heart_count=chapter.heart_count,
-            published_at=chapter.published_at,
-            author_id=chapter.author_id,
-            author_username=chapter.author.username,
-            author_book_id=chapter.author.book.id if chapter.author.book else 0,
-            excerpt=excerpt,
-            themes=[t.name for t in chapter.themes]
-        ))
+    chapter_results = search_results(db, chapters, current_user.id)
     
     return ThemeChaptersResponse(
-        theme=ThemeResponse(
-            id=theme.id,
-            name=theme.name,
-            slug=theme.slug,
-            description=theme.description,
-            emoji=theme.emoji,
-            chapter_count=total
-        ),
+        theme=ThemeResponse(**theme),
         chapters=chapter_results,
         page=page,
         per_page=per_page,
@@ -140,7 +177,7 @@ async def search_chapters(
     q: str = Query(..., min_length=2, max_length=100),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -151,71 +188,118 @@ async def search_chapters(
     
     No popularity sorting - just relevance and recency.
     """
-    search_term = f"%{q.lower()}%"
-    
-    # Search in:
-    # 1. Chapter titles
-    # 2. Chapter moods
-    # 3. Chapter block content (text blocks only)
-    # 4. Theme names
-    
-    query = db.query(Chapter).distinct().outerjoin(
-        chapter_themes, Chapter.id == chapter_themes.c.chapter_id
-    ).outerjoin(
-        Theme, chapter_themes.c.theme_id == Theme.id
-    ).filter(
-        or_(
-            func.lower(Chapter.title).like(search_term),
-            func.lower(Chapter.mood).like(search_term),
-            func.lower(Theme.name).like(search_term)
+    normalized = normalize_query(q)
+    
+    def run_search() -> dict:
+        # Search in:
+        # 1. Chapter titles
+        # 2. Chapter moods
+        # 3. Theme names
+        search_term = f"%{normalized}%"
+        query = db.query(Chapter.id).filter(
+            or_(
+                func.lower(Chapter.title).like(search_term),
+                func.lower(Chapter.mood).like(search_term),
+                Chapter.id.in_(
+                    select(chapter_themes.c.chapter_id).join(
+                        Theme, chapter_themes.c.theme_id == Theme.id
+                    ).where(func.lower(Theme.name).like(search_term))
+                )
+            )
+        )
+        return {
+            "ids": [row.id for row in query.order_by(
+                Chapter.published_at.desc(), Chapter.id.desc()
+            ).offset((page - 1) * per_page).limit(per_page).all()],
+            "total": query.count(),
+        }
+    
+    # Id pages are shared across viewers; visibility is applied at hydrate time
+    result = cached_page("search", {"q": normalized}, page, per_page, run_search)
+    total = result["total"]
+    chapters = hydrate_chapters(db, result["ids"], current_user.id)
+    
+    chapter_results = search_results(db, chapters, current_user.id)
+    
+    return SearchResponse(
+        query=q,
+        chapters=chapter_results,
+        total=total,
+        page=page,
+        per_page=per_page,
+        has_more=total > page * per_page
+    )
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Complete a partial query with chapter titles, moods and theme names,
+    most used first. Answered from this worker's in-memory prefix index,
+    without a database query.
+    """
+    return SuggestResponse(query=q, suggestions=suggest(q, limit))
+
+
+@router.get("/blocks", response_model=SearchResponse)
+async def search_block_content(
+    text: Optional[str] = Query(None, min_length=2, max_length=100, description="Words in text or quote blocks"),
+    quote_author: Optional[str] = Query(None, min_length=1, max_length=100, description="Exact quote attribution"),
+    min_duration: Optional[float] = Query(None, ge=0, description="Audio/video longer than this many seconds"),
+    media_type: Optional[BlockType] = Query(None, description="Limit min_duration to audio or video"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Find chapters by what their blocks contain, e.g. "a quote by Rilke"
+    or "audio longer than 4 minutes". Filters combine with AND; each can
+    be met by a different block.
+    
+    Each filter is served by an index on block content (JSONB
+    containment, media duration, full-text), newest chapters first.
+    """
+    conditions = []
+    if text:
+        conditions.append(block_text_matches(text))
+    if quote_author:
+        conditions.append(quote_by(quote_author))
+    if min_duration is not None:
+        if media_type is not None and media_type not in MEDIA_BLOCK_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="media_type must be audio or video"
+            )
+        conditions.append(media_longer_than(min_duration, media_type))
+    
+    if not conditions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give at least one of text, quote_author or min_duration"
         )
+    
+    query = db.query(Chapter).filter(
+        chapters_with_blocks(*conditions), *visible_to(current_user.id)
     ).options(
         joinedload(Chapter.author).joinedload(User.book),
-        joinedload(Chapter.themes),
-        joinedload(Chapter.blocks)
+        selectinload(Chapter.themes)
     ).order_by(Chapter.published_at.desc())
     
-    # Pagination
     total = query.count()
     chapters = query.offset((page - 1) * per_page).limit(per_page).all()
     
-    # Format results
-    chapter_results = []
-    for chapter in chapters:
-        # Get first text block for excerpt
-        excerpt = None
-        for block in chapter.blocks:
-            if block.block_type == 'text' and block.content.get('text'):
-                text = block.content['text']
-                # Try to find search term in text for context
-                text_lower = text.lower()
-                if q.lower() in text_lower:
-                    # Find position and extract context
-                    pos = text_lower.find(q.lower())
-                    start = max(0, pos - 100)
-                    end = min(len(text), pos + 100)
-                    excerpt = ('...' if start > 0 else '') + text[start:end] + ('...' if end < len(text) else '')
-                else:
-                    excerpt = text[:200] + '...' if len(text) > 200 else text
-                break
-        
-        chapter_results.append(ChapterSearchResult(
-            id=chapter.id,
-            title=chapter.title,
-            mood=chapter.mood,
-            cover_url=chapter.cover_url,
-            heart_count=chapter.heart_count,
-            published_at=chapter.published_at,
-            author_id=chapter.author_id,
-            author_username=chapter.author.username,
-            author_book_id=chapter.author.book.id if chapter.author.book else 0,
-            excerpt=excerpt,
-            themes=[t.name for t in chapter.themes]
-        ))
-    
     return SearchResponse(
-        query=q,
-        chapters=chapter_results,
+        query=" ".join(
+            f"{name}={value}"
+            for name, value in (("text", text), ("quote_author", quote_author), ("min_duration", min_duration))
+            if value is not None
+        ),
+        chapters=search_results(db, chapters, current_user.id),
         total=total,
         page=page,
         per_page=per_page,
@@ -223,6 +307,78 @@ async def search_chapters(
     )
 
 
+# ============================================================================
+# BROWSE
+# ============================================================================
+
+@router.get("/browse", response_model=BrowseResponse)
+async def browse_chapters(
+    mood: Optional[str] = Query(None, max_length=50),
+    time_period: Optional[str] = Query(None, max_length=50),
+    theme: Optional[str] = Query(None, description="Theme slug"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Browse chapters by mood, time period and theme (exact values, combined
+    with AND), newest first, with counts for each facet value.
+    
+    The total and the facet counts come from the maintained
+    chapter_facet_counts table, not from counting the results.
+    """
+    theme_entry = None
+    if theme is not None:
+        theme_entry = get_theme_by_slug(db, theme)
+        if not theme_entry:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Theme not found"
+            )
+    
+    def run_browse() -> dict:
+        query = db.query(Chapter.id)
+        if mood is not None:
+            query = query.filter(Chapter.mood == mood)
+        if time_period is not None:
+            query = query.filter(Chapter.time_period == time_period)
+        if theme_entry is not None:
+            query = query.filter(Chapter.id.in_(
+                select(chapter_themes.c.chapter_id).where(chapter_themes.c.theme_id == theme_entry["id"])
+            ))
+        return {"ids": [row.id for row in query.order_by(
+            Chapter.published_at.desc(), Chapter.id.desc()
+        ).offset((page - 1) * per_page).limit(per_page).all()]}
+    
+    result = cached_page(
+        "browse",
+        {"mood": mood, "time_period": time_period, "theme": theme_entry["id"] if theme_entry else None},
+        page, per_page, run_browse
+    )
+    chapters = hydrate_chapters(db, result["ids"], current_user.id)
+    
+    counts = get_facet_counts(db, mood, time_period, theme_entry["id"] if theme_entry else None)
+    themes_by_id = {entry["id"]: entry for entry in get_themes(db)}
+    
+    return BrowseResponse(
+        chapters=search_results(db, chapters, current_user.id),
+        facets=BrowseFacets(
+            mood=[FacetValue(value=value, count=count) for value, count in counts["mood"]],
+            time_period=[FacetValue(value=value, count=count) for value, count in counts["time_period"]],
+            theme=[
+                FacetValue(value=themes_by_id[theme_id]["slug"], label=themes_by_id[theme_id]["name"], count=count)
+                for theme_id, count in counts["theme"]
+                if theme_id in themes_by_id
+            ]
+        ),
+        total=counts["total"],
+        page=page,
+        per_page=per_page,
+        has_more=counts["total"] > page * per_page
+    )
+
+
 # ============================================================================
 # MUSE THEME SUGGESTIONS
 # ============================================================================
@@ -236,26 +392,54 @@ async def suggest_themes_for_chapter(
     """
     Muse suggests themes for a chapter (max 3).
     
-    This is a placeholder for AI-powered theme suggestion.
-    For now, returns empty list - implement with embeddings later.
+    Compares the chapter's embedding with every theme's centroid (built
+    from its description and the chapters tagged with it) and returns the
+    closest themes the chapter does not have yet, above a similarity
+    threshold. Suggestions only; the author always chooses.
     """
-    chapter = db.query(Chapter).filter(
+    row = db.query(Chapter.id, ChapterEmbedding.embedding).outerjoin(
+        ChapterEmbedding, ChapterEmbedding.chapter_id == Chapter.id
+    ).filter(
         Chapter.id == chapter_id,
         Chapter.author_id == current_user.id
     ).first()
     
-    if not chapter:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found or not yours"
         )
     
-    # TODO: Implement AI theme suggestion using embeddings
-    # For now, return empty suggestions
+    if row.embedding is None:
+        return {
+            "chapter_id": chapter_id,
+            "suggested_themes": [],
+            "message": "Muse is still reading this chapter; try again in a moment"
+        }
+    
+    current_theme_ids = [
+        theme_id for theme_id, in db.query(chapter_themes.c.theme_id).filter(
+            chapter_themes.c.chapter_id == chapter_id
+        ).all()
+    ]
+    themes_by_id = {theme["id"]: theme for theme in get_themes(db)}
+    
+    suggestions = [
+        {
+            "id": theme_id,
+            "name": themes_by_id[theme_id]["name"],
+            "slug": themes_by_id[theme_id]["slug"],
+            "emoji": themes_by_id[theme_id]["emoji"],
+            "score": score,
+        }
+        for theme_id, score in suggest_themes(db, row.embedding, exclude_theme_ids=current_theme_ids)
+        if theme_id in themes_by_id
+    ]
+    
     return {
         "chapter_id": chapter_id,
-        "suggested_themes": [],
-        "message": "Theme suggestions coming soon with Muse AI"
+        "suggested_themes": suggestions,
+        "message": None if suggestions else "No theme stands out for this chapter"
     }
 
 
@@ -320,6 +504,13 @@ async def add_theme_to_chapter(
             theme_id=theme_id
         )
     )
+    themes_added(db, [theme_id], chapter.published_at)
+    chapter_tagged(db, theme_id, chapter_id)
+    facet_counts_changed(db, added=facet_keys(chapter.mood, chapter.time_period, [theme_id], any_theme=False))
+    emit(
+        db, CHAPTER_THEMES_CHANGED,
+        chapter_id=chapter_id, added_theme_ids=[theme_id], published_at=chapter.published_at
+    )
     db.commit()
     
     return {"message": f"Theme '{theme.name}' added to chapter"}
@@ -361,6 +552,10 @@ async def remove_theme_from_chapter(
             detail="Theme not found on this chapter"
         )
     
+    themes_removed(db, [theme_id], chapter.published_at)
+    chapter_untagged(db, theme_id, chapter_id)
+    facet_counts_changed(db, removed=facet_keys(chapter.mood, chapter.time_period, [theme_id], any_theme=False))
+    emit(db, CHAPTER_THEMES_CHANGED, chapter_id=chapter_id, removed_theme_ids=[theme_id])
     db.commit()
     
     return {"message": "Theme removed from chapter"}
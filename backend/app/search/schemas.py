@@ -12,6 +12,8 @@ class ThemeResponse(BaseModel):
     description: Optional[str]
     emoji: Optional[str]
     chapter_count: int = 0
+    recent_chapter_count: int = 0  # Published in roughly the last 7 days
+    last_chapter_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -29,8 +31,17 @@ class ChapterSearchResult(BaseModel):
     author_username: str
     author_book_id: int
     excerpt: Optional[str] = None  # Text snippet for context
+    word_count: Optional[int] = None
+    reading_time_minutes: Optional[int] = None
+    first_image_url: Optional[str] = None
     themes: List[str] = []  # Theme names
     
+    # Viewer state
+    is_hearted: bool = False
+    is_bookmarked: bool = False
+    margin_count: int = 0
+    is_shelved: bool = False
+    
     class Config:
         from_attributes = True
 
@@ -52,3 +63,40 @@ class ThemeChaptersResponse(BaseModel):
     page: int
     per_page: int
     has_more: bool
+
+
+class FacetValue(BaseModel):
+    """One value of a browse facet"""
+    value: str  # Filter value (theme slug for themes)
+    label: Optional[str] = None  # Display name, for themes
+    count: int  # Chapters matching the other filters plus this value
+
+
+class BrowseFacets(BaseModel):
+    """Facet sidebar for a browse page"""
+    mood: List[FacetValue]
+    time_period: List[FacetValue]
+    theme: List[FacetValue]
+
+
+class BrowseResponse(BaseModel):
+    """Faceted browse page"""
+    chapters: List[ChapterSearchResult]
+    facets: BrowseFacets
+    total: int
+    page: int
+    per_page: int
+    has_more: bool
+
+
+class Suggestion(BaseModel):
+    """One search completion"""
+    text: str
+    kind: str  # "title", "mood" or "theme"
+    count: int  # Chapters using it (approximate)
+
+
+class SuggestResponse(BaseModel):
+    """Completions for a partial query"""
+    query: str
+    suggestions: List[Suggestion]
@@ -2,13 +2,13 @@
 from app.services.open_pages import (
     check_open_pages,
     consume_open_page,
-    grant_daily_open_page,
+    effective_open_pages,
     can_publish,
 )
 
 __all__ = [
     "check_open_pages",
     "consume_open_page",
-    "grant_daily_open_page",
+    "effective_open_pages",
     "can_publish",
 ]
@@ -0,0 +1,133 @@
+"""
+Denormalized Book statistics
+
+books.chapter_count, last_chapter_at, follower_count, following_count and
+shelf_count are kept in step with the underlying rows by the code paths
+that write them (publish, delete, follow, shelf, block), in the same
+transaction. Each helper is a single UPDATE keyed on user_id.
+
+A nightly job recomputes every book's stats from scratch and repairs any
+drift (e.g. rows removed by account-deletion cascades).
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.logging_config import logger
+from app.scheduler import register_job
+
+REPAIR_BATCH_SIZE = 5000
+
+
+def chapter_published(db: Session, author_id: int, published_at: datetime) -> Optional[int]:
+    """Count a new chapter. Returns the author's book id (None if they have no book)."""
+    return db.execute(text("""
+        UPDATE books
+        SET chapter_count = chapter_count + 1,
+            last_chapter_at = GREATEST(last_chapter_at, :published_at)
+        WHERE user_id = :author_id
+        RETURNING id
+    """), {"author_id": author_id, "published_at": published_at}).scalar()
+
+
+def chapter_deleted(db: Session, author_id: int) -> None:
+    """Uncount a deleted chapter (call after the delete is flushed)"""
+    db.execute(text("""
+        UPDATE books
+        SET chapter_count = GREATEST(chapter_count - 1, 0),
+            last_chapter_at = (SELECT MAX(published_at) FROM chapters WHERE author_id = :author_id)
+        WHERE user_id = :author_id
+    """), {"author_id": author_id})
+
+
+def follows_changed(db: Session, follows: Iterable[tuple[int, int]], delta: int) -> None:
+    """
+    Adjust follower/following counts for (follower_id, followed_id) pairs
+    that were just created (delta=1) or removed (delta=-1).
+    """
+    followers, following = {}, {}
+    for follower_id, followed_id in follows:
+        following[follower_id] = following.get(follower_id, 0) + delta
+        followers[followed_id] = followers.get(followed_id, 0) + delta
+
+    user_ids = sorted(set(followers) | set(following))  # Consistent lock order
+    if not user_ids:
+        return
+
+    values = ", ".join(f"(:user{i}, :followers{i}, :following{i})" for i in range(len(user_ids)))
+    params = {}
+    for i, user_id in enumerate(user_ids):
+        params[f"user{i}"] = user_id
+        params[f"followers{i}"] = followers.get(user_id, 0)
+        params[f"following{i}"] = following.get(user_id, 0)
+
+    db.execute(text(f"""
+        UPDATE books AS b
+        SET follower_count = GREATEST(b.follower_count + v.followers, 0),
+            following_count = GREATEST(b.following_count + v.following, 0)
+        FROM (VALUES {values}) AS v(user_id, followers, following)
+        WHERE b.user_id = v.user_id
+    """), params)
+
+
+def shelf_changed(db: Session, book_owner_id: int, delta: int) -> None:
+    """Adjust how many Shelves a book is on"""
+    db.execute(text("""
+        UPDATE books SET shelf_count = GREATEST(shelf_count + :delta, 0)
+        WHERE user_id = :owner_id
+    """), {"owner_id": book_owner_id, "delta": delta})
+
+
+@register_job("repair_book_stats", interval=settings.book_stats_repair_interval)
+def repair_book_stats(db: Session) -> dict:
+    """
+    Recompute every book's stats from source rows and fix any that drifted, in id ranges.
+
+    Each range's rows are locked before the recount, so its snapshot
+    already includes every follow or chapter whose counter update got
+    there first, and later ones wait and apply on top of the repair.
+    """
+    max_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM books")).scalar()
+    repaired = 0
+
+    for low in range(1, max_id + 1, REPAIR_BATCH_SIZE):
+        params = {"low": low, "high": low + REPAIR_BATCH_SIZE}
+        # user_id order, like follows_changed, so the two cannot deadlock
+        db.execute(text("""
+            SELECT id FROM books WHERE id >= :low AND id < :high ORDER BY user_id FOR UPDATE
+        """), params)
+        result = db.execute(text("""
+            UPDATE books AS b
+            SET chapter_count = s.chapter_count,
+                last_chapter_at = s.last_chapter_at,
+                follower_count = s.follower_count,
+                following_count = s.following_count,
+                shelf_count = s.shelf_count
+            FROM (
+                SELECT bk.id,
+                    (SELECT COUNT(*) FROM chapters c WHERE c.author_id = bk.user_id) AS chapter_count,
+                    (SELECT MAX(published_at) FROM chapters c WHERE c.author_id = bk.user_id) AS last_chapter_at,
+                    (SELECT COUNT(*) FROM follows f WHERE f.followed_id = bk.user_id) AS follower_count,
+                    (SELECT COUNT(*) FROM follows f WHERE f.follower_id = bk.user_id) AS following_count,
+                    (SELECT COUNT(*) FROM shelves s WHERE s.book_owner_id = bk.user_id) AS shelf_count
+                FROM books bk
+                WHERE bk.id >= :low AND bk.id < :high
+            ) AS s
+            WHERE b.id = s.id AND (
+                b.chapter_count <> s.chapter_count
+                OR b.last_chapter_at IS DISTINCT FROM s.last_chapter_at
+                OR b.follower_count <> s.follower_count
+                OR b.following_count <> s.following_count
+                OR b.shelf_count <> s.shelf_count
+            )
+        """), params)
+        repaired += result.rowcount
+        db.commit()
+
+    if repaired:
+        logger.warning(f"Repaired drifted stats on {repaired} books")
+
+    return {"repaired": repaired}
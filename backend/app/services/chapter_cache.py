@@ -0,0 +1,315 @@
+"""
+Read-through chapter cache
+
+The viewer-independent part of a chapter (body, blocks, author stub and
+book privacy) is serialized once and served from two tiers:
+
+1. a per-worker LRU (no network round trip)
+2. Redis, shared by all workers
+
+Per-viewer state (hearted, bookmarked, shelved, following, blocked), the
+margin count and the live heart count are never cached; they come from one batched query per view.
+
+Entries are invalidated by domain events (see app.events) once the
+writing transaction commits: the Redis key is deleted and every worker
+drops its local copy via a pub/sub message. The local TTL bounds
+staleness if a worker misses that message.
+
+Invalidation also bumps a per-chapter generation (chapter_cache:gen:<id>).
+A miss reads the generation before loading from the database and only
+writes its entry if the generation is unchanged, so a load that raced an
+edit cannot put the old chapter back for chapter_cache_ttl.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import redis
+from sqlalchemy import select, exists, func, and_, or_
+from sqlalchemy.orm import Session, undefer
+
+from app.config import settings
+from app.events import (
+    subscribe, CHAPTER_UPDATED, CHAPTER_DELETED, CHAPTER_THEMES_CHANGED, BOOK_PRIVACY_CHANGED
+)
+from app.logging_config import logger
+from app.models import User, Book, Chapter, ChapterBlock, Heart, Bookmark, Follow, Block, Margin, Shelf
+from app.services.heart_counters import pending_heart_deltas
+from app.services.chapter_derived import blocks_snapshot
+
+redis_client = redis.from_url(settings.redis_url)
+
+KEY_PREFIX = "chapter_cache:"
+GENERATION_PREFIX = "chapter_cache:gen:"
+INVALIDATE_CHANNEL = "chapter_cache:invalidate"
+
+# SET KEYS[1] = ARGV[1] (expiring in ARGV[2] s) if generation KEYS[2] still equals ARGV[3] ("" for unset)
+_SET_IF_GENERATION = redis_client.register_script("""
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[3] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+""")
+
+_local: OrderedDict = OrderedDict()  # chapter_id -> (expires_at, entry)
+_local_lock = threading.Lock()
+
+_stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+_stats_lock = threading.Lock()
+
+
+def _key(chapter_id: int) -> str:
+    return f"{KEY_PREFIX}{chapter_id}"
+
+
+def _generation_key(chapter_id: int) -> str:
+    return f"{GENERATION_PREFIX}{chapter_id}"
+
+
+def _local_get(chapter_id: int) -> Optional[dict]:
+    with _local_lock:
+        item = _local.get(chapter_id)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del _local[chapter_id]
+            return None
+        _local.move_to_end(chapter_id)
+        return entry
+
+
+def _local_put(chapter_id: int, entry: dict) -> None:
+    with _local_lock:
+        _local[chapter_id] = (time.monotonic() + settings.chapter_cache_local_ttl, entry)
+        _local.move_to_end(chapter_id)
+        while len(_local) > settings.chapter_cache_local_size:
+            _local.popitem(last=False)
+
+
+def _local_drop(chapter_ids: Iterable[int]) -> None:
+    with _local_lock:
+        for chapter_id in chapter_ids:
+            _local.pop(chapter_id, None)
+
+
+def _record(kind: str, seconds: float) -> None:
+    with _stats_lock:
+        _stats[kind] += 1
+        _stats["miss_seconds" if kind == "misses" else "hit_seconds"] += seconds
+
+
+def load_chapter_entry(db: Session, chapter_id: int) -> Optional[dict]:
+    """
+    Serialize a chapter from the database, or None if it does not exist.
+
+    One row read via blocks_snapshot; chapters without a snapshot take a
+    second query for their block rows.
+    """
+    row = db.execute(
+        select(Chapter, User.username, Book.id, Book.is_private)
+        .join(User, User.id == Chapter.author_id)
+        .outerjoin(Book, Book.user_id == Chapter.author_id)
+        .where(Chapter.id == chapter_id)
+        .options(undefer(Chapter.blocks_snapshot))
+    ).first()
+
+    if row is None:
+        return None
+
+    chapter, username, book_id, is_private = row
+    if chapter.blocks_snapshot is not None:
+        blocks = chapter.blocks_snapshot
+    else:
+        blocks = blocks_snapshot(db.scalars(
+            select(ChapterBlock).where(ChapterBlock.chapter_id == chapter_id)
+        ).all())
+
+    return {
+        "id": chapter.id,
+        "author_id": chapter.author_id,
+        "title": chapter.title,
+        "cover_url": chapter.cover_url,
+        "mood": chapter.mood,
+        "theme": chapter.theme,
+        "time_period": chapter.time_period,
+        "word_count": chapter.word_count,
+        "reading_time_minutes": chapter.reading_time_minutes,
+        "block_summary": chapter.block_summary,
+        "first_image_url": chapter.first_image_url,
+        "published_at": chapter.published_at.isoformat(),
+        "edit_window_expires": chapter.edit_window_expires.isoformat(),
+        "blocks": blocks,
+        "author": {
+            "username": username,
+            "book_id": book_id or 0,
+        },
+        "is_private": bool(is_private),
+    }
+
+
+def get_chapter_entry(db: Session, chapter_id: int) -> Optional[dict]:
+    """
+    Cached chapter entry, loading and caching it on a miss.
+
+    The returned dict is shared between requests; do not mutate it.
+    """
+    start = time.perf_counter()
+
+    if not settings.chapter_cache_enabled:
+        return load_chapter_entry(db, chapter_id)
+
+    entry = _local_get(chapter_id)
+    if entry is not None:
+        _record("local_hits", time.perf_counter() - start)
+        return entry
+
+    try:
+        raw, generation = redis_client.mget(_key(chapter_id), _generation_key(chapter_id))
+    except redis.RedisError:
+        raw, generation = None, None
+    if raw is not None:
+        entry = json.loads(raw)
+        _local_put(chapter_id, entry)
+        _record("redis_hits", time.perf_counter() - start)
+        return entry
+
+    entry = load_chapter_entry(db, chapter_id)
+    if entry is not None:
+        stored = True
+        try:
+            stored = bool(_SET_IF_GENERATION(
+                keys=[_key(chapter_id), _generation_key(chapter_id)],
+                args=[json.dumps(entry, separators=(",", ":")), settings.chapter_cache_ttl,
+                      generation.decode() if generation is not None else ""]
+            ))
+        except redis.RedisError as e:
+            logger.warning(f"Chapter cache write failed for {chapter_id}: {e}")
+        if stored:
+            _local_put(chapter_id, entry)  # Not if invalidated while loading
+    _record("misses", time.perf_counter() - start)
+    return entry
+
+
+def get_viewer_state(db: Session, chapter_id: int, author_id: int, viewer_id: int):
+    """
+    Per-viewer flags and the live heart count in one query.
+
+    Returns:
+        Dict with heart_count, is_hearted, is_bookmarked, is_following,
+        is_shelved, margin_count and is_blocked, or None if the chapter
+        no longer exists
+    """
+    row = db.execute(
+        select(
+            Chapter.heart_count,
+            exists().where(Heart.user_id == viewer_id, Heart.chapter_id == chapter_id).label("is_hearted"),
+            exists().where(Bookmark.user_id == viewer_id, Bookmark.chapter_id == chapter_id).label("is_bookmarked"),
+            exists().where(Follow.follower_id == viewer_id, Follow.followed_id == author_id).label("is_following"),
+            exists().where(Shelf.user_id == viewer_id, Shelf.book_owner_id == author_id).label("is_shelved"),
+            select(func.count(Margin.id)).where(Margin.chapter_id == chapter_id).scalar_subquery().label("margin_count"),
+            exists().where(or_(
+                and_(Block.blocker_id == author_id, Block.blocked_id == viewer_id),
+                and_(Block.blocker_id == viewer_id, Block.blocked_id == author_id)
+            )).label("is_blocked"),
+        ).where(Chapter.id == chapter_id)
+    ).first()
+
+    if row is None:
+        return None
+
+    state = row._asdict()
+    state["heart_count"] = max(row.heart_count + pending_heart_deltas([chapter_id]).get(chapter_id, 0), 0)
+    return state
+
+
+def invalidate_chapters(chapter_ids: Iterable[int]) -> None:
+    """Drop chapters from Redis and from every worker's local cache"""
+    chapter_ids = [int(chapter_id) for chapter_id in chapter_ids]
+    if not chapter_ids:
+        return
+
+    _local_drop(chapter_ids)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for chapter_id in chapter_ids:
+            # Before the delete, so a fill that read the old generation cannot write after it
+            pipe.incr(_generation_key(chapter_id))
+            pipe.expire(_generation_key(chapter_id), settings.chapter_cache_ttl)
+        pipe.delete(*[_key(chapter_id) for chapter_id in chapter_ids])
+        pipe.publish(INVALIDATE_CHANNEL, json.dumps(chapter_ids))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Chapter cache invalidation failed for {chapter_ids}: {e}")
+
+
+@subscribe(CHAPTER_UPDATED)
+@subscribe(CHAPTER_DELETED)
+@subscribe(CHAPTER_THEMES_CHANGED)
+def _invalidate_chapter(payload: dict) -> None:
+    invalidate_chapters([payload["chapter_id"]])
+
+
+@subscribe(BOOK_PRIVACY_CHANGED)
+def _invalidate_book(payload: dict) -> None:
+    invalidate_chapters(payload["chapter_ids"])
+
+
+def _on_invalidate_message(message: dict) -> None:
+    try:
+        _local_drop(json.loads(message["data"]))
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Ignoring malformed chapter cache invalidation: {e}")
+
+
+def start_invalidation_listener():
+    """Subscribe this worker to invalidations from other workers (thread, or None if Redis is down)"""
+    if not settings.chapter_cache_enabled:
+        return None
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATE_CHANNEL: _on_invalidate_message})
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+    except redis.RedisError as e:
+        logger.warning(f"Chapter cache invalidation listener not started: {e}")
+        return None
+
+
+def stop_invalidation_listener(thread) -> None:
+    if thread is not None:
+        thread.stop()
+
+
+def get_cache_stats() -> dict:
+    """Hit ratio and estimated latency saved on this worker"""
+    with _stats_lock:
+        stats = dict(_stats)
+    with _local_lock:
+        local_entries = len(_local)
+
+    hits = stats["local_hits"] + stats["redis_hits"]
+    lookups = hits + stats["misses"]
+    avg_hit_ms = stats["hit_seconds"] * 1000 / hits if hits else 0.0
+    avg_miss_ms = stats["miss_seconds"] * 1000 / stats["misses"] if stats["misses"] else 0.0
+
+    return {
+        "lookups": lookups,
+        "local_hits": stats["local_hits"],
+        "redis_hits": stats["redis_hits"],
+        "misses": stats["misses"],
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "avg_hit_ms": round(avg_hit_ms, 3),
+        "avg_miss_ms": round(avg_miss_ms, 3),
+        # Each hit skipped a miss-sized load
+        "estimated_saved_ms": round(hits * max(avg_miss_ms - avg_hit_ms, 0.0), 1),
+        "local_entries": local_entries,
+    }
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0 if isinstance(_stats[key], int) else 0.0
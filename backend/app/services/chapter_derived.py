@@ -0,0 +1,137 @@
+"""
+Publish-time derived chapter fields
+
+Lists show an excerpt, word count, reading time and a lead image for each
+chapter. These are derived from the blocks once, when a chapter is
+published or edited, and stored on the chapter, so list endpoints project
+columns instead of loading every block.
+
+blocks_snapshot holds the blocks themselves (as ChapterBlockResponse
+dicts in position order), so a chapter read is a single row read; it is
+rewritten whenever the block rows change, once they have ids.
+
+Chapters published before these columns existed have NULLs until the
+backfill runs:
+
+    python scripts/backfill_chapter_derived.py
+"""
+import math
+import re
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy import update, or_
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Chapter
+from app.models.chapter import BlockType
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 230
+SECONDS_PER_IMAGE = 12
+
+_WORD = re.compile(r"\S+")
+
+
+def derive_chapter_fields(blocks: Iterable[tuple]) -> dict:
+    """
+    Derived columns for a chapter.
+
+    Args:
+        blocks: (block_type, content) pairs in position order
+    """
+    excerpt = None
+    first_image_url = None
+    words = 0
+    seconds = 0.0
+    summary = Counter()
+
+    for block_type, content in blocks:
+        block_type = BlockType(block_type)
+        summary[block_type.value] += 1
+
+        if block_type in (BlockType.TEXT, BlockType.QUOTE):
+            text = content.get("text") or ""
+            words += len(_WORD.findall(text))
+            if excerpt is None and block_type == BlockType.TEXT and text:
+                excerpt = text[:EXCERPT_LENGTH] + '...' if len(text) > EXCERPT_LENGTH else text
+        elif block_type == BlockType.IMAGE:
+            seconds += SECONDS_PER_IMAGE
+            if first_image_url is None:
+                first_image_url = content.get("url")
+        else:  # Audio and video play for their duration
+            seconds += content.get("duration") or 0
+
+    seconds += words * 60 / WORDS_PER_MINUTE
+
+    return {
+        "excerpt": excerpt,
+        "word_count": words,
+        "reading_time_minutes": max(1, math.ceil(seconds / 60)),
+        "block_summary": dict(summary),
+        "first_image_url": first_image_url,
+    }
+
+
+def blocks_snapshot(blocks: Iterable) -> list[dict]:
+    """Snapshot of flushed block rows for Chapter.blocks_snapshot"""
+    return [
+        {
+            "id": block.id,
+            "position": block.position,
+            "block_type": BlockType(block.block_type).value,
+            "content": block.content,
+            "created_at": block.created_at.isoformat(),
+        }
+        for block in sorted(blocks, key=lambda block: block.position)
+    ]
+
+
+def apply_derived_fields(chapter: Chapter) -> None:
+    """Recompute a chapter's derived columns from its loaded blocks"""
+    blocks = sorted(chapter.blocks, key=lambda block: block.position)
+    for field, value in derive_chapter_fields((block.block_type, block.content) for block in blocks).items():
+        setattr(chapter, field, value)
+
+
+def backfill_chapter_derived(db: Session, batch_size: int = 500, recompute: bool = False) -> int:
+    """
+    Fill derived columns in id order, committing per batch.
+
+    Args:
+        recompute: Also rewrite chapters that already have values (after
+            the derivation rules change)
+
+    Returns:
+        Number of chapters updated
+    """
+    updated = 0
+    last_id = 0
+
+    while True:
+        query = db.query(Chapter).options(selectinload(Chapter.blocks)).filter(Chapter.id > last_id)
+        if not recompute:
+            query = query.filter(or_(Chapter.word_count.is_(None), Chapter.blocks_snapshot.is_(None)))
+        chapters = query.order_by(Chapter.id).limit(batch_size).all()
+        if not chapters:
+            return updated
+
+        rows = []
+        for chapter in chapters:
+            blocks = sorted(chapter.blocks, key=lambda block: block.position)
+            fields = derive_chapter_fields((block.block_type, block.content) for block in blocks)
+            # Passing updated_at keeps its onupdate from firing; this is not an edit
+            rows.append({
+                "id": chapter.id,
+                "updated_at": chapter.updated_at,
+                "blocks_snapshot": blocks_snapshot(blocks),
+                **fields
+            })
+
+        # Bulk UPDATE by primary key
+        db.execute(update(Chapter).execution_options(synchronize_session=False), rows)
+        db.commit()
+        db.expunge_all()
+
+        updated += len(rows)
+        last_id = rows[-1]["id"]
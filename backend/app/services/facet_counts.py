@@ -0,0 +1,178 @@
+"""
+Maintained facet counts for faceted browse
+
+chapter_facet_counts holds how many chapters share each (theme_id, mood,
+time_period) combination, counting every chapter under theme_id 0 ("any
+theme") and under each of its themes. The table has one row per
+combination in use rather than per chapter, so the counts for a browse
+sidebar are a few grouped sums over a small table, whatever the number
+of chapters.
+
+The code paths that publish, edit, tag, untag and delete chapters apply
++1/-1 to the affected rows in the same transaction. A nightly job
+recounts from chapters and chapter_themes and repairs any drift (e.g.
+chapters removed by account-deletion cascades).
+"""
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.logging_config import logger
+from app.scheduler import register_job
+
+ANY_THEME = 0
+
+FacetKey = tuple[int, str, str]  # (theme_id, mood, time_period)
+
+
+def facet_keys(
+    mood: Optional[str],
+    time_period: Optional[str],
+    theme_ids: Iterable[int] = (),
+    any_theme: bool = True
+) -> list[FacetKey]:
+    """
+    Rows a chapter is counted under.
+
+    Args:
+        any_theme: Include the "any theme" row (False when only the
+            chapter's themes change)
+    """
+    mood, time_period = mood or "", time_period or ""
+    keys = [(ANY_THEME, mood, time_period)] if any_theme else []
+    return keys + [(theme_id, mood, time_period) for theme_id in theme_ids]
+
+
+def facet_counts_changed(db: Session, removed: Iterable[FacetKey] = (), added: Iterable[FacetKey] = ()) -> None:
+    """
+    Uncount `removed` and count `added` keys (keys in both cancel out).
+
+    One upsert of signed deltas over keys in a single global order, so
+    concurrent edits lock rows in the same order and cannot deadlock. A
+    decrement with no row to apply to is drift and is left to the repair
+    job.
+    """
+    deltas = Counter(added)
+    deltas.subtract(removed)
+
+    keys = sorted(key for key, delta in deltas.items() if delta)  # Consistent lock order
+    if not keys:
+        return
+
+    values = ", ".join(f"(:theme{i}, :mood{i}, :period{i}, :delta{i})" for i in range(len(keys)))
+    params = {}
+    for i, key in enumerate(keys):
+        params[f"theme{i}"], params[f"mood{i}"], params[f"period{i}"] = key
+        params[f"delta{i}"] = deltas[key]
+
+    db.execute(text(f"""
+        INSERT INTO chapter_facet_counts AS f (theme_id, mood, time_period, chapter_count)
+        SELECT v.theme_id, v.mood, v.time_period, v.delta
+        FROM (VALUES {values}) AS v(theme_id, mood, time_period, delta)
+        WHERE v.delta > 0 OR EXISTS (
+            SELECT 1 FROM chapter_facet_counts e
+            WHERE e.theme_id = v.theme_id AND e.mood = v.mood AND e.time_period = v.time_period
+        )
+        ORDER BY v.theme_id, v.mood, v.time_period
+        ON CONFLICT (theme_id, mood, time_period) DO UPDATE
+        SET chapter_count = GREATEST(f.chapter_count + EXCLUDED.chapter_count, 0)
+    """), params)
+
+
+def get_facet_counts(
+    db: Session,
+    mood: Optional[str] = None,
+    time_period: Optional[str] = None,
+    theme_id: Optional[int] = None
+) -> dict:
+    """
+    Matching total and per-value counts for the given browse filters.
+
+    Each facet's counts apply every filter except its own, so a sidebar
+    shows how many chapters each alternative value would give.
+
+    Returns:
+        {"total": int, "mood": [(value, count)], "time_period": [...],
+        "theme": [(theme_id, count)]}, values ordered by count
+    """
+    params = {"mood": mood, "time_period": time_period, "theme_id": theme_id or ANY_THEME,
+              "limit": settings.facet_values_limit}
+
+    def where(*skip: str) -> str:
+        conditions = ["chapter_count > 0"]
+        if "theme" not in skip:
+            conditions.append("theme_id = :theme_id")
+        if mood is not None and "mood" not in skip:
+            conditions.append("mood = :mood")
+        if time_period is not None and "time_period" not in skip:
+            conditions.append("time_period = :time_period")
+        return " AND ".join(conditions)
+
+    rows = db.execute(text(f"""
+        SELECT 'total' AS facet, NULL AS value, NULL::int AS theme_id, COALESCE(SUM(chapter_count), 0) AS count
+        FROM chapter_facet_counts WHERE {where()}
+        UNION ALL (
+            SELECT 'mood', mood, NULL, SUM(chapter_count) FROM chapter_facet_counts
+            WHERE {where("mood")} AND mood <> ''
+            GROUP BY mood ORDER BY 4 DESC, 2 LIMIT :limit
+        )
+        UNION ALL (
+            SELECT 'time_period', time_period, NULL, SUM(chapter_count) FROM chapter_facet_counts
+            WHERE {where("time_period")} AND time_period <> ''
+            GROUP BY time_period ORDER BY 4 DESC, 2 LIMIT :limit
+        )
+        UNION ALL (
+            SELECT 'theme', NULL, theme_id, SUM(chapter_count) FROM chapter_facet_counts
+            WHERE {where("theme")} AND theme_id <> {ANY_THEME}
+            GROUP BY theme_id ORDER BY 4 DESC, 3 LIMIT :limit
+        )
+    """), params).all()
+
+    counts = {"total": 0, "mood": [], "time_period": [], "theme": []}
+    for facet, value, row_theme_id, count in rows:
+        if facet == "total":
+            counts["total"] = int(count)
+        else:
+            counts[facet].append((row_theme_id if facet == "theme" else value, int(count)))
+    return counts
+
+
+@register_job("repair_facet_counts", interval=settings.facet_counts_repair_interval)
+def repair_facet_counts(db: Session) -> dict:
+    """Recount every facet combination from source rows and fix the ones that drifted"""
+    expected = """
+        SELECT 0 AS theme_id, COALESCE(mood, '') AS mood, COALESCE(time_period, '') AS time_period,
+               COUNT(*) AS chapter_count
+        FROM chapters
+        GROUP BY 2, 3
+        UNION ALL
+        SELECT ct.theme_id, COALESCE(c.mood, ''), COALESCE(c.time_period, ''), COUNT(*)
+        FROM chapter_themes ct JOIN chapters c ON c.id = ct.chapter_id
+        GROUP BY 1, 2, 3
+    """
+
+    repaired = db.execute(text(f"""
+        INSERT INTO chapter_facet_counts AS f (theme_id, mood, time_period, chapter_count)
+        {expected}
+        ON CONFLICT (theme_id, mood, time_period) DO UPDATE
+        SET chapter_count = EXCLUDED.chapter_count
+        WHERE f.chapter_count <> EXCLUDED.chapter_count
+    """)).rowcount
+
+    # Combinations no chapter has any more (including deleted themes)
+    repaired += db.execute(text(f"""
+        DELETE FROM chapter_facet_counts AS f
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ({expected}) AS e
+            WHERE e.theme_id = f.theme_id AND e.mood = f.mood AND e.time_period = f.time_period
+        )
+    """)).rowcount
+    db.commit()
+
+    if repaired:
+        logger.warning(f"Repaired {repaired} drifted facet counts")
+
+    return {"repaired": repaired}
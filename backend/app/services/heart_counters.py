@@ -0,0 +1,228 @@
+"""
+Write-behind heart counters
+
+Heart/unheart deltas are accumulated per chapter in a Redis hash (HINCRBY)
+once the heart row commits, then flushed to chapters.heart_count in batched
+UPDATE ... FROM (VALUES ...) statements every few seconds. A viral chapter's
+row is written once per flush instead of once per tap.
+
+Reads merge the pending delta. A reconciliation job recounts from the
+hearts table to correct any drift (e.g. a delta lost between commit and
+HINCRBY).
+
+Flushing and reconciling share one Redis lock (heart_deltas:lock), so a
+flushing hash is applied by one process at a time and no flush lands in
+the middle of a recount. The recount takes the pending deltas of each id
+range out of Redis just before counting: their hearts are already
+committed, so the count includes them. A heart committed while a range is
+being counted may still be counted twice until the next reconcile.
+"""
+from collections import Counter
+from typing import Iterable
+
+import redis
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import engine
+from app.logging_config import logger
+from app.scheduler import register_job
+
+redis_client = redis.from_url(settings.redis_url)
+
+PENDING_KEY = "heart_deltas"
+FLUSHING_KEY = "heart_deltas:flushing"
+LOCK_KEY = "heart_deltas:lock"
+LOCK_TIMEOUT = 300  # seconds; a reconcile refreshes it for every id range
+
+FLUSH_BATCH_SIZE = 500
+RECONCILE_BATCH_SIZE = 5000
+
+# Remove and return the pending deltas of chapter ids in [low, high)
+_TAKE_PENDING_RANGE = redis_client.register_script("""
+local taken = {}
+local entries = redis.call('HGETALL', KEYS[1])
+for i = 1, #entries, 2 do
+    local chapter_id = tonumber(entries[i])
+    if chapter_id >= tonumber(ARGV[1]) and chapter_id < tonumber(ARGV[2]) then
+        redis.call('HDEL', KEYS[1], entries[i])
+        table.insert(taken, entries[i])
+        table.insert(taken, entries[i + 1])
+    end
+end
+return taken
+""")
+
+
+def buffer_heart_delta(db: Session, chapter_id: int, delta: int) -> None:
+    """
+    Queue a heart_count change for a chapter.
+
+    The delta is held on the session and only reaches Redis after the
+    transaction that wrote the heart row commits.
+    """
+    db.info.setdefault("heart_deltas", Counter())[chapter_id] += delta
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_heart_deltas(session: Session) -> None:
+    deltas = session.info.pop("heart_deltas", None)
+    if not deltas:
+        return
+
+    deltas = {chapter_id: delta for chapter_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for chapter_id, delta in deltas.items():
+            pipe.hincrby(PENDING_KEY, chapter_id, delta)
+        pipe.execute()
+    except redis.RedisError as e:
+        # Redis unavailable: fall back to an atomic increment in Postgres
+        logger.warning(f"Heart counter buffer unavailable, writing through: {e}")
+        _apply_deltas(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_heart_deltas(session: Session) -> None:
+    session.info.pop("heart_deltas", None)
+
+
+def _apply_deltas(deltas: dict[int, int]) -> int:
+    """Apply {chapter_id: delta} in batched UPDATE ... FROM (VALUES ...) statements"""
+    items = sorted(deltas.items())  # Consistent lock order across flushers
+    updated = 0
+
+    with engine.begin() as conn:
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            values = ", ".join(f"(:id{i}, :delta{i})" for i in range(len(batch)))
+            params = {}
+            for i, (chapter_id, delta) in enumerate(batch):
+                params[f"id{i}"] = int(chapter_id)
+                params[f"delta{i}"] = int(delta)
+
+            result = conn.execute(text(f"""
+                UPDATE chapters AS c
+                SET heart_count = GREATEST(c.heart_count + v.delta, 0)
+                FROM (VALUES {values}) AS v(id, delta)
+                WHERE c.id = v.id
+            """), params)
+            updated += result.rowcount
+
+    return updated
+
+
+def pending_heart_deltas(chapter_ids: Iterable[int]) -> dict[int, int]:
+    """Deltas not yet flushed to Postgres (including a flush in progress)"""
+    chapter_ids = list(chapter_ids)
+    if not chapter_ids:
+        return {}
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hmget(PENDING_KEY, chapter_ids)
+        pipe.hmget(FLUSHING_KEY, chapter_ids)
+        pending, flushing = pipe.execute()
+    except redis.RedisError:
+        return {}
+
+    deltas = {}
+    for chapter_id, a, b in zip(chapter_ids, pending, flushing):
+        delta = int(a or 0) + int(b or 0)
+        if delta:
+            deltas[chapter_id] = delta
+    return deltas
+
+
+def current_heart_counts(chapters) -> dict[int, int]:
+    """Stored heart_count plus pending delta, keyed by chapter id"""
+    deltas = pending_heart_deltas(chapter.id for chapter in chapters)
+    return {
+        chapter.id: max(chapter.heart_count + deltas.get(chapter.id, 0), 0)
+        for chapter in chapters
+    }
+
+
+def _flush() -> int:
+    """Apply the flushing hash (or the pending one) to Postgres; call with the lock held"""
+    # A leftover flushing hash means a previous flush died before deleting it;
+    # retry it before taking new deltas (at-least-once; reconcile fixes repeats)
+    if not redis_client.exists(FLUSHING_KEY):
+        try:
+            redis_client.rename(PENDING_KEY, FLUSHING_KEY)
+        except redis.ResponseError:
+            return 0  # Nothing pending
+
+    raw = redis_client.hgetall(FLUSHING_KEY)
+    deltas = {int(chapter_id): int(delta) for chapter_id, delta in raw.items() if int(delta)}
+
+    updated = _apply_deltas(deltas) if deltas else 0
+    redis_client.delete(FLUSHING_KEY)
+    return updated
+
+
+@register_job("flush_heart_counters", interval=settings.heart_counter_flush_interval)
+def flush_heart_counters(db: Session) -> dict:
+    """Move buffered deltas from Redis into chapters.heart_count"""
+    lock = redis_client.lock(LOCK_KEY, timeout=LOCK_TIMEOUT, blocking=False)
+    if not lock.acquire():
+        return {"chapters": 0, "skipped": "locked"}  # Another flush or a reconcile is running
+    try:
+        return {"chapters": _flush()}
+    finally:
+        lock.release()
+
+
+@register_job("reconcile_heart_counts", interval=settings.heart_counter_reconcile_interval)
+def reconcile_heart_counts(db: Session) -> dict:
+    """Recount heart_count from the hearts table, in chapter id ranges"""
+    lock = redis_client.lock(LOCK_KEY, timeout=LOCK_TIMEOUT, blocking_timeout=LOCK_TIMEOUT)
+    if not lock.acquire():
+        raise RuntimeError("Timed out waiting for the heart counter lock")
+
+    try:
+        _flush()
+
+        max_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM chapters")).scalar()
+        corrected = 0
+
+        for low in range(1, max_id + 1, RECONCILE_BATCH_SIZE):
+            lock.reacquire()
+            high = low + RECONCILE_BATCH_SIZE
+
+            # Deltas of committed hearts, which the count below includes
+            taken = _TAKE_PENDING_RANGE(keys=[PENDING_KEY], args=[low, high])
+            try:
+                result = db.execute(text("""
+                    UPDATE chapters AS c
+                    SET heart_count = counts.n
+                    FROM (
+                        SELECT ch.id, COUNT(h.id) AS n
+                        FROM chapters ch
+                        LEFT JOIN hearts h ON h.chapter_id = ch.id
+                        WHERE ch.id >= :low AND ch.id < :high
+                        GROUP BY ch.id
+                    ) AS counts
+                    WHERE c.id = counts.id AND c.heart_count <> counts.n
+                """), {"low": low, "high": high})
+                db.commit()
+            except Exception:
+                # Put the taken deltas back so they are not lost with the recount
+                db.rollback()
+                pipe = redis_client.pipeline(transaction=False)
+                for chapter_id, delta in zip(taken[::2], taken[1::2]):
+                    pipe.hincrby(PENDING_KEY, chapter_id, int(delta))
+                pipe.execute()
+                raise
+            corrected += result.rowcount
+    finally:
+        lock.release()
+
+    if corrected:
+        logger.info(f"Reconciled heart_count on {corrected} chapters")
+
+    return {"corrected": corrected}
@@ -1,6 +1,20 @@
-"""Muse Level Progression Service"""
+"""
+Muse Level Progression Service
+
+XP awards are appended to the xp_events ledger in the caller's
+transaction. A background job folds the ledger into the muse_xp /
+muse_level snapshot on users; replay_xp recomputes that snapshot from
+the ledger for audits.
+"""
+from typing import Optional
+
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
+
+from app.config import settings
 from app.models.user import User
+from app.models.xp_event import XPEvent
+from app.scheduler import register_job
 
 # Muse levels and XP thresholds
 MUSE_LEVELS = {
@@ -10,6 +24,8 @@ MUSE_LEVELS = {
     "resonance": {"name": "Resonance", "xp_required": 600, "next": None},
 }
 
+LEVEL_ORDER = ["spark", "shaper", "echo", "resonance"]
+
 # XP rewards for different actions
 XP_REWARDS = {
     "publish_chapter": 10,
@@ -21,10 +37,31 @@ XP_REWARDS = {
 }
 
 
+def level_for_xp(xp: int) -> str:
+    """Highest muse level reached at `xp`"""
+    for level_key in reversed(LEVEL_ORDER):
+        if xp >= MUSE_LEVELS[level_key]["xp_required"]:
+            return level_key
+    return "spark"
+
+
+def _level_case(xp_sql: str) -> str:
+    """SQL CASE expression mapping an XP expression to its muse level"""
+    whens = " ".join(
+        f"WHEN {xp_sql} >= {MUSE_LEVELS[key]['xp_required']} THEN '{key}'"
+        for key in reversed(LEVEL_ORDER)
+    )
+    return f"CASE {whens} ELSE 'spark' END"
+
+
 def get_muse_info(user: User) -> dict:
     """
     Get current muse level information for a user.
     
+    Reads the snapshot on the user row (muse_xp / muse_level), which the
+    XP aggregator keeps current; awards from the last few seconds may not
+    be reflected yet.
+    
     Returns:
         dict: Muse level info including name, current XP, and progress to next level
     """
@@ -53,7 +90,10 @@ def get_muse_info(user: User) -> dict:
 
 def award_xp(db: Session, user: User, action: str) -> dict:
     """
-    Award XP to a user for an action and check for level up.
+    Record an XP award in the ledger.
+    
+    The event is added to the caller's transaction (no commit, no lock on
+    the users row). The aggregator folds it into muse_xp / muse_level.
     
     Args:
         db: Database session
@@ -61,42 +101,142 @@ def award_xp(db: Session, user: User, action: str) -> dict:
         action: Action that earned XP (from XP_REWARDS keys)
     
     Returns:
-        dict: Result with xp_gained, new_total, and level_up info
+        dict: Result with action and xp_gained
+    
+    Raises:
+        ValueError: If action is not an XP_REWARDS key
     """
-    xp_gained = XP_REWARDS.get(action, 0)
+    if action not in XP_REWARDS:
+        raise ValueError(f"Unknown XP action: {action!r}")
     
-    if xp_gained == 0:
-        return {"xp_gained": 0, "xp_total": user.muse_xp, "leveled_up": False}
+    xp_gained = XP_REWARDS[action]
+    db.add(XPEvent(user_id=user.id, action=action, xp=xp_gained))
     
-    old_level = user.muse_level
-    user.muse_xp += xp_gained
+    return {"action": action, "xp_gained": xp_gained}
+
+
+@register_job("aggregate_xp", interval=settings.xp_aggregate_interval)
+def aggregate_xp(db: Session, batch_size: int = 5000) -> dict:
+    """
+    Fold unapplied ledger rows into users.muse_xp and recompute muse_level.
     
-    # Determine the correct level based on XP
-    level_order = ["spark", "shaper", "echo", "resonance"]
-    new_level = "spark"
+    Each batch is claimed with FOR UPDATE SKIP LOCKED, stamped applied_at
+    and summed per user in a single statement, so concurrent aggregators
+    never apply an event twice.
+    """
+    events = users = 0
     
-    for level_key in reversed(level_order):
-        if user.muse_xp >= MUSE_LEVELS[level_key]["xp_required"]:
-            new_level = level_key
+    while True:
+        row = db.execute(text(f"""
+            WITH batch AS (
+                SELECT id FROM xp_events
+                WHERE applied_at IS NULL
+                ORDER BY id
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            ), applied AS (
+                UPDATE xp_events e SET applied_at = now()
+                FROM batch WHERE e.id = batch.id
+                RETURNING e.user_id, e.xp
+            ), totals AS (
+                SELECT user_id, SUM(xp) AS xp, COUNT(*) AS n FROM applied GROUP BY user_id
+            ), updated AS (
+                UPDATE users u
+                SET muse_xp = u.muse_xp + totals.xp,
+                    muse_level = {_level_case("u.muse_xp + totals.xp")}
+                FROM totals WHERE u.id = totals.user_id
+                RETURNING u.id
+            )
+            SELECT
+                (SELECT COALESCE(SUM(n), 0) FROM totals),
+                (SELECT COUNT(*) FROM updated)
+        """), {"batch_size": batch_size}).one()
+        db.commit()
+        
+        events += row[0]
+        users += row[1]
+        if row[0] < batch_size:
             break
     
-    leveled_up = new_level != old_level
-    new_level_name = MUSE_LEVELS[new_level]["name"] if leveled_up else None
+    return {"events": events, "users": users}
+
+
+def replay_xp(db: Session, user_ids: Optional[list[int]] = None, apply: bool = False) -> list[dict]:
+    """
+    Recompute muse_xp / muse_level from the applied ledger and compare
+    with the stored snapshot.
+    
+    Args:
+        db: Database session
+        user_ids: Limit the replay to these users (default: everyone)
+        apply: Overwrite mismatched snapshots with the replayed values
     
-    if leveled_up:
-        user.muse_level = new_level
+    Returns:
+        list: One entry per mismatched user (stored vs replayed)
+    """
+    user_filter = "AND u.id = ANY(:user_ids)" if user_ids else ""
+    rows = db.execute(text(f"""
+        SELECT u.id, u.muse_xp, u.muse_level, COALESCE(SUM(e.xp), 0) AS replayed_xp
+        FROM users u
+        LEFT JOIN xp_events e ON e.user_id = u.id AND e.applied_at IS NOT NULL
+        WHERE true {user_filter}
+        GROUP BY u.id
+    """), {"user_ids": user_ids} if user_ids else {}).all()
     
-    db.commit()
-    db.refresh(user)
+    mismatches = []
+    for user_id, stored_xp, stored_level, replayed_xp in rows:
+        replayed_level = level_for_xp(replayed_xp)
+        if stored_xp != replayed_xp or stored_level != replayed_level:
+            mismatches.append({
+                "user_id": user_id,
+                "stored_xp": stored_xp,
+                "stored_level": stored_level,
+                "replayed_xp": replayed_xp,
+                "replayed_level": replayed_level,
+            })
     
-    return {
-        "xp_gained": xp_gained,
-        "xp_total": user.muse_xp,
-        "leveled_up": leveled_up,
-        "old_level": old_level,
-        "new_level": new_level if leveled_up else None,
-        "new_level_name": new_level_name,
-    }
+    if apply and mismatches:
+        for entry in mismatches:
+            db.execute(
+                text("UPDATE users SET muse_xp = :xp, muse_level = :level WHERE id = :id"),
+                {"xp": entry["replayed_xp"], "level": entry["replayed_level"], "id": entry["user_id"]}
+            )
+        db.commit()
+    
+    return mismatches
+
+
+def get_xp_history(db: Session, user_id: int, limit: int = 100) -> list[dict]:
+    """
+    A user's last `limit` ledger entries, oldest first, with running XP
+    total and level. The running total is summed in SQL, so only the
+    returned rows leave the database.
+    """
+    ledger = db.query(
+        XPEvent.id,
+        XPEvent.action,
+        XPEvent.xp,
+        XPEvent.created_at,
+        XPEvent.applied_at,
+        func.sum(XPEvent.xp).over(order_by=XPEvent.id).label("xp_total")
+    ).filter(
+        XPEvent.user_id == user_id
+    ).subquery()
+    
+    rows = db.query(ledger).order_by(ledger.c.id.desc()).limit(limit).all()
+    
+    return [
+        {
+            "id": row.id,
+            "action": row.action,
+            "xp": row.xp,
+            "xp_total": int(row.xp_total),
+            "level": level_for_xp(int(row.xp_total)),
+            "created_at": row.created_at,
+            "applied": row.applied_at is not None,
+        }
+        for row in reversed(rows)
+    ]
 
 
 def can_use_feature(user: User, feature: str) -> bool:
@@ -109,11 +249,9 @@ def can_use_feature(user: User, feature: str) -> bool:
     - echo: voice memory and remixing
     - resonance: connection facilitation
     """
-    level_order = ["spark", "shaper", "echo", "resonance"]
-    
     # Handle invalid muse level gracefully
     try:
-        user_level_index = level_order.index(user.muse_level)
+        user_level_index = LEVEL_ORDER.index(user.muse_level)
     except ValueError:
         # Default to spark if invalid level
         user_level_index = 0
@@ -27,6 +27,8 @@ def create_notification(
     
     Respects Quiet Mode - if user has quiet_mode enabled, notification is
     created but not pushed (they'll see it when they return).
+    
+    The notification is added to the caller's transaction; the caller commits.
     """
     notification = Notification(
         user_id=user_id,
@@ -40,18 +42,16 @@ def create_notification(
     )
     
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
     
     return notification
 
 
 def notify_margin_added(db: Session, margin: Margin, chapter: Chapter):
     """Someone left a margin on your chapter"""
-    if margin.user_id == chapter.author_id:
+    if margin.author_id == chapter.author_id:
         return  # Don't notify yourself
     
-    actor = db.query(User).filter(User.id == margin.user_id).first()
+    actor = db.query(User).filter(User.id == margin.author_id).first()
     if not actor:
         return
     
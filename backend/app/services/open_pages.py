@@ -1,115 +1,124 @@
-"""Open Pages business logic"""
+"""
+Open Pages business logic
+
+Open Pages accrue lazily: one per day since last_open_page_grant, capped
+at MAX_OPEN_PAGES. The stored open_pages column is the balance as of
+last_open_page_grant; the effective balance is derived at read time, so
+there is no daily grant job.
+"""
 from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from sqlalchemy import func, update, case, Integer, literal
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
 
 from app.models import User
 
+MAX_OPEN_PAGES = 3
+ACCRUAL_PERIOD = timedelta(days=1)
+
+
+def elapsed_periods(last_grant: Optional[datetime], now: datetime) -> int:
+    """Whole accrual periods since last_grant (0 if never anchored)"""
+    if last_grant is None or now <= last_grant:
+        return 0
+    return (now - last_grant) // ACCRUAL_PERIOD
+
+
+def effective_open_pages(stored: int, last_grant: Optional[datetime], now: Optional[datetime] = None) -> int:
+    """min(MAX_OPEN_PAGES, stored + elapsed days)"""
+    now = now or datetime.now(timezone.utc)
+    return min(MAX_OPEN_PAGES, stored + elapsed_periods(last_grant, now))
+
+
+def after_consume(stored: int, last_grant: Optional[datetime], now: datetime) -> tuple[int, datetime]:
+    """
+    Stored balance and accrual anchor after spending one page at `now`.
+
+    Partial-day progress toward the next page is kept unless the balance
+    was capped (a full balance does not bank time).
+    """
+    periods = elapsed_periods(last_grant, now)
+    if last_grant is None or stored + periods >= MAX_OPEN_PAGES:
+        return min(MAX_OPEN_PAGES, stored + periods) - 1, now
+    return stored + periods - 1, last_grant + periods * ACCRUAL_PERIOD
+
+
+# SQL equivalents of elapsed_periods / effective_open_pages
+_elapsed_periods_sql = func.greatest(
+    func.floor(
+        func.extract("epoch", func.now() - func.coalesce(User.last_open_page_grant, func.now()))
+        / ACCRUAL_PERIOD.total_seconds()
+    ),
+    0
+).cast(Integer)
+
+open_pages_effective = func.least(MAX_OPEN_PAGES, User.open_pages + _elapsed_periods_sql)
+
 
 def check_open_pages(user: User) -> int:
     """
     Check how many Open Pages a user has available.
-    
+
     Returns:
         int: Number of available Open Pages (0-3)
     """
-    return user.open_pages
+    return effective_open_pages(user.open_pages, user.last_open_page_grant)
 
 
 def can_publish(user: User) -> bool:
     """
     Check if a user can publish a chapter.
-    
+
     Returns:
         bool: True if user has at least 1 Open Page
     """
-    return user.open_pages > 0
+    return check_open_pages(user) > 0
 
 
-def consume_open_page(user: User, db: Session) -> None:
+def consume_open_page(user: User, db: Session) -> int:
     """
     Consume one Open Page when publishing a chapter.
-    
+
+    A single conditional UPDATE ... RETURNING, so concurrent publishes
+    cannot double-spend. Runs in the caller's transaction; the caller commits.
+
     Args:
         user: The user publishing
         db: Database session
-        
+
+    Returns:
+        int: Open Pages remaining
+
     Raises:
         HTTPException: If user has no Open Pages available
     """
-    if user.open_pages <= 0:
+    capped = User.open_pages + _elapsed_periods_sql >= MAX_OPEN_PAGES
+
+    row = db.execute(
+        update(User)
+        .where(User.id == user.id, open_pages_effective > 0)
+        .values(
+            open_pages=open_pages_effective - 1,
+            last_open_page_grant=case(
+                (User.last_open_page_grant.is_(None) | capped, func.now()),
+                else_=User.last_open_page_grant + _elapsed_periods_sql * literal(ACCRUAL_PERIOD)
+            )
+        )
+        .returning(User.open_pages, User.last_open_page_grant)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"No Open Pages available. You have {user.open_pages} Open Pages. "
-                   f"Open Pages are granted daily (max 3 stored)."
+            detail=f"No Open Pages available. You have 0 Open Pages. "
+                   f"Open Pages are granted daily (max {MAX_OPEN_PAGES} stored)."
         )
-    
-    user.open_pages -= 1
-    db.commit()
-    db.refresh(user)
 
+    set_committed_value(user, "open_pages", row.open_pages)
+    set_committed_value(user, "last_open_page_grant", row.last_open_page_grant)
 
-def grant_daily_open_page(user: User, db: Session) -> bool:
-    """
-    Grant one Open Page to a user (daily grant logic).
-    
-    Rules:
-    - Grant 1 Open Page per day
-    - Maximum 3 Open Pages can be stored
-    - Only grant if user has < 3 Open Pages
-    
-    Args:
-        user: The user to grant Open Page to
-        db: Database session
-        
-    Returns:
-        bool: True if Open Page was granted, False if already at max
-    """
-    now = datetime.now(timezone.utc)
-    
-    # Check if user already has max Open Pages
-    if user.open_pages >= 3:
-        return False
-    
-    # Check if we've already granted today
-    if user.last_open_page_grant:
-        # If last grant was less than 24 hours ago, don't grant
-        time_since_last_grant = now - user.last_open_page_grant
-        if time_since_last_grant < timedelta(hours=24):
-            return False
-    
-    # Grant the Open Page
-    user.open_pages += 1
-    user.last_open_page_grant = now
-    db.commit()
-    db.refresh(user)
-    
-    return True
-
-
-def grant_open_pages_to_all_users(db: Session) -> dict:
-    """
-    Grant Open Pages to all eligible users (background job).
-    
-    This should be run daily by a background worker.
-    
-    Returns:
-        dict: Statistics about the grant operation
-    """
-    users = db.query(User).all()
-    
-    granted_count = 0
-    skipped_count = 0
-    
-    for user in users:
-        if grant_daily_open_page(user, db):
-            granted_count += 1
-        else:
-            skipped_count += 1
-    
-    return {
-        "total_users": len(users),
-        "granted": granted_count,
-        "skipped": skipped_count,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+    return row.open_pages
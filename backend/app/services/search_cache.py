@@ -0,0 +1,164 @@
+"""
+Search result page cache
+
+Popular queries are answered from Redis instead of re-running the search
+join and count. Entries hold only chapter ids (and the total), keyed by
+the endpoint, the normalized query and filters, and the page; chapters
+are hydrated per request, so privacy and blocking are applied for each
+viewer and deleted chapters simply drop out.
+
+All pages of one query live in a Redis hash (search_cache:{kind}:{hash})
+that expires search_cache_ttl seconds after its first page was cached.
+Each cached query is also listed in a registry (search_cache:queries),
+so publishing a chapter can delete exactly the queries it would appear
+in. Other changes (theme tagging, title edits) show up when the entry
+expires.
+
+Hit ratio and time saved per query class (endpoint) are reported on
+/admin/cache/search.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Callable
+
+import redis
+
+from app.config import settings
+from app.events import subscribe, CHAPTER_PUBLISHED
+from app.logging_config import logger
+
+redis_client = redis.from_url(settings.redis_url)
+
+KEY_PREFIX = "search_cache:"
+REGISTRY_KEY = "search_cache:queries"
+
+_stats: dict[str, dict] = {}  # kind -> counters
+_stats_lock = threading.Lock()
+
+
+def normalize_query(q: str) -> str:
+    """Case- and whitespace-insensitive form of a search query (lower(), as in SQL)"""
+    return " ".join(q.lower().split())
+
+
+def _key(kind: str, params: dict) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:20]
+    return f"{KEY_PREFIX}{kind}:{digest}"
+
+
+def _record(kind: str, hit: bool, seconds: float) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(kind, {"hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0})
+        stats["hits" if hit else "misses"] += 1
+        stats["hit_seconds" if hit else "miss_seconds"] += seconds
+
+
+def cached_page(kind: str, params: dict, page: int, per_page: int, compute: Callable[[], dict]) -> dict:
+    """
+    One page of results for a query, from the cache or from compute().
+
+    Args:
+        kind: Query class ("search", "browse")
+        params: Normalized query and filters (JSON-serializable)
+        compute: Returns the page as a JSON-serializable dict of ids
+            (and totals)
+    """
+    if not settings.search_cache_enabled:
+        return compute()
+
+    start = time.perf_counter()
+    key = _key(kind, params)
+    field = f"{page}:{per_page}"
+
+    try:
+        cached = redis_client.hget(key, field)
+    except redis.RedisError as e:
+        logger.warning(f"Search cache read failed for {key}: {e}")
+        return compute()
+
+    if cached is not None:
+        _record(kind, True, time.perf_counter() - start)
+        return json.loads(cached)
+
+    result = compute()
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(key, field, json.dumps(result))
+        pipe.expire(key, settings.search_cache_ttl, nx=True)
+        pipe.zadd(
+            REGISTRY_KEY,
+            {json.dumps({"kind": kind, "params": params, "key": key}, sort_keys=True):
+                time.time() + settings.search_cache_ttl},
+            gt=True
+        )
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Search cache write failed for {key}: {e}")
+    _record(kind, False, time.perf_counter() - start)
+    return result
+
+
+def _affected(entry: dict, chapter: dict) -> bool:
+    """Whether a newly published chapter belongs in a cached query's results"""
+    params = entry["params"]
+    if entry["kind"] == "search":
+        return any(params["q"] in (chapter.get(field) or "").lower() for field in ("title", "mood"))
+    if entry["kind"] == "browse":
+        # New chapters have no themes yet
+        return params["theme"] is None and all(
+            params[field] is None or params[field] == chapter.get(field)
+            for field in ("mood", "time_period")
+        )
+    return True
+
+
+@subscribe(CHAPTER_PUBLISHED)
+def _invalidate_on_publish(payload: dict) -> None:
+    if not settings.search_cache_enabled:
+        return
+    now = time.time()
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zremrangebyscore(REGISTRY_KEY, "-inf", now)
+        pipe.zrangebyscore(REGISTRY_KEY, now, "+inf")
+        _, members = pipe.execute()
+
+        stale = [json.loads(member) for member in members]
+        stale = [entry for entry in stale if _affected(entry, payload)]
+        if stale:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.delete(*{entry["key"] for entry in stale})
+            pipe.zrem(REGISTRY_KEY, *[json.dumps(entry, sort_keys=True) for entry in stale])
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Search cache invalidation failed for chapter {payload['chapter_id']}: {e}")
+
+
+def get_search_cache_stats() -> dict:
+    """Hit ratio and estimated latency saved per query class on this worker"""
+    with _stats_lock:
+        snapshot = {kind: dict(stats) for kind, stats in _stats.items()}
+
+    report = {}
+    for kind, stats in snapshot.items():
+        lookups = stats["hits"] + stats["misses"]
+        avg_hit_ms = stats["hit_seconds"] * 1000 / stats["hits"] if stats["hits"] else 0.0
+        avg_miss_ms = stats["miss_seconds"] * 1000 / stats["misses"] if stats["misses"] else 0.0
+        report[kind] = {
+            "lookups": lookups,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "avg_hit_ms": round(avg_hit_ms, 3),
+            "avg_miss_ms": round(avg_miss_ms, 3),
+            # Each hit skipped a miss-sized search
+            "estimated_saved_ms": round(stats["hits"] * max(avg_miss_ms - avg_hit_ms, 0.0), 1),
+        }
+    return report
+
+
+def reset_search_cache_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,333 @@
+"""
+Search suggestions from an in-memory prefix index
+
+Each worker holds a sorted array of completion keys built from chapter
+titles, moods and theme names, and answers /search/suggest with a
+binary search plus a top-k pick over the matching range. Titles are also
+indexed from each word, so "goodbye" completes "The Long Goodbye".
+Prefixes of up to TOP_PREFIX_LENGTH characters match too many keys to
+scan, so their top completions are kept precomputed.
+
+Sharing across workers:
+
+- The build_suggest_snapshot job loads the terms from the database and
+  stores them in Redis (suggest_index:snapshot), tagged with the id of
+  the last entry in the suggest_index:terms stream at that point, then
+  bumps suggest_index:version.
+- Publishing a chapter appends its title and mood to the stream.
+- A worker checks the version at most once per suggest_check_interval.
+  On a new version it reloads the snapshot in a background thread;
+  otherwise it applies stream entries it has not seen yet.
+
+Suggestions are completions, not search results: edited or deleted
+titles linger until the next snapshot, and a chapter published while a
+snapshot is being built may be counted twice until the one after. A
+cold worker answers with no suggestions until its first load finishes;
+without Redis it builds from the database and only sees its own
+publishes.
+"""
+import bisect
+import heapq
+import json
+import re
+import threading
+import time
+import zlib
+from typing import Iterable
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.events import subscribe, CHAPTER_PUBLISHED
+from app.logging_config import logger
+from app.scheduler import register_job
+
+redis_client = redis.from_url(settings.redis_url)
+
+VERSION_KEY = "suggest_index:version"
+SNAPSHOT_KEY = "suggest_index:snapshot"
+STREAM_KEY = "suggest_index:terms"
+STREAM_MAX_LENGTH = 100000
+
+MAX_LIMIT = 20
+TOP_PREFIX_LENGTH = 3  # Prefixes this short use precomputed top completions
+MAX_SCAN = 1000  # Longer prefixes rank at most this many keys (alphabetically first)
+MAX_TITLE_WORDS = 8  # Title words indexed as completion starts
+
+_SEP = "\x00"  # Sorts before any character, so a key's prefix range stays contiguous
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+Term = tuple[str, str, int]  # (display text, kind, weight)
+
+
+def normalize(value: str) -> str:
+    return " ".join(_PUNCTUATION.sub(" ", value.casefold()).split())
+
+
+class PrefixIndex:
+    """
+    Sorted completion keys "<start><SEP><kind><SEP><display>", one per
+    indexed start of each term, with weights (chapters using the term).
+    """
+
+    def __init__(self, terms: Iterable[Term] = ()):
+        self._weights: dict[str, int] = {}
+        for display, kind, weight in terms:
+            for key in self._keys_for(display, kind):
+                self._weights[key] = self._weights.get(key, 0) + weight
+        self._keys = sorted(self._weights)
+
+        top: dict[str, list] = {}
+        for key, weight in self._weights.items():
+            for prefix in self._short_prefixes(key):
+                heap = top.setdefault(prefix, [])
+                if len(heap) < MAX_LIMIT * 2:
+                    heapq.heappush(heap, (weight, key))
+                elif (weight, key) > heap[0]:
+                    heapq.heapreplace(heap, (weight, key))
+        self._top = {prefix: sorted(heap, reverse=True) for prefix, heap in top.items()}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _keys_for(display: str, kind: str) -> list[str]:
+        words = normalize(display).split()
+        if not words:
+            return []
+        starts = range(min(len(words), MAX_TITLE_WORDS)) if kind == "title" else range(1)
+        return [f"{' '.join(words[i:])}{_SEP}{kind}{_SEP}{display}" for i in starts]
+
+    @staticmethod
+    def _short_prefixes(key: str) -> list[str]:
+        start = key.split(_SEP, 1)[0]
+        return [start[:n] for n in range(1, min(len(start), TOP_PREFIX_LENGTH) + 1)]
+
+    def add(self, display: str, kind: str, weight: int = 1) -> None:
+        """Count one more use of a term (called with the worker's lock held)"""
+        for key in self._keys_for(display, kind):
+            if key not in self._weights:
+                bisect.insort(self._keys, key)
+            self._weights[key] = self._weights.get(key, 0) + weight
+
+            for prefix in self._short_prefixes(key):
+                top = [entry for entry in self._top.get(prefix, []) if entry[1] != key]
+                top.append((self._weights[key], key))
+                top.sort(reverse=True)
+                self._top[prefix] = top[:MAX_LIMIT * 2]
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """Completions for `query`, most used first, one per (kind, text)"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        if len(prefix) <= TOP_PREFIX_LENGTH:
+            candidates = self._top.get(prefix, [])
+        else:
+            low = bisect.bisect_left(self._keys, prefix)
+            high = min(bisect.bisect_left(self._keys, prefix + "\U0010ffff"), low + MAX_SCAN)
+            candidates = heapq.nlargest(
+                limit * 2, ((self._weights[key], key) for key in self._keys[low:high])
+            )
+
+        results = []
+        seen = set()
+        for weight, key in candidates:
+            _, kind, display = key.split(_SEP, 2)
+            if (kind, display) in seen:
+                continue
+            seen.add((kind, display))
+            results.append({"text": display, "kind": kind, "count": weight})
+            if len(results) == limit:
+                break
+        return results
+
+
+_lock = threading.Lock()
+_state = {
+    "index": None,          # PrefixIndex
+    "version": None,        # Redis version the index was loaded at
+    "stream_id": "0-0",     # Last stream entry applied
+    "checked_at": 0.0,
+    "loading": False,
+}
+
+
+def load_terms(db: Session) -> list[Term]:
+    """Titles (most recent distinct ones), moods and theme names with chapter counts"""
+    titles = db.execute(text("""
+        SELECT title, COUNT(*) FROM chapters
+        WHERE title IS NOT NULL AND title <> ''
+        GROUP BY title
+        ORDER BY MAX(published_at) DESC
+        LIMIT :limit
+    """), {"limit": settings.suggest_max_titles}).all()
+    moods = db.execute(text("""
+        SELECT mood, SUM(chapter_count) FROM chapter_facet_counts
+        WHERE theme_id = 0 AND mood <> ''
+        GROUP BY mood
+        HAVING SUM(chapter_count) > 0
+    """)).all()
+    themes = db.execute(text("SELECT name, chapter_count FROM themes")).all()
+
+    return (
+        [(title, "title", int(count)) for title, count in titles]
+        + [(mood, "mood", int(count)) for mood, count in moods]
+        + [(name, "theme", max(int(count), 1)) for name, count in themes]
+    )
+
+
+def _last_stream_id() -> str:
+    entries = redis_client.xrevrange(STREAM_KEY, count=1)
+    return entries[0][0].decode() if entries else "0-0"
+
+
+def _stream_key(entry_id: str) -> tuple[int, int]:
+    ms, seq = entry_id.split("-")
+    return int(ms), int(seq)
+
+
+def _read_stream(after: str) -> list[tuple[str, dict]]:
+    """Stream entries after `after` as (id, {kind: value})"""
+    entries = []
+    while True:
+        batch = redis_client.xrange(STREAM_KEY, min=f"({after}", count=1000)
+        if not batch:
+            return entries
+        for entry_id, fields in batch:
+            after = entry_id.decode()
+            entries.append((after, {key.decode(): value.decode() for key, value in fields.items()}))
+
+
+def _apply(index: PrefixIndex, entries: list[tuple[str, dict]], after: str) -> str:
+    """Add entries newer than `after` to `index`. Returns the last id applied."""
+    for entry_id, fields in entries:
+        if _stream_key(entry_id) <= _stream_key(after):
+            continue  # Already applied by a concurrent refresh
+        for kind in ("title", "mood"):
+            if fields.get(kind):
+                index.add(fields[kind], kind)
+        after = entry_id
+    return after
+
+
+def _load() -> None:
+    """Build this worker's index from the shared snapshot (or the database)"""
+    try:
+        try:
+            version = redis_client.get(VERSION_KEY)
+            blob = redis_client.get(SNAPSHOT_KEY)
+            if blob is not None:
+                snapshot = json.loads(zlib.decompress(blob))
+                terms, stream_id = snapshot["terms"], snapshot["stream_id"]
+            else:
+                stream_id = _last_stream_id()
+                terms = None
+        except redis.RedisError as e:
+            logger.warning(f"Suggest snapshot unavailable, building from the database: {e}")
+            version, terms, stream_id = None, None, None
+
+        if terms is None:
+            db = SessionLocal()
+            try:
+                terms = load_terms(db)
+            finally:
+                db.close()
+
+        index = PrefixIndex(tuple(term) for term in terms)
+        if stream_id is not None:
+            try:
+                stream_id = _apply(index, _read_stream(stream_id), stream_id)
+            except redis.RedisError:
+                pass  # Applied at the next check
+
+        with _lock:
+            _state.update(
+                index=index,
+                version=int(version) if version is not None else None,
+                stream_id=stream_id or "0-0",
+                checked_at=time.monotonic(),
+            )
+        logger.info(f"Suggest index loaded with {len(index)} keys")
+    except Exception as e:
+        logger.error(f"Suggest index load failed: {e}", exc_info=True)
+    finally:
+        with _lock:
+            _state["loading"] = False
+
+
+def _start_load() -> None:
+    with _lock:
+        if _state["loading"]:
+            return
+        _state["loading"] = True
+    threading.Thread(target=_load, name="suggest-index-load", daemon=True).start()
+
+
+def _refresh() -> None:
+    now = time.monotonic()
+    with _lock:
+        if _state["index"] is not None and now - _state["checked_at"] < settings.suggest_check_interval:
+            return
+        _state["checked_at"] = now
+        index, version, stream_id = _state["index"], _state["version"], _state["stream_id"]
+
+    if index is None:
+        _start_load()
+        return
+
+    try:
+        remote = redis_client.get(VERSION_KEY)
+        if remote is not None and int(remote) != version:
+            _start_load()
+            return
+        entries = _read_stream(stream_id)
+    except redis.RedisError:
+        return  # Keep serving the current index
+
+    if entries:
+        with _lock:
+            if _state["index"] is index:
+                _state["stream_id"] = _apply(index, entries, _state["stream_id"])
+
+
+def suggest(query: str, limit: int = 8) -> list[dict]:
+    """Completions for a partial query from this worker's index"""
+    _refresh()
+    with _lock:
+        index = _state["index"]
+        return index.search(query, min(limit, MAX_LIMIT)) if index is not None else []
+
+
+@register_job("build_suggest_snapshot", interval=settings.suggest_snapshot_interval)
+def build_suggest_snapshot(db: Session) -> dict:
+    """Store fresh suggestion terms in Redis for every worker to load"""
+    stream_id = _last_stream_id()  # Before reading, so later publishes are replayed on top
+    terms = load_terms(db)
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(SNAPSHOT_KEY, zlib.compress(json.dumps({"stream_id": stream_id, "terms": terms}).encode()))
+    pipe.incr(VERSION_KEY)
+    pipe.execute()
+
+    return {"terms": len(terms)}
+
+
+@subscribe(CHAPTER_PUBLISHED)
+def _on_chapter_published(payload: dict) -> None:
+    fields = {kind: payload.get(kind) or "" for kind in ("title", "mood")}
+    if not any(fields.values()):
+        return
+    try:
+        redis_client.xadd(STREAM_KEY, fields, maxlen=STREAM_MAX_LENGTH, approximate=True)
+    except redis.RedisError as e:
+        logger.warning(f"Suggest term stream unavailable: {e}")
+        with _lock:
+            if _state["index"] is not None:
+                for kind, value in fields.items():
+                    if value:
+                        _state["index"].add(value, kind)
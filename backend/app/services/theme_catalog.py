@@ -0,0 +1,124 @@
+"""
+In-memory theme catalog
+
+Themes are a small curated set, so each worker holds the whole catalog
+(with its maintained stats) in memory and serves /search/themes without
+touching the database.
+
+Freshness is version-stamped: every change bumps a counter in Redis
+(INCR), and a worker compares it with the version its snapshot was
+loaded at, at most once per theme_catalog_check_interval. A snapshot is
+also reloaded after theme_catalog_max_age regardless, which bounds
+staleness when Redis is down or a catalog row is edited by hand.
+"""
+import threading
+import time
+from typing import Optional
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.events import subscribe, CHAPTER_THEMES_CHANGED, CHAPTER_DELETED
+from app.logging_config import logger
+from app.models import Theme
+
+redis_client = redis.from_url(settings.redis_url)
+
+VERSION_KEY = "theme_catalog:version"
+
+_lock = threading.Lock()
+_snapshot = {
+    "themes": None,     # list of theme dicts, ordered by name
+    "by_slug": {},
+    "version": None,    # Redis version the snapshot was loaded at
+    "loaded_at": 0.0,
+    "checked_at": 0.0,
+}
+
+
+def _remote_version() -> Optional[int]:
+    try:
+        value = redis_client.get(VERSION_KEY)
+    except redis.RedisError:
+        return None
+    return int(value) if value is not None else 0
+
+
+def _load(db: Session) -> list[dict]:
+    return [
+        {
+            "id": theme.id,
+            "name": theme.name,
+            "slug": theme.slug,
+            "description": theme.description,
+            "emoji": theme.emoji,
+            "chapter_count": theme.chapter_count,
+            "recent_chapter_count": theme.recent_chapter_count,
+            "last_chapter_at": theme.last_chapter_at,
+        }
+        for theme in db.query(Theme).order_by(Theme.name).all()
+    ]
+
+
+def get_themes(db: Session) -> list[dict]:
+    """
+    All themes ordered by name, from this worker's snapshot.
+
+    The returned list is shared between requests; do not mutate it.
+    """
+    now = time.monotonic()
+    with _lock:
+        themes = _snapshot["themes"]
+        fresh = (
+            themes is not None
+            and now - _snapshot["loaded_at"] < settings.theme_catalog_max_age
+        )
+        if fresh and now - _snapshot["checked_at"] < settings.theme_catalog_check_interval:
+            return themes
+        version = _snapshot["version"]
+
+    # Read the version before loading so a bump during the load triggers another
+    remote = _remote_version()
+    if fresh and remote is not None and remote == version:
+        with _lock:
+            _snapshot["checked_at"] = now
+        return themes
+
+    themes = _load(db)
+    with _lock:
+        _snapshot.update(
+            themes=themes,
+            by_slug={theme["slug"]: theme for theme in themes},
+            version=remote,
+            loaded_at=now,
+            checked_at=now,
+        )
+    return themes
+
+
+def get_theme_by_slug(db: Session, slug: str) -> Optional[dict]:
+    get_themes(db)
+    with _lock:
+        return _snapshot["by_slug"].get(slug)
+
+
+def bump_catalog_version() -> None:
+    """Mark every worker's snapshot stale (this worker's immediately)"""
+    with _lock:
+        _snapshot["themes"] = None
+    try:
+        redis_client.incr(VERSION_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Theme catalog version bump failed: {e}")
+
+
+@subscribe(CHAPTER_THEMES_CHANGED)
+def _on_themes_changed(payload: dict) -> None:
+    bump_catalog_version()
+
+
+@subscribe(CHAPTER_DELETED)
+def _on_chapter_deleted(payload: dict) -> None:
+    if payload.get("theme_ids"):
+        bump_catalog_version()
@@ -0,0 +1,205 @@
+"""
+Precomputed per-theme chapter lists
+
+Each theme's most recent chapter ids live in a Redis sorted set
+(theme_chapters:{theme_id}, scored by published_at), capped at
+theme_list_size entries. Theme pages read a page of ids from it and
+hydrate them in one batched query instead of joining, sorting and
+offsetting chapter_themes for every reader.
+
+Every built list carries a BUILT member scored +inf, so an empty theme
+still has a list and a missing key always means "not built". Lists are
+updated by domain events after the tagging transaction commits, and
+only if already built, so a partial list is never created; a missing
+list (cold start, eviction) is rebuilt from the database on first read.
+Every update also bumps the theme's version (theme_chapters:{id}:version);
+a rebuild only replaces the list if the version is still the one it saw
+before reading the database, and retries otherwise, so a tag or untag
+landing mid-rebuild is never lost.
+Pages the list cannot answer (past its end while the theme has older
+chapters, e.g. after removals) fall back to the database.
+
+    python scripts/rebuild_theme_lists.py            # rebuild every theme
+    python scripts/rebuild_theme_lists.py --check    # report drift only
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.events import subscribe, CHAPTER_THEMES_CHANGED, CHAPTER_DELETED
+from app.logging_config import logger
+from app.models import Chapter, Theme, chapter_themes
+from app.scheduler import register_job
+
+redis_client = redis.from_url(settings.redis_url)
+
+KEY_PREFIX = "theme_chapters:"
+BUILT = "built"
+REBUILD_ATTEMPTS = 3
+
+# Bump the version; ZADD and trim to the cap (BUILT sits at the top) only if the list is built
+_add_if_built = redis_client.register_script("""
+redis.call('INCR', KEYS[2])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[3]) + 2))
+end
+""")
+
+# Replace the list with ARGV[2..] (score, member pairs) if the version is still ARGV[1] ("" for unset)
+_replace_if_version = redis_client.register_script("""
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 2, #ARGV, 1000 do
+    redis.call('ZADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+return 1
+""")
+
+
+def _key(theme_id: int) -> str:
+    return f"{KEY_PREFIX}{theme_id}"
+
+
+def _version_key(theme_id: int) -> str:
+    return f"{KEY_PREFIX}{theme_id}:version"
+
+
+def _theme_chapters(db: Session, theme_id: int):
+    return db.query(Chapter.id, Chapter.published_at).join(
+        chapter_themes, Chapter.id == chapter_themes.c.chapter_id
+    ).filter(
+        chapter_themes.c.theme_id == theme_id
+    ).order_by(Chapter.published_at.desc(), Chapter.id.desc())
+
+
+def _db_page(db: Session, theme_id: int, offset: int, limit: int) -> list[int]:
+    return [row.id for row in _theme_chapters(db, theme_id).offset(offset).limit(limit).all()]
+
+
+def rebuild_theme_list(db: Session, theme_id: int) -> Optional[int]:
+    """
+    Replace a theme's list from the database (atomic swap).
+
+    Returns:
+        Its length, or None if updates kept arriving while it was read
+    """
+    key = _key(theme_id)
+    for _ in range(REBUILD_ATTEMPTS):
+        version = redis_client.get(_version_key(theme_id))
+        rows = _theme_chapters(db, theme_id).limit(settings.theme_list_size).all()
+
+        members = ["inf", BUILT]
+        for row in rows:
+            members += [row.published_at.timestamp(), row.id]
+        if _replace_if_version(
+            keys=[key, _version_key(theme_id)],
+            args=[version.decode() if version is not None else "", *members]
+        ):
+            return len(rows)
+    return None
+
+
+def get_theme_page(db: Session, theme: dict, offset: int, limit: int) -> list[int]:
+    """
+    Chapter ids for one page of a theme, newest first.
+
+    Args:
+        theme: Catalog entry (see app.services.theme_catalog)
+    """
+    key = _key(theme["id"])
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zcard(key)
+        pipe.zrevrange(key, offset + 1, offset + limit)  # Skip BUILT
+        size, members = pipe.execute()
+
+        if size == 0:
+            rebuilt = rebuild_theme_list(db, theme["id"])
+            if rebuilt is None:
+                return _db_page(db, theme["id"], offset, limit)
+            size = rebuilt + 1
+            members = redis_client.zrevrange(key, offset + 1, offset + limit)
+    except redis.RedisError as e:
+        logger.warning(f"Theme list unavailable for theme {theme['id']}: {e}")
+        return _db_page(db, theme["id"], offset, limit)
+
+    listed = size - 1
+    if offset + limit > listed and listed < theme["chapter_count"]:
+        return _db_page(db, theme["id"], offset, limit)
+    return [int(member) for member in members]
+
+
+def check_theme_lists(db: Session, repair: bool = True) -> dict:
+    """
+    Compare every built list with the database and rebuild those that drifted.
+
+    A list is consistent when it holds exactly the theme's newest chapters
+    (it may be shorter than the cap after removals).
+    """
+    drifted = []
+    for theme_id, in db.query(Theme.id).order_by(Theme.id).all():
+        stored = redis_client.zrange(_key(theme_id), 0, -1, withscores=True)
+        if not stored:
+            continue  # Not built yet; built on first read
+
+        stored_ids = [
+            chapter_id for chapter_id, _ in sorted(
+                ((int(member), score) for member, score in stored if member != BUILT.encode()),
+                key=lambda item: (-item[1], -item[0])
+            )
+        ]
+        expected_ids = [row.id for row in _theme_chapters(db, theme_id).limit(max(len(stored_ids), 1)).all()]
+
+        if stored_ids != expected_ids[:len(stored_ids)] or (not stored_ids and expected_ids):
+            drifted.append(theme_id)
+            if repair:
+                rebuild_theme_list(db, theme_id)
+
+    if drifted:
+        logger.warning(f"Theme lists drifted for themes {drifted}")
+    return {"drifted": drifted, "repaired": repair and bool(drifted)}
+
+
+@register_job("check_theme_lists", interval=settings.theme_list_check_interval)
+def check_theme_lists_job(db: Session) -> dict:
+    """Repair theme lists that missed an update"""
+    return check_theme_lists(db)
+
+
+def _add(theme_ids: Iterable[int], chapter_id: int, published_at: datetime) -> None:
+    for theme_id in theme_ids:
+        _add_if_built(
+            keys=[_key(theme_id), _version_key(theme_id)],
+            args=[published_at.timestamp(), chapter_id, settings.theme_list_size]
+        )
+
+
+def _remove(theme_ids: Iterable[int], chapter_id: int) -> None:
+    pipe = redis_client.pipeline(transaction=False)
+    for theme_id in theme_ids:
+        pipe.incr(_version_key(theme_id))
+        pipe.zrem(_key(theme_id), chapter_id)
+    pipe.execute()
+
+
+@subscribe(CHAPTER_THEMES_CHANGED)
+def _on_themes_changed(payload: dict) -> None:
+    try:
+        _add(payload.get("added_theme_ids", []), payload["chapter_id"], payload.get("published_at"))
+        _remove(payload.get("removed_theme_ids", []), payload["chapter_id"])
+    except redis.RedisError as e:
+        logger.warning(f"Theme list update failed for chapter {payload['chapter_id']}: {e}")
+
+
+@subscribe(CHAPTER_DELETED)
+def _on_chapter_deleted(payload: dict) -> None:
+    try:
+        _remove(payload.get("theme_ids", []), payload["chapter_id"])
+    except redis.RedisError as e:
+        logger.warning(f"Theme list update failed for chapter {payload['chapter_id']}: {e}")
@@ -0,0 +1,94 @@
+"""
+Maintained theme statistics
+
+themes.chapter_count, recent_chapter_count and last_chapter_at are kept
+in step by the code paths that tag, untag and delete chapters, in the
+same transaction, so listing themes never has to group chapter_themes.
+
+"Recent" means published at or after themes.recent_since. A periodic
+job recounts every theme from scratch and slides recent_since forward to
+now - theme_recent_days, which also repairs any drift (e.g. chapters
+removed by account-deletion cascades). Between runs the recent window is
+at most one refresh interval wider than theme_recent_days.
+"""
+from datetime import datetime, timezone, timedelta
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.scheduler import register_job
+from app.services.theme_catalog import bump_catalog_version
+
+
+def themes_added(db: Session, theme_ids: Iterable[int], published_at: datetime) -> None:
+    """Count a chapter published at `published_at` under newly added themes"""
+    theme_ids = list(theme_ids)
+    if not theme_ids:
+        return
+
+    db.execute(text("""
+        UPDATE themes
+        SET chapter_count = chapter_count + 1,
+            recent_chapter_count = recent_chapter_count
+                + CASE WHEN :published_at >= recent_since THEN 1 ELSE 0 END,
+            last_chapter_at = GREATEST(last_chapter_at, :published_at)
+        WHERE id = ANY(:theme_ids)
+    """), {"theme_ids": theme_ids, "published_at": published_at})
+
+
+def themes_removed(db: Session, theme_ids: Iterable[int], published_at: datetime) -> None:
+    """
+    Uncount a chapter removed from themes (call after the removal is flushed).
+
+    last_chapter_at is only recomputed for themes where the removed
+    chapter was the latest one.
+    """
+    theme_ids = list(theme_ids)
+    if not theme_ids:
+        return
+
+    db.execute(text("""
+        UPDATE themes AS t
+        SET chapter_count = GREATEST(t.chapter_count - 1, 0),
+            recent_chapter_count = GREATEST(t.recent_chapter_count
+                - CASE WHEN :published_at >= t.recent_since THEN 1 ELSE 0 END, 0),
+            last_chapter_at = CASE WHEN t.last_chapter_at <= :published_at THEN (
+                SELECT MAX(c.published_at)
+                FROM chapter_themes ct JOIN chapters c ON c.id = ct.chapter_id
+                WHERE ct.theme_id = t.id
+            ) ELSE t.last_chapter_at END
+        WHERE t.id = ANY(:theme_ids)
+    """), {"theme_ids": theme_ids, "published_at": published_at})
+
+
+@register_job("refresh_theme_stats", interval=settings.theme_stats_refresh_interval)
+def refresh_theme_stats(db: Session) -> dict:
+    """Recount every theme and move the recent window forward"""
+    since = datetime.now(timezone.utc) - timedelta(days=settings.theme_recent_days)
+
+    result = db.execute(text("""
+        UPDATE themes AS t
+        SET chapter_count = s.chapter_count,
+            recent_chapter_count = s.recent_chapter_count,
+            last_chapter_at = s.last_chapter_at,
+            recent_since = :since
+        FROM (
+            SELECT th.id,
+                COUNT(c.id) AS chapter_count,
+                COUNT(c.id) FILTER (WHERE c.published_at >= :since) AS recent_chapter_count,
+                MAX(c.published_at) AS last_chapter_at
+            FROM themes th
+            LEFT JOIN chapter_themes ct ON ct.theme_id = th.id
+            LEFT JOIN chapters c ON c.id = ct.chapter_id
+            GROUP BY th.id
+        ) AS s
+        WHERE t.id = s.id
+    """), {"since": since})
+    db.commit()
+
+    # Workers pick up the new counts at their next catalog version check
+    bump_catalog_version()
+
+    return {"themes": result.rowcount}
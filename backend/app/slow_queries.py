@@ -0,0 +1,105 @@
+"""Slow query log with sampled EXPLAIN capture"""
+import json
+import random
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+from app.logging_config import logger
+
+# Most recent slow statements, newest last (exposed on /admin/slow-queries)
+_buffer: deque = deque(maxlen=settings.slow_query_buffer_size)
+_buffer_lock = threading.Lock()
+
+# EXPLAIN ANALYZE re-runs the statement, so do it off the request path
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+_explain_slots = threading.BoundedSemaphore(settings.slow_query_explain_queue_size)
+
+# Re-running these would take real row locks
+_LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+
+def normalize_parameters(parameters) -> object:
+    """Reduce bound parameters to a log-safe shape (types and lengths, numbers as-is)"""
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: describe the first row only
+            return {"rows": len(parameters), "first": normalize_parameters(parameters[0])}
+        return [_normalize_value(v) for v in parameters]
+    if isinstance(parameters, dict):
+        return {key: _normalize_value(value) for key, value in parameters.items()}
+    return _normalize_value(parameters)
+
+
+def _normalize_value(value) -> object:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (str, bytes, list, tuple, set)):
+        return f"<{type(value).__name__} len={len(value)}>"  # Never the value: emails, tokens
+    return f"<{type(value).__name__}>"
+
+
+def record_slow_query(conn, statement: str, parameters, duration: float, route: Optional[str]) -> None:
+    """Record a statement that exceeded slow_query_threshold_ms"""
+    if statement.lstrip().upper().startswith(("EXPLAIN", "SET LOCAL")):
+        return  # Our own EXPLAIN capture
+
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "route": route or "background",
+        "duration_ms": round(duration * 1000, 1),
+        "sql": statement,
+        "parameters": normalize_parameters(parameters),
+        "explain": None,
+    }
+
+    with _buffer_lock:
+        _buffer.append(entry)
+
+    logger.warning("slow_query " + json.dumps({k: v for k, v in entry.items() if k != "explain"}, default=str))
+
+    if (
+        statement.lstrip().upper().startswith("SELECT")
+        and not _LOCKING_CLAUSE.search(statement)
+        and random.random() < settings.slow_query_explain_sample_rate
+        and _explain_slots.acquire(blocking=False)  # Dropped while the queue is full
+    ):
+        _explain_executor.submit(_capture_explain, conn.engine, entry, statement, parameters)
+
+
+def _capture_explain(engine, entry: dict, statement: str, parameters) -> None:
+    """Run EXPLAIN (ANALYZE, BUFFERS) in a rolled-back transaction"""
+    try:
+        with engine.connect() as conn:
+            with conn.begin() as transaction:
+                conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(settings.slow_query_explain_timeout_ms)}"
+                )
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+                transaction.rollback()
+        entry["explain"] = "\n".join(row[0] for row in rows)
+        logger.info("slow_query_plan " + json.dumps({
+            "route": entry["route"],
+            "duration_ms": entry["duration_ms"],
+            "plan": entry["explain"],
+        }))
+    except Exception as e:
+        logger.warning(f"Failed to EXPLAIN slow query: {e}")
+    finally:
+        _explain_slots.release()
+
+
+def get_slow_queries(limit: int = 50) -> list[dict]:
+    """Most recent slow queries, newest first"""
+    with _buffer_lock:
+        entries = list(_buffer)
+    return entries[::-1][:limit]
+
+
+def clear_slow_queries() -> None:
+    with _buffer_lock:
+        _buffer.clear()
@@ -0,0 +1,260 @@
+"""
+Draft revision history
+
+Every save of a draft records its new revision in draft_revisions. Most
+rows are forward deltas from the previous revision; every
+draft_snapshot_interval revisions a full snapshot is stored instead, so
+rebuilding any revision reads one snapshot plus fewer than that many
+deltas. Payloads are zlib-compressed JSON.
+
+State format (positions are implied by block order):
+
+    {"title": ..., "mood": ..., "theme": ..., "time_period": ...,
+     "blocks": [{"id": 1, "block_type": "text", "content": {...}}, ...]}
+
+Delta format (keys omitted when empty):
+
+    {"fields": {"title": ...},              # changed metadata
+     "blocks": {"1": ["text", {...}]},      # new or changed blocks
+     "deleted": [2],                        # removed block ids
+     "order": [3, 1]}                       # block order, unless only appended to
+"""
+import json
+import zlib
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Draft, DraftRevision
+from app.models.chapter import BlockType
+from app.scheduler import register_job
+
+FIELDS = ("title", "mood", "theme", "time_period")
+
+
+def encode(payload: dict) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":"), default=str).encode())
+
+
+def decode(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+
+def draft_state(draft: Draft) -> dict:
+    """Current state of a draft (loads its blocks)"""
+    return {
+        **{field: getattr(draft, field) for field in FIELDS},
+        "blocks": [
+            {"id": block.id, "block_type": BlockType(block.block_type).value, "content": block.content}
+            for block in sorted(draft.blocks, key=lambda block: block.position)
+        ],
+    }
+
+
+def diff_states(old: dict, new: dict) -> dict:
+    """Forward delta that turns `old` into `new`"""
+    delta = {}
+
+    fields = {field: new[field] for field in FIELDS if new[field] != old[field]}
+    if fields:
+        delta["fields"] = fields
+
+    old_blocks = {block["id"]: block for block in old["blocks"]}
+    new_blocks = {block["id"]: block for block in new["blocks"]}
+
+    changed = {
+        str(block_id): [block["block_type"], block["content"]]
+        for block_id, block in new_blocks.items()
+        if old_blocks.get(block_id) != block
+    }
+    if changed:
+        delta["blocks"] = changed
+
+    deleted = [block_id for block_id in old_blocks if block_id not in new_blocks]
+    if deleted:
+        delta["deleted"] = deleted
+
+    # Order is implied when surviving blocks keep their order and new ones are appended
+    order = list(new_blocks)
+    kept = [block_id for block_id in old_blocks if block_id in new_blocks]
+    if order != kept + [block_id for block_id in new_blocks if block_id not in old_blocks]:
+        delta["order"] = order
+
+    return delta
+
+
+def apply_delta(state: dict, delta: dict) -> dict:
+    """Apply a forward delta to a state, returning the new state"""
+    state = {**state, **delta.get("fields", {})}
+
+    blocks = {block["id"]: block for block in state["blocks"]}
+    for block_id in delta.get("deleted", []):
+        blocks.pop(block_id, None)
+
+    new_ids = []
+    for key, (block_type, content) in delta.get("blocks", {}).items():
+        block_id = int(key)
+        if block_id not in blocks:
+            new_ids.append(block_id)
+        blocks[block_id] = {"id": block_id, "block_type": block_type, "content": content}
+
+    order = delta.get("order") or [block["id"] for block in state["blocks"] if block["id"] in blocks] + new_ids
+    state["blocks"] = [blocks[block_id] for block_id in order]
+    return state
+
+
+def replay(rows: list) -> dict:
+    """
+    Rebuild the state of the last row.
+
+    Args:
+        rows: Consecutive (revision, is_snapshot, payload) rows starting at a snapshot
+    """
+    state = None
+    previous = None
+    for revision, is_snapshot, payload in rows:
+        if is_snapshot:
+            state = decode(payload)
+        elif state is None or revision != previous + 1:
+            raise ValueError(f"History is missing revisions before {revision}")
+        else:
+            state = apply_delta(state, decode(payload))
+        previous = revision
+    if state is None:
+        raise ValueError("No snapshot to start from")
+    return state
+
+
+def record_revision(
+    db: Session,
+    draft: Draft,
+    before: Optional[dict],
+    base_revision: Optional[int] = None
+) -> DraftRevision:
+    """
+    Record the draft's current revision (call after the save is flushed).
+
+    Stores a delta from `before` when `before` is the previous revision,
+    that revision is on record and the last snapshot is recent enough;
+    otherwise a full snapshot. Nothing is committed here.
+
+    Args:
+        before: draft_state() taken before the save, or None for a new draft
+        base_revision: Revision `before` was read at (unknown: snapshot)
+    """
+    revision = draft.revision
+    after = draft_state(draft)
+
+    latest, latest_snapshot = db.query(
+        func.max(DraftRevision.revision),
+        func.max(DraftRevision.revision).filter(DraftRevision.is_snapshot)
+    ).filter(DraftRevision.draft_id == draft.id).one()
+
+    is_snapshot = (
+        before is None
+        or base_revision != revision - 1
+        or latest != revision - 1
+        or latest_snapshot is None
+        or revision - latest_snapshot >= settings.draft_snapshot_interval
+    )
+
+    row = DraftRevision(
+        draft_id=draft.id,
+        revision=revision,
+        is_snapshot=is_snapshot,
+        payload=encode(after if is_snapshot else diff_states(before, after))
+    )
+    db.add(row)
+    db.flush()
+    return row
+
+
+def reconstruct(db: Session, draft_id: int, revision: int) -> dict:
+    """
+    State of a draft at `revision`: the nearest snapshot at or before it
+    plus the deltas up to it (at most draft_snapshot_interval rows).
+
+    Raises:
+        HTTPException: 404 if the revision was never recorded or has been pruned
+    """
+    anchor = db.query(func.max(DraftRevision.revision)).filter(
+        DraftRevision.draft_id == draft_id,
+        DraftRevision.is_snapshot.is_(True),
+        DraftRevision.revision <= revision
+    ).scalar_subquery()
+
+    rows = db.query(
+        DraftRevision.revision, DraftRevision.is_snapshot, DraftRevision.payload
+    ).filter(
+        DraftRevision.draft_id == draft_id,
+        DraftRevision.revision >= anchor,
+        DraftRevision.revision <= revision
+    ).order_by(DraftRevision.revision).all()
+
+    if not rows or rows[-1].revision != revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Revision {revision} is not in this draft's history"
+        )
+
+    try:
+        return replay(rows)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Revision {revision} has been pruned from this draft's history"
+        )
+
+
+def list_revisions(db: Session, draft_id: int) -> list:
+    """Recorded revisions of a draft, newest first (payloads not loaded)"""
+    return db.query(
+        DraftRevision.revision,
+        DraftRevision.is_snapshot,
+        func.length(DraftRevision.payload).label("size_bytes"),
+        DraftRevision.created_at
+    ).filter(
+        DraftRevision.draft_id == draft_id
+    ).order_by(DraftRevision.revision.desc()).all()
+
+
+@register_job("prune_draft_history", interval=settings.draft_history_prune_interval)
+def prune_draft_history(db: Session) -> dict:
+    """
+    Thin history older than draft_history_retention_days.
+
+    1. Deltas older than a draft's newest out-of-window snapshot are
+       deleted; those revisions were only reachable through that snapshot's
+       predecessors, so everything inside the window stays reconstructable.
+    2. Of the snapshots before that point, only the newest
+       draft_history_keep_snapshots are kept.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.draft_history_retention_days)
+
+    deltas = db.execute(text("""
+        DELETE FROM draft_revisions r
+        USING (
+            SELECT draft_id, MAX(revision) AS anchor
+            FROM draft_revisions
+            WHERE is_snapshot AND created_at < :cutoff
+            GROUP BY draft_id
+        ) a
+        WHERE r.draft_id = a.draft_id AND r.revision < a.anchor AND NOT r.is_snapshot
+    """), {"cutoff": cutoff}).rowcount
+
+    snapshots = db.execute(text("""
+        DELETE FROM draft_revisions r
+        USING (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY draft_id ORDER BY revision DESC) AS rank
+            FROM draft_revisions
+            WHERE is_snapshot AND created_at < :cutoff
+        ) old
+        WHERE r.id = old.id AND old.rank > :keep
+    """), {"cutoff": cutoff, "keep": settings.draft_history_keep_snapshots}).rowcount
+
+    db.commit()
+    return {"deltas_deleted": deltas, "snapshots_deleted": snapshots}
@@ -1,18 +1,24 @@
 """Study routes - Drafts and Notes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timezone, timedelta
 
 from app.database import get_db
-from app.models import User, Draft, DraftBlock, Note, Chapter, ChapterBlock
+from app.models import User, Draft, DraftBlock, Note
 from app.auth.security import get_current_user
 from app.study.schemas import (
     DraftCreate, DraftUpdate, DraftResponse,
+    DraftOpsRequest, DraftOpsResponse,
+    DraftRevisionSummary, DraftRevisionState,
     NoteCreate, NoteUpdate, NoteResponse
 )
-from app.services.open_pages import consume_open_page, can_publish
-from app.services.muse_progression import award_xp
+from app.chapters.schemas import ChapterResponse
+from app.chapters.service import publish_chapter, chapter_response
+from app.services.open_pages import can_publish, check_open_pages
+from app.services.block_sync import reconcile_blocks
+from app.study.service import claim_revision, apply_draft_ops
+from app.study.history import draft_state, record_revision, reconstruct, list_revisions
 
 router = APIRouter(prefix="/study", tags=["Study"])
 
@@ -48,6 +54,9 @@ async def create_draft(
         )
         db.add(block)
     
+    db.flush()
+    record_revision(db, draft, None)
+    
     db.commit()
     db.refresh(draft)
     return draft
@@ -94,11 +103,17 @@ async def get_draft(
 async def update_draft(
     draft_id: int,
     draft_data: DraftUpdate,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Update a draft"""
-    draft = db.query(Draft).filter(Draft.id == draft_id).first()
+    """
+    Update a draft.
+    
+    Blocks are reconciled, not replaced; X-Blocks-Touched reports rows written.
+    """
+    # Locked so `before` is the state the revision bump starts from
+    draft = db.query(Draft).filter(Draft.id == draft_id).with_for_update().first()
     
     if not draft:
         raise HTTPException(
@@ -112,6 +127,9 @@ async def update_draft(
             detail="You can only edit your own drafts"
         )
     
+    base_revision = draft.revision
+    before = draft_state(draft)
+    
     # Update fields
     if draft_data.title is not None:
         draft.title = draft_data.title
@@ -122,24 +140,168 @@ async def update_draft(
     if draft_data.time_period is not None:
         draft.time_period = draft_data.time_period
     
-    # Update blocks if provided
+    # Update blocks if provided (only changed rows are written)
     if draft_data.blocks is not None:
-        db.query(DraftBlock).filter(DraftBlock.draft_id == draft.id).delete()
-        
-        for block_data in draft_data.blocks:
-            block = DraftBlock(
-                draft_id=draft.id,
-                position=block_data.position,
-                block_type=block_data.block_type,
-                content=block_data.content
+        sync = reconcile_blocks(
+            draft.blocks,
+            [block.model_dump() for block in draft_data.blocks],
+            lambda item: DraftBlock(
+                position=item["position"],
+                block_type=item["block_type"],
+                content=item["content"]
             )
-            db.add(block)
+        )
+        response.headers["X-Blocks-Touched"] = sync.as_header()
+    
+    # A full save also moves the revision, so pending delta saves conflict
+    draft.revision = Draft.revision + 1
     
+    db.flush()
+    record_revision(db, draft, before, base_revision)
+    result = DraftResponse.model_validate(draft)
     db.commit()
-    db.refresh(draft)
+    return result
+
+
+@router.post("/drafts/{draft_id}/ops", response_model=DraftOpsResponse)
+async def apply_draft_operations(
+    draft_id: int,
+    ops_data: DraftOpsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Autosave a draft as a batch of operations against base_revision.
+    
+    Returns 409 (with X-Draft-Revision) if the draft was saved elsewhere
+    since base_revision; the client reloads and reapplies. Operations are
+    all-or-nothing. Blocks inserted in a batch can be referenced by id
+    from the next batch onwards.
+    """
+    draft = db.query(Draft).filter(Draft.id == draft_id).first()
+    
+    if not draft:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Draft not found"
+        )
+    
+    if draft.author_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only edit your own drafts"
+        )
+    
+    before = draft_state(draft)
+    revision = claim_revision(db, draft, ops_data.base_revision)
+    inserted = apply_draft_ops(db, draft, ops_data.ops)
+    record_revision(db, draft, before, ops_data.base_revision)
+    
+    result = DraftOpsResponse(
+        id=draft.id,
+        revision=revision,
+        inserted_block_ids=[block.id for block in inserted],
+        updated_at=draft.updated_at
+    )
+    db.commit()
+    return result
+
+
+def get_own_draft(db: Session, draft_id: int, user: User, lock: bool = False) -> Draft:
+    """Load a draft the user owns (404 / 403 otherwise), optionally locking its row"""
+    query = db.query(Draft).filter(Draft.id == draft_id)
+    draft = (query.with_for_update() if lock else query).first()
+    
+    if not draft:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Draft not found"
+        )
+    
+    if draft.author_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own drafts"
+        )
+    
     return draft
 
 
+@router.get("/drafts/{draft_id}/revisions", response_model=List[DraftRevisionSummary])
+async def get_draft_revisions(
+    draft_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List a draft's recorded revisions, newest first"""
+    draft = get_own_draft(db, draft_id, current_user)
+    return list_revisions(db, draft.id)
+
+
+@router.get("/drafts/{draft_id}/revisions/{revision}", response_model=DraftRevisionState)
+async def get_draft_revision(
+    draft_id: int,
+    revision: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Reconstruct a draft as it was at a revision"""
+    draft = get_own_draft(db, draft_id, current_user)
+    state = reconstruct(db, draft.id, revision)
+    
+    return DraftRevisionState(
+        draft_id=draft.id,
+        revision=revision,
+        title=state["title"],
+        mood=state["mood"],
+        theme=state["theme"],
+        time_period=state["time_period"],
+        blocks=[{**block, "position": position} for position, block in enumerate(state["blocks"])]
+    )
+
+
+@router.post("/drafts/{draft_id}/revisions/{revision}/restore", response_model=DraftResponse)
+async def restore_draft_revision(
+    draft_id: int,
+    revision: int,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Restore a draft to an earlier revision.
+    
+    The restore is itself a new revision, so it can be undone the same way.
+    Blocks that still exist keep their ids (and footnotes).
+    """
+    draft = get_own_draft(db, draft_id, current_user, lock=True)
+    state = reconstruct(db, draft.id, revision)
+    base_revision = draft.revision
+    before = draft_state(draft)
+    
+    draft.title = state["title"]
+    draft.mood = state["mood"]
+    draft.theme = state["theme"]
+    draft.time_period = state["time_period"]
+    sync = reconcile_blocks(
+        draft.blocks,
+        [{**block, "position": position} for position, block in enumerate(state["blocks"])],
+        lambda item: DraftBlock(
+            position=item["position"],
+            block_type=item["block_type"],
+            content=item["content"]
+        )
+    )
+    response.headers["X-Blocks-Touched"] = sync.as_header()
+    draft.revision = Draft.revision + 1
+    
+    db.flush()
+    record_revision(db, draft, before, base_revision)
+    result = DraftResponse.model_validate(draft)
+    db.commit()
+    return result
+
+
 @router.delete("/drafts/{draft_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_draft(
     draft_id: int,
@@ -166,9 +328,10 @@ async def delete_draft(
     return None
 
 
-@router.post("/drafts/{draft_id}/promote", status_code=status.HTTP_201_CREATED)
+@router.post("/drafts/{draft_id}/promote", response_model=ChapterResponse, status_code=status.HTTP_201_CREATED)
 async def promote_draft(
     draft_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -179,6 +342,7 @@ async def promote_draft(
     - Converts draft blocks to chapter blocks
     - Creates published chapter
     - Keeps the original draft
+    - Queues embedding generation in background
     """
     draft = db.query(Draft).filter(Draft.id == draft_id).first()
     
@@ -197,41 +361,34 @@ async def promote_draft(
     if not can_publish(current_user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"No Open Pages available. You have {current_user.open_pages} Open Pages."
+            detail=f"No Open Pages available. You have {check_open_pages(current_user)} Open Pages."
         )
     
-    # Create chapter from draft
-    chapter = Chapter(
-        author_id=current_user.id,
+    chapter, book_id = publish_chapter(
+        db,
+        current_user,
+        blocks=[
+            {
+                "position": block.position,
+                "block_type": block.block_type,
+                "content": block.content,
+            }
+            for block in draft.blocks
+        ],
         title=draft.title,
         mood=draft.mood,
         theme=draft.theme,
         time_period=draft.time_period,
-        edit_window_expires=datetime.now(timezone.utc) + timedelta(minutes=30)
     )
-    db.add(chapter)
-    db.flush()
-    
-    # Copy blocks from draft to chapter
-    for draft_block in draft.blocks:
-        chapter_block = ChapterBlock(
-            chapter_id=chapter.id,
-            position=draft_block.position,
-            block_type=draft_block.block_type,
-            content=draft_block.content
-        )
-        db.add(chapter_block)
-    
-    # Consume Open Page
-    consume_open_page(current_user, db)
-    
-    # Award XP for publishing
-    xp_result = award_xp(db, current_user, "publish_chapter")
+    response = chapter_response(chapter, book_id, current_user.username)
     
     db.commit()
-    db.refresh(chapter)
     
-    return chapter
+    # Queue embedding generation in background
+    from app.muse.embeddings import generate_chapter_embedding
+    background_tasks.add_task(generate_chapter_embedding, chapter, db)
+    
+    return response
 
 
 # ============================================================================
@@ -1,15 +1,23 @@
 """Study schemas"""
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Literal, Union, Annotated
 from datetime import datetime
 from app.models.chapter import BlockType
+from app.chapters.schemas import validate_block_content
 
 
 class DraftBlockCreate(BaseModel):
     """Create a draft block"""
+    id: Optional[int] = None  # Existing block id when updating
     position: int = Field(..., ge=0)
     block_type: BlockType
     content: dict
+    
+    @field_validator('content')
+    @classmethod
+    def validate_content(cls, v, info):
+        """Validate content based on block type (same rules as chapter blocks)"""
+        return validate_block_content(info.data.get('block_type'), v)
 
 
 class DraftCreate(BaseModel):
@@ -51,6 +59,7 @@ class DraftResponse(BaseModel):
     theme: Optional[str]
     time_period: Optional[str]
     blocks: List[DraftBlockResponse]
+    revision: int
     created_at: datetime
     updated_at: datetime
     
@@ -58,6 +67,120 @@ class DraftResponse(BaseModel):
         from_attributes = True
 
 
+# Delta autosave operations
+
+# Same limits as DraftUpdate
+FIELD_MAX_LENGTHS = {"title": 200, "mood": 50, "theme": 50, "time_period": 50}
+
+
+class SetFieldOp(BaseModel):
+    """Set a draft metadata field"""
+    op: Literal["set_field"]
+    field: Literal["title", "mood", "theme", "time_period"]
+    value: Optional[str] = Field(None, max_length=200)
+    
+    @model_validator(mode="after")
+    def validate_length(self):
+        if self.value is not None and len(self.value) > FIELD_MAX_LENGTHS[self.field]:
+            raise ValueError(f"{self.field} cannot exceed {FIELD_MAX_LENGTHS[self.field]} characters")
+        return self
+
+
+class ReplaceTextOp(BaseModel):
+    """Replace content["text"][start:end] of a text or quote block"""
+    op: Literal["replace_text"]
+    block_id: int
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0)
+    text: str
+
+
+class SetBlockContentOp(BaseModel):
+    """Replace a block's content (e.g. an image's url or caption)"""
+    op: Literal["set_block_content"]
+    block_id: int
+    content: dict
+
+
+class MoveBlockOp(BaseModel):
+    """Move a block to a new position, shifting the blocks in between"""
+    op: Literal["move_block"]
+    block_id: int
+    position: int = Field(..., ge=0)
+
+
+class InsertBlockOp(BaseModel):
+    """Insert a block at a position, shifting later blocks down"""
+    op: Literal["insert_block"]
+    position: int = Field(..., ge=0)
+    block_type: BlockType
+    content: dict
+    
+    @field_validator('content')
+    @classmethod
+    def validate_content(cls, v, info):
+        """Validate content based on block type (same rules as DraftUpdate blocks)"""
+        return validate_block_content(info.data.get('block_type'), v)
+
+
+class DeleteBlockOp(BaseModel):
+    """Delete a block, shifting later blocks up"""
+    op: Literal["delete_block"]
+    block_id: int
+
+
+DraftOp = Annotated[
+    Union[SetFieldOp, ReplaceTextOp, SetBlockContentOp, MoveBlockOp, InsertBlockOp, DeleteBlockOp],
+    Field(discriminator="op")
+]
+
+
+class DraftOpsRequest(BaseModel):
+    """Operations to apply on top of base_revision"""
+    base_revision: int = Field(..., ge=0)
+    ops: List[DraftOp] = Field(..., min_length=1, max_length=500)
+
+
+class DraftOpsResponse(BaseModel):
+    """Result of applying operations"""
+    id: int
+    revision: int
+    inserted_block_ids: List[int]  # ids of insert_block ops, in order
+    updated_at: datetime
+
+
+# Revision history
+
+class DraftRevisionSummary(BaseModel):
+    """One recorded revision"""
+    revision: int
+    is_snapshot: bool
+    size_bytes: int  # compressed payload size
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class DraftRevisionBlock(BaseModel):
+    """A block as it was at some revision"""
+    id: int
+    position: int
+    block_type: BlockType
+    content: dict
+
+
+class DraftRevisionState(BaseModel):
+    """A draft reconstructed at some revision"""
+    draft_id: int
+    revision: int
+    title: Optional[str]
+    mood: Optional[str]
+    theme: Optional[str]
+    time_period: Optional[str]
+    blocks: List[DraftRevisionBlock]
+
+
 class NoteCreate(BaseModel):
     """Create a new note"""
     title: Optional[str] = Field(None, max_length=200)
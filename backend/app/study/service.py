@@ -0,0 +1,138 @@
+"""Study service - Draft autosave operations"""
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Draft, DraftBlock
+from app.models.chapter import BlockType
+from app.chapters.schemas import validate_block_content
+
+TEXT_BLOCK_TYPES = {BlockType.TEXT, BlockType.QUOTE}
+
+
+def claim_revision(db: Session, draft: Draft, base_revision: int) -> int:
+    """
+    Bump the draft's revision if it is still at base_revision.
+
+    Optimistic concurrency: a single conditional UPDATE, so two editors
+    saving against the same revision cannot both win.
+
+    Raises:
+        HTTPException: 409 if the draft has moved past base_revision
+    """
+    now = datetime.now(timezone.utc)
+    row = db.execute(
+        update(Draft)
+        .where(Draft.id == draft.id, Draft.revision == base_revision)
+        .values(revision=Draft.revision + 1, updated_at=now)
+        .returning(Draft.revision, Draft.updated_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if row is None:
+        current = db.query(Draft.revision).filter(Draft.id == draft.id).scalar()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Draft has changed since revision {base_revision} (now at {current}). "
+                   f"Reload and reapply.",
+            headers={"X-Draft-Revision": str(current)}
+        )
+
+    set_committed_value(draft, "revision", row.revision)
+    set_committed_value(draft, "updated_at", row.updated_at)
+
+    return row.revision
+
+
+def _op_error(index: int, message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"Operation {index}: {message}"
+    )
+
+
+def _shift(blocks: list, start: int, end: int, delta: int) -> None:
+    """Shift positions in [start, end) by delta"""
+    for block in blocks:
+        if start <= block.position < end:
+            block.position += delta
+
+
+def apply_draft_ops(db: Session, draft: Draft, ops: list) -> list[DraftBlock]:
+    """
+    Apply autosave operations to a draft in order.
+
+    Blocks are loaded once and edited in memory; the flush writes only
+    the rows whose attributes changed. Nothing is committed here.
+
+    Returns:
+        Blocks created by insert_block ops, in order
+
+    Raises:
+        HTTPException: 422 naming the first invalid operation
+    """
+    blocks = list(draft.blocks)
+    by_id = {block.id: block for block in blocks}
+    inserted = []
+
+    # Full saves accept any positions; the shifting below needs 0..n-1
+    for position, block in enumerate(sorted(blocks, key=lambda block: (block.position, block.id))):
+        if block.position != position:
+            block.position = position
+
+    def get_block(index: int, block_id: int) -> DraftBlock:
+        block = by_id.get(block_id)
+        if block is None:
+            raise _op_error(index, f"block {block_id} not found in this draft")
+        return block
+
+    for index, op in enumerate(ops):
+        if op.op == "set_field":
+            setattr(draft, op.field, op.value)
+
+        elif op.op == "replace_text":
+            block = get_block(index, op.block_id)
+            if BlockType(block.block_type) not in TEXT_BLOCK_TYPES:
+                raise _op_error(index, "replace_text only applies to text and quote blocks")
+            text = block.content.get("text", "")
+            if op.start > op.end or op.end > len(text):
+                raise _op_error(index, f"range {op.start}:{op.end} outside text of length {len(text)}")
+            block.content = {**block.content, "text": text[:op.start] + op.text + text[op.end:]}
+
+        elif op.op == "set_block_content":
+            block = get_block(index, op.block_id)
+            try:
+                validate_block_content(BlockType(block.block_type), op.content)
+            except ValueError as e:
+                raise _op_error(index, str(e))
+            block.content = op.content
+
+        elif op.op == "move_block":
+            block = get_block(index, op.block_id)
+            old, new = block.position, min(op.position, max(len(blocks) - 1, 0))
+            if new < old:
+                _shift(blocks, new, old, 1)
+            elif new > old:
+                _shift(blocks, old + 1, new + 1, -1)
+            block.position = new
+
+        elif op.op == "insert_block":
+            position = min(op.position, len(blocks))
+            _shift(blocks, position, float("inf"), 1)
+            block = DraftBlock(position=position, block_type=op.block_type, content=op.content)
+            draft.blocks.append(block)
+            blocks.append(block)
+            inserted.append(block)
+
+        elif op.op == "delete_block":
+            block = get_block(index, op.block_id)
+            draft.blocks.remove(block)
+            blocks.remove(block)
+            del by_id[block.id]
+            _shift(blocks, block.position + 1, float("inf"), -1)
+
+    db.flush()
+    return inserted
@@ -4,9 +4,10 @@ from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.database import get_db
-from app.models import User, Book
+from app.models import User, Book, Chapter
 from app.auth.security import get_current_user, get_password_hash, verify_password
 from app.users.schemas import PasswordUpdate, BookProfileUpdate, BookProfileResponse
+from app.events import emit, BOOK_PRIVACY_CHANGED
 
 router = APIRouter(prefix="/users", tags=["User Settings"])
 
@@ -82,8 +83,13 @@ async def update_book_profile(
     if profile_data.bio is not None:
         book.bio = profile_data.bio
     
-    if profile_data.is_private is not None:
+    if profile_data.is_private is not None and profile_data.is_private != book.is_private:
         book.is_private = profile_data.is_private
+        chapter_ids = [
+            chapter_id for (chapter_id,) in
+            db.query(Chapter.id).filter(Chapter.author_id == current_user.id)
+        ]
+        emit(db, BOOK_PRIVACY_CHANGED, author_id=current_user.id, chapter_ids=chapter_ids)
     
     db.commit()
     db.refresh(book)
@@ -1,6 +1,7 @@
 """User settings schemas"""
 from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import datetime
 
 
 class PasswordUpdate(BaseModel):
@@ -24,6 +25,11 @@ class BookProfileResponse(BaseModel):
     bio: Optional[str]
     cover_image_url: Optional[str]
     is_private: bool
+    chapter_count: int = 0
+    last_chapter_at: Optional[datetime] = None
+    follower_count: int = 0
+    following_count: int = 0
+    shelf_count: int = 0
     
     class Config:
         from_attributes = True
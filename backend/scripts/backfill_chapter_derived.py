@@ -0,0 +1,39 @@
+"""
+Fill publish-time derived fields (excerpt, word count, reading time,
+block summary, first image, blocks snapshot) for chapters that predate
+them.
+
+    python scripts/backfill_chapter_derived.py                  # chapters missing values
+    python scripts/backfill_chapter_derived.py --recompute      # every chapter (rules changed)
+    python scripts/backfill_chapter_derived.py --batch-size 200
+
+Safe to re-run; each batch commits on its own.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal
+from app.services.chapter_derived import backfill_chapter_derived
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--recompute", action="store_true", help="Rewrite chapters that already have values")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        updated = backfill_chapter_derived(db, batch_size=args.batch_size, recompute=args.recompute)
+    finally:
+        db.close()
+
+    print(f"✓ Derived fields written for {updated} chapters")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark structured block-content queries: indexed plans vs sequential scans.
+
+Seeds synthetic chapters with text, quote, image, audio and video blocks
+(about a million blocks by default), then runs each query shape from
+app.chapters.queries with EXPLAIN (ANALYZE, BUFFERS), first as the planner
+chooses (the migration 016 indexes) and then with index scans disabled
+for the transaction, and reports both:
+
+    python scripts/benchmark_block_queries.py --seed
+    python scripts/benchmark_block_queries.py --repeat 20
+
+Remove the synthetic data with --cleanup.
+"""
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.database import engine
+
+
+BENCH_EMAIL_PATTERN = "bench\\_blocks\\_%@example.com"
+
+QUOTE_AUTHORS = ["Rilke", "Woolf", "Baldwin", "Szymborska", "Oliver", "Neruda", "Bishop", "Ocean"]
+
+# name -> SQL, written to match the expressions in app.chapters.queries
+BLOCK_QUERIES = {
+    "quote_by": """
+        SELECT c.id FROM chapters c
+        WHERE c.id IN (
+            SELECT chapter_id FROM chapter_blocks
+            WHERE block_type = 'QUOTE' AND content @> '{"author": "Rilke"}'
+        )
+        ORDER BY c.published_at DESC LIMIT 20
+    """,
+    "audio_longer_than": """
+        SELECT c.id FROM chapters c
+        WHERE c.id IN (
+            SELECT chapter_id FROM chapter_blocks
+            WHERE block_type IN ('AUDIO') AND CAST(content->>'duration' AS FLOAT) > 1700
+        )
+        ORDER BY c.published_at DESC LIMIT 20
+    """,
+    "text_matches": """
+        SELECT c.id FROM chapters c
+        WHERE c.id IN (
+            SELECT chapter_id FROM chapter_blocks
+            WHERE block_type IN ('TEXT', 'QUOTE')
+              AND to_tsvector('english', content->>'text') @@ plainto_tsquery('english', 'lighthouse')
+        )
+        ORDER BY c.published_at DESC LIMIT 20
+    """,
+}
+
+
+def seed(conn, users: int, chapters_per_user: int, blocks_per_chapter: int) -> None:
+    """Bulk-insert synthetic chapters and blocks with generate_series"""
+    print(f"🌱 Seeding {users * chapters_per_user} chapters, "
+          f"{users * chapters_per_user * blocks_per_chapter} blocks...")
+
+    conn.execute(text("""
+        INSERT INTO users (email, username, password_hash, open_pages, muse_level, muse_xp,
+                           quiet_mode, created_at, updated_at)
+        SELECT 'bench_blocks_' || g || '@example.com', 'bench_blocks_' || g, 'x', 3, 'spark', 0,
+               false, now(), now()
+        FROM generate_series(1, :users) g
+        ON CONFLICT DO NOTHING
+    """), {"users": users})
+
+    conn.execute(text("""
+        INSERT INTO chapters (author_id, title, heart_count, theme_count, published_at,
+                              edit_window_expires, created_at, updated_at)
+        SELECT u.id, 'Bench chapter ' || g, 0, 0,
+               now() - (random() * interval '365 days'), now(), now(), now()
+        FROM users u, generate_series(1, :per_user) g
+        WHERE u.email LIKE :pattern
+    """), {"per_user": chapters_per_user, "pattern": BENCH_EMAIL_PATTERN})
+
+    # Mostly text; one block in 50 mentions the lighthouse, one quote in 8 is Rilke's
+    conn.execute(text("""
+        INSERT INTO chapter_blocks (chapter_id, position, block_type, content, created_at)
+        SELECT c.id, p,
+               (ARRAY['TEXT', 'TEXT', 'TEXT', 'QUOTE', 'IMAGE', 'AUDIO', 'VIDEO'])[1 + (c.id + p) % 7]::blocktype,
+               CASE (c.id + p) % 7
+                   WHEN 3 THEN jsonb_build_object(
+                       'text', 'A line worth keeping ' || p,
+                       'author', (:authors)[1 + (c.id * 31 + p) % array_length(:authors, 1)])
+                   WHEN 4 THEN jsonb_build_object('url', 'https://example.com/' || c.id || '/' || p || '.jpg')
+                   WHEN 5 THEN jsonb_build_object('url', 'https://example.com/a.mp3', 'duration', (random() * 1800)::int)
+                   WHEN 6 THEN jsonb_build_object('url', 'https://example.com/v.mp4', 'duration', (random() * 1800)::int)
+                   ELSE jsonb_build_object('text', CASE WHEN random() < 0.02
+                       THEN 'The lighthouse kept its slow watch over the harbour'
+                       ELSE 'Benchmark paragraph about tides, kitchens and late trains ' || p END)
+               END,
+               now()
+        FROM chapters c
+        JOIN users u ON u.id = c.author_id
+        JOIN generate_series(0, :blocks - 1) p ON true
+        WHERE u.email LIKE :pattern
+    """), {"blocks": blocks_per_chapter, "authors": QUOTE_AUTHORS, "pattern": BENCH_EMAIL_PATTERN})
+
+    conn.execute(text("ANALYZE chapters"))
+    conn.execute(text("ANALYZE chapter_blocks"))
+    print("✓ Seeded")
+
+
+def cleanup(conn) -> None:
+    """Delete synthetic users (cascades to their chapters and blocks)"""
+    deleted = conn.execute(
+        text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": BENCH_EMAIL_PATTERN}
+    ).rowcount
+    print(f"🧹 Removed {deleted} benchmark users")
+
+
+def _plan_indexes(node: dict) -> list[str]:
+    found = [node["Index Name"]] if "Index Name" in node else []
+    for child in node.get("Plans", []):
+        found.extend(_plan_indexes(child))
+    return found
+
+
+def explain(conn, sql: str, repeat: int, force_seqscan: bool) -> dict:
+    timings = []
+    plan = None
+    for _ in range(repeat):
+        with conn.begin():
+            if force_seqscan:
+                conn.execute(text("SET LOCAL enable_indexscan = off"))
+                conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+            plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()[0]
+        timings.append(plan["Execution Time"])
+
+    return {
+        "p50_ms": round(statistics.median(sorted(timings)), 3),
+        "indexes": _plan_indexes(plan["Plan"]),
+    }
+
+
+def run(conn, repeat: int) -> None:
+    print(f"{'query':<18} {'indexed p50':>12} {'seqscan p50':>12} {'speedup':>8}  indexes used")
+    for name, sql in BLOCK_QUERIES.items():
+        indexed = explain(conn, sql, repeat, force_seqscan=False)
+        seqscan = explain(conn, sql, repeat, force_seqscan=True)
+        speedup = seqscan["p50_ms"] / indexed["p50_ms"] if indexed["p50_ms"] else float("inf")
+        print(f"{name:<18} {indexed['p50_ms']:>9} ms {seqscan['p50_ms']:>9} ms {speedup:>7.1f}x  "
+              f"{', '.join(indexed['indexes']) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Seed synthetic data before benchmarking")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--chapters-per-user", type=int, default=50)
+    parser.add_argument("--blocks", type=int, default=10, help="Blocks per chapter")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--cleanup", action="store_true", help="Remove synthetic data and exit")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        if args.cleanup:
+            cleanup(conn)
+            return
+        if args.seed:
+            seed(conn, args.users, args.chapters_per_user, args.blocks)
+
+    with engine.connect() as conn:
+        print("⏱️  Running block queries...")
+        run(conn, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark chapter reads: block rows vs chapters.blocks_snapshot.
+
+Publishes chapters for a throwaway benchmark user, then reads random ones
+back both ways and reports latency percentiles and statements per read:
+
+- rows:     the chapter row, then its chapter_blocks ordered by position
+- snapshot: the chapter row with blocks_snapshot undeferred
+
+    python scripts/benchmark_chapter_reads.py --chapters 200 --blocks 12 --reads 2000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import undefer
+
+from app.database import SessionLocal
+from app.models import User, Book, Chapter, ChapterBlock
+from app.chapters.service import publish_chapter
+from app.query_stats import count_queries
+
+BENCH_EMAIL = "bench_reads@example.com"
+
+
+def get_bench_user(db) -> User:
+    user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    if user is None:
+        user = User(email=BENCH_EMAIL, username="bench_reads", password_hash="x", open_pages=3)
+        db.add(user)
+        db.flush()
+        db.add(Book(user_id=user.id))
+        db.commit()
+    return user
+
+
+def publish(db, count: int, block_count: int) -> list[int]:
+    user_id = get_bench_user(db).id
+    blocks = [
+        {"position": i, "block_type": "text", "content": {"text": f"Benchmark paragraph {i} " * 40}}
+        for i in range(block_count)
+    ]
+    chapter_ids = []
+    for _ in range(count):
+        db.execute(text("UPDATE users SET open_pages = 3, last_open_page_grant = NULL WHERE id = :id"),
+                   {"id": user_id})
+        chapter, _ = publish_chapter(db, db.get(User, user_id), blocks=blocks, title="Benchmark chapter")
+        db.commit()
+        chapter_ids.append(chapter.id)
+    return chapter_ids
+
+
+def read_rows(db, chapter_id: int) -> list:
+    db.execute(select(Chapter).where(Chapter.id == chapter_id)).scalar_one()
+    return db.scalars(
+        select(ChapterBlock).where(ChapterBlock.chapter_id == chapter_id).order_by(ChapterBlock.position)
+    ).all()
+
+
+def read_snapshot(db, chapter_id: int) -> list:
+    chapter = db.execute(
+        select(Chapter).where(Chapter.id == chapter_id).options(undefer(Chapter.blocks_snapshot))
+    ).scalar_one()
+    return chapter.blocks_snapshot
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def run(chapters: int, block_count: int, reads: int, seed: int) -> None:
+    db = SessionLocal()
+    try:
+        print(f"⏱️  Publishing {chapters} chapters with {block_count} blocks...")
+        chapter_ids = publish(db, chapters, block_count)
+        sample = random.Random(seed).choices(chapter_ids, k=reads)
+
+        print(f"{'path':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'statements':>11}")
+        for name, read in (("rows", read_rows), ("snapshot", read_snapshot)):
+            timings = []
+            statements = set()
+            for chapter_id in sample:
+                db.expunge_all()  # Measure database reads, not the identity map
+                with count_queries() as stats:
+                    start = time.perf_counter()
+                    blocks = read(db, chapter_id)
+                    timings.append((time.perf_counter() - start) * 1000)
+                statements.add(stats.count)
+                assert len(blocks) == block_count
+            db.rollback()
+
+            timings.sort()
+            print(f"{name:>9} {statistics.median(timings):>9.3f} {percentile(timings, 99):>9.3f} "
+                  f"{timings[-1]:>9.3f} {'/'.join(map(str, sorted(statements))):>11}")
+    finally:
+        db.close()
+
+
+def cleanup() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM users WHERE email = :email"), {"email": BENCH_EMAIL})
+        db.commit()
+        print("🧹 Removed benchmark user and chapters")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=12, help="Blocks per chapter")
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark user and chapters")
+    args = parser.parse_args()
+
+    run(args.chapters, args.blocks, args.reads, args.seed)
+
+    if not args.keep:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark draft revision history: storage per 1,000 edits and
+reconstruction latency.
+
+Simulates an editing session on a synthetic draft (mostly small text
+edits, with occasional inserts, moves, deletes and metadata changes),
+encodes every revision the way app.study.history does, and compares
+against storing a full snapshot per revision. Reconstruction time covers
+decompressing and replaying one snapshot plus its deltas; the database
+fetch (one indexed range scan) is not included.
+
+    python scripts/benchmark_draft_history.py --edits 1000 --blocks 30 --interval 10 20 50
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.study.history import encode, diff_states, replay
+
+WORDS = "the light came slowly through the window and she wrote it down before it was gone".split()
+
+
+def sentence(rng: random.Random, words: int = 40) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def initial_state(rng: random.Random, block_count: int) -> dict:
+    return {
+        "title": "Benchmark Draft",
+        "mood": "reflective",
+        "theme": None,
+        "time_period": None,
+        "blocks": [
+            {"id": i, "block_type": "text", "content": {"text": sentence(rng)}}
+            for i in range(1, block_count + 1)
+        ],
+    }
+
+
+def edit(rng: random.Random, state: dict, next_id: int) -> tuple[dict, int]:
+    """One autosave's worth of change"""
+    blocks = [dict(block) for block in state["blocks"]]
+    state = {**state, "blocks": blocks}
+    roll = rng.random()
+
+    if roll < 0.85 or len(blocks) < 3:
+        index = rng.randrange(len(blocks))
+        text = blocks[index]["content"]["text"]
+        at = rng.randrange(len(text) + 1)
+        blocks[index]["content"] = {"text": text[:at] + rng.choice(WORDS) + " " + text[at:]}
+    elif roll < 0.92:
+        blocks.insert(rng.randrange(len(blocks) + 1), {"id": next_id, "block_type": "text", "content": {"text": sentence(rng, 10)}})
+        next_id += 1
+    elif roll < 0.96:
+        blocks.insert(rng.randrange(len(blocks)), blocks.pop(rng.randrange(len(blocks))))
+    elif roll < 0.98:
+        blocks.pop(rng.randrange(len(blocks)))
+    else:
+        state["mood"] = rng.choice(["reflective", "restless", "hopeful"])
+
+    return state, next_id
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def run(edits: int, block_count: int, intervals: list[int], samples: int, seed: int) -> None:
+    rng = random.Random(seed)
+    states = [initial_state(rng, block_count)]
+    next_id = block_count + 1
+    for _ in range(edits):
+        state, next_id = edit(rng, states[-1], next_id)
+        states.append(state)
+
+    full = [encode(state) for state in states]
+    full_kb = sum(len(payload) for payload in full) / 1024
+    first_kb = len(full[0]) / 1024
+    print(f"{edits} edits on {block_count} blocks; the first snapshot is {first_kb:.1f} KiB compressed")
+    print(f"{'storage':>20} {'KiB/1000 edits':>15} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print(f"{'snapshot every rev':>20} {full_kb * 1000 / len(states):>15.1f} {'-':>9} {'-':>9} {'-':>9}")
+
+    for interval in intervals:
+        rows = []
+        for revision, state in enumerate(states):
+            if revision % interval == 0:
+                rows.append((revision, True, full[revision]))
+            else:
+                rows.append((revision, False, encode(diff_states(states[revision - 1], state))))
+        kib = sum(len(row[2]) for row in rows) / 1024
+
+        timings = []
+        for revision in rng.sample(range(len(states)), min(samples, len(states))):
+            anchor = revision - revision % interval
+            start = time.perf_counter()
+            rebuilt = replay(rows[anchor:revision + 1])
+            timings.append((time.perf_counter() - start) * 1000)
+            assert rebuilt == states[revision], f"revision {revision} rebuilt incorrectly"
+        timings.sort()
+
+        label = f"snapshot every {interval}"
+        print(
+            f"{label:>20} {kib * 1000 / len(states):>15.1f} {statistics.median(timings):>9.3f} "
+            f"{percentile(timings, 99):>9.3f} {timings[-1]:>9.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--blocks", type=int, default=30, help="Blocks in the starting draft")
+    parser.add_argument("--interval", type=int, nargs="+", default=[10, 20, 50], help="Snapshot intervals to compare")
+    parser.add_argument("--samples", type=int, default=500, help="Revisions to reconstruct per interval")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.edits, args.blocks, args.interval, args.samples, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Benchmark the hot query shapes against a large seeded database.
+
+Seeds synthetic users, chapters, hearts, follows, notifications, margins
+and Between the Lines rows, then runs each hot query with
+EXPLAIN (ANALYZE, BUFFERS) and reports latency percentiles and the
+indexes the planner chose.
+
+Compare plans before and after the composite index migration (007):
+
+    alembic downgrade 006
+    python scripts/benchmark_indexes.py --seed --out before.json
+    alembic upgrade 007
+    python scripts/benchmark_indexes.py --out after.json
+    python scripts/benchmark_indexes.py --compare before.json after.json
+
+Remove the synthetic data with --cleanup.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.database import engine
+
+
+BENCH_EMAIL_PATTERN = "bench\\_%@example.com"
+
+# name -> SQL (bind parameters are filled from sample ids)
+HOT_QUERIES = {
+    "author_chapters": """
+        SELECT * FROM chapters WHERE author_id = :user_id
+        ORDER BY published_at DESC LIMIT 20
+    """,
+    "feed": """
+        SELECT * FROM chapters WHERE author_id = ANY(:followed_ids)
+        ORDER BY published_at DESC LIMIT 20
+    """,
+    "unread_notifications": """
+        SELECT * FROM notifications WHERE user_id = :user_id AND read = false
+        ORDER BY created_at DESC LIMIT 50
+    """,
+    "thread_messages": """
+        SELECT * FROM btl_messages WHERE thread_id = :thread_id ORDER BY created_at
+    """,
+    "chapter_margins": """
+        SELECT * FROM margins WHERE chapter_id = :chapter_id ORDER BY created_at
+    """,
+    "heart_exists": """
+        SELECT id FROM hearts WHERE user_id = :user_id AND chapter_id = :chapter_id
+    """,
+    "follow_exists": """
+        SELECT id FROM follows WHERE follower_id = :user_id AND followed_id = :other_id
+    """,
+    "pending_invite": """
+        SELECT id FROM btl_invites
+        WHERE sender_id = :user_id AND recipient_id = :other_id AND status = 'PENDING'
+    """,
+}
+
+
+def seed(conn, users: int, chapters_per_user: int, hearts: int, notifications: int) -> None:
+    """Bulk-insert synthetic rows with generate_series (fast, server-side)"""
+    print(f"🌱 Seeding {users} users, {users * chapters_per_user} chapters, "
+          f"{hearts} hearts, {notifications} notifications...")
+
+    conn.execute(text("""
+        INSERT INTO users (email, username, password_hash, open_pages, muse_level, muse_xp,
+                           quiet_mode, created_at, updated_at)
+        SELECT 'bench_' || g || '@example.com', 'bench_' || g, 'x', 3, 'spark', 0,
+               false, now(), now()
+        FROM generate_series(1, :users) g
+        ON CONFLICT DO NOTHING
+    """), {"users": users})
+
+    conn.execute(text("""
+        CREATE TEMP TABLE bench_users AS
+        SELECT row_number() OVER (ORDER BY id) AS n, id FROM users WHERE email LIKE :pattern
+    """), {"pattern": BENCH_EMAIL_PATTERN})
+    total = conn.execute(text("SELECT count(*) FROM bench_users")).scalar()
+
+    conn.execute(text("""
+        INSERT INTO chapters (author_id, title, heart_count, theme_count, published_at,
+                              edit_window_expires, created_at, updated_at)
+        SELECT u.id, 'Bench chapter ' || g, 0, 0,
+               now() - (random() * interval '365 days'), now(), now(), now()
+        FROM bench_users u, generate_series(1, :per_user) g
+    """), {"per_user": chapters_per_user})
+
+    conn.execute(text("""
+        CREATE TEMP TABLE bench_chapters AS
+        SELECT row_number() OVER (ORDER BY c.id) AS n, c.id, c.author_id
+        FROM chapters c JOIN bench_users u ON u.id = c.author_id
+    """))
+    chapter_total = conn.execute(text("SELECT count(*) FROM bench_chapters")).scalar()
+
+    conn.execute(text("""
+        INSERT INTO hearts (user_id, chapter_id, created_at)
+        SELECT u.id, c.id, now()
+        FROM generate_series(1, :hearts) g
+        JOIN bench_users u ON u.n = 1 + (g * 7919) % :total
+        JOIN bench_chapters c ON c.n = 1 + (g * 104729) % :chapter_total
+        ON CONFLICT DO NOTHING
+    """), {"hearts": hearts, "total": total, "chapter_total": chapter_total})
+
+    conn.execute(text("""
+        INSERT INTO follows (follower_id, followed_id, created_at)
+        SELECT a.id, b.id, now()
+        FROM bench_users a
+        JOIN generate_series(1, 20) g ON true
+        JOIN bench_users b ON b.n = 1 + (a.n + g * 31) % :total
+        WHERE a.id != b.id
+        ON CONFLICT DO NOTHING
+    """), {"total": total})
+
+    conn.execute(text("""
+        INSERT INTO notifications (user_id, type, message, read, created_at)
+        SELECT u.id, 'margin', 'Someone lingered in the margins of your chapter.',
+               random() < 0.8, now() - (random() * interval '90 days')
+        FROM generate_series(1, :notifications) g
+        JOIN bench_users u ON u.n = 1 + (g * 7919) % :total
+    """), {"notifications": notifications, "total": total})
+
+    conn.execute(text("""
+        INSERT INTO margins (author_id, chapter_id, content, created_at, updated_at)
+        SELECT u.id, c.id, 'A quiet note', now() - (random() * interval '90 days'), now()
+        FROM generate_series(1, :margins) g
+        JOIN bench_users u ON u.n = 1 + (g * 7919) % :total
+        JOIN bench_chapters c ON c.n = 1 + (g * 104729) % :chapter_total
+    """), {"margins": hearts // 4, "total": total, "chapter_total": chapter_total})
+
+    conn.execute(text("""
+        INSERT INTO btl_threads (participant1_id, participant2_id, status, created_at)
+        SELECT a.id, b.id, 'OPEN', now()
+        FROM bench_users a JOIN bench_users b ON b.n = 1 + a.n % :total
+    """), {"total": total})
+
+    conn.execute(text("""
+        INSERT INTO btl_messages (thread_id, sender_id, content, created_at)
+        SELECT t.id, t.participant1_id, 'Between the lines', now() - (g * interval '1 minute')
+        FROM btl_threads t
+        JOIN bench_users u ON u.id = t.participant1_id
+        JOIN generate_series(1, 30) g ON true
+    """))
+
+    conn.execute(text("""
+        INSERT INTO btl_invites (sender_id, recipient_id, note, status, created_at)
+        SELECT a.id, b.id, 'Hello', CASE WHEN a.n % 3 = 0 THEN 'PENDING' ELSE 'ACCEPTED' END::btlinvitestatus, now()
+        FROM bench_users a JOIN bench_users b ON b.n = 1 + (a.n + 7) % :total
+    """), {"total": total})
+
+    conn.execute(text("ANALYZE"))
+    print("✓ Seeded")
+
+
+def cleanup(conn) -> None:
+    """Delete synthetic users (cascades to everything they own)"""
+    deleted = conn.execute(
+        text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": BENCH_EMAIL_PATTERN}
+    ).rowcount
+    print(f"🧹 Removed {deleted} benchmark users")
+
+
+def sample_params(conn) -> dict:
+    """Pick representative ids from the seeded data"""
+    row = conn.execute(text("""
+        SELECT u.id AS user_id, c.id AS chapter_id
+        FROM users u JOIN chapters c ON c.author_id = u.id
+        WHERE u.email LIKE :pattern
+        ORDER BY u.id LIMIT 1
+    """), {"pattern": BENCH_EMAIL_PATTERN}).mappings().first()
+    if row is None:
+        raise SystemExit("No benchmark data found - run with --seed first")
+
+    followed_ids = conn.execute(
+        text("SELECT followed_id FROM follows WHERE follower_id = :user_id"), dict(row)
+    ).scalars().all()
+    thread_id = conn.execute(
+        text("SELECT id FROM btl_threads WHERE participant1_id = :user_id LIMIT 1"), dict(row)
+    ).scalar()
+
+    return {
+        **row,
+        "followed_ids": followed_ids,
+        "other_id": followed_ids[0] if followed_ids else row["user_id"],
+        "thread_id": thread_id or 0,
+    }
+
+
+def _plan_indexes(node: dict) -> list[str]:
+    found = [node["Index Name"]] if "Index Name" in node else []
+    for child in node.get("Plans", []):
+        found.extend(_plan_indexes(child))
+    return found
+
+
+def run(conn, repeat: int) -> dict:
+    """EXPLAIN ANALYZE every hot query `repeat` times"""
+    params = sample_params(conn)
+    results = {}
+
+    for name, sql in HOT_QUERIES.items():
+        timings = []
+        plan = None
+        for _ in range(repeat):
+            plan = conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params
+            ).scalar()[0]
+            timings.append(plan["Execution Time"])
+
+        timings.sort()
+        results[name] = {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+            "root_node": plan["Plan"]["Node Type"],
+            "indexes": _plan_indexes(plan["Plan"]),
+            "shared_hit_blocks": plan["Plan"].get("Shared Hit Blocks"),
+            "shared_read_blocks": plan["Plan"].get("Shared Read Blocks"),
+        }
+        print(f"  {name:<22} p50 {results[name]['p50_ms']:>8} ms  "
+              f"{results[name]['root_node']:<18} {', '.join(results[name]['indexes']) or '-'}")
+
+    return results
+
+
+def compare(before_path: str, after_path: str) -> None:
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+
+    print(f"{'query':<22} {'before p50':>11} {'after p50':>11} {'speedup':>8}  plan change")
+    for name in HOT_QUERIES:
+        if name not in before or name not in after:
+            continue
+        b, a = before[name], after[name]
+        speedup = b["p50_ms"] / a["p50_ms"] if a["p50_ms"] else float("inf")
+        change = f"{','.join(b['indexes']) or b['root_node']} -> {','.join(a['indexes']) or a['root_node']}"
+        print(f"{name:<22} {b['p50_ms']:>9} ms {a['p50_ms']:>9} ms {speedup:>7.1f}x  {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Seed synthetic data before benchmarking")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--chapters-per-user", type=int, default=25)
+    parser.add_argument("--hearts", type=int, default=2000000)
+    parser.add_argument("--notifications", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--out", help="Write results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--cleanup", action="store_true", help="Remove synthetic data and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    with engine.begin() as conn:
+        if args.cleanup:
+            cleanup(conn)
+            return
+        if args.seed:
+            seed(conn, args.users, args.chapters_per_user, args.hearts, args.notifications)
+
+    with engine.connect() as conn:
+        print("⏱️  Running hot queries...")
+        results = run(conn, args.repeat)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"✓ Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the publish path (chapters + blocks + Open Page + XP in one transaction).
+
+Publishes chapters for a throwaway benchmark user at several block counts
+and reports latency percentiles and statements per publish, which should
+be the same for every block count.
+
+    python scripts/benchmark_publish.py --iterations 500 --blocks 1 6 12
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models import User, Book
+from app.chapters.service import publish_chapter
+from app.query_stats import count_queries
+
+BENCH_EMAIL = "bench_publish@example.com"
+
+
+def get_bench_user(db) -> User:
+    user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    if user is None:
+        user = User(email=BENCH_EMAIL, username="bench_publish", password_hash="x", open_pages=3)
+        db.add(user)
+        db.flush()
+        db.add(Book(user_id=user.id))
+        db.commit()
+    return user
+
+
+def make_blocks(count: int) -> list[dict]:
+    return [
+        {"position": i, "block_type": "text", "content": {"text": f"Benchmark paragraph {i} " * 20}}
+        for i in range(count)
+    ]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def run(iterations: int, block_counts: list[int]) -> None:
+    db = SessionLocal()
+    try:
+        user = get_bench_user(db)
+        user_id = user.id
+
+        print(f"{'blocks':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'statements':>11}")
+        for block_count in block_counts:
+            blocks = make_blocks(block_count)
+            timings = []
+            statements = set()
+
+            for _ in range(iterations):
+                # Top up Open Pages outside the timed section
+                db.execute(text("UPDATE users SET open_pages = 3, last_open_page_grant = NULL WHERE id = :id"),
+                           {"id": user_id})
+                db.commit()
+                user = db.get(User, user_id)
+
+                with count_queries() as stats:
+                    start = time.perf_counter()
+                    publish_chapter(db, user, blocks=blocks, title="Benchmark chapter")
+                    db.commit()
+                    timings.append((time.perf_counter() - start) * 1000)
+                statements.add(stats.count)
+
+            timings.sort()
+            print(f"{block_count:>6} {statistics.median(timings):>9.2f} {percentile(timings, 99):>9.2f} "
+                  f"{timings[-1]:>9.2f} {'/'.join(map(str, sorted(statements))):>11}")
+    finally:
+        db.close()
+
+
+def cleanup() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM users WHERE email = :email"), {"email": BENCH_EMAIL})
+        db.commit()
+        print("🧹 Removed benchmark user and chapters")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[1, 6, 12])
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark user and chapters")
+    args = parser.parse_args()
+
+    print(f"⏱️  Publishing {args.iterations} chapters per block count...")
+    run(args.iterations, args.blocks)
+
+    if not args.keep:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark /search/suggest lookups against the in-memory prefix index.
+
+Builds a PrefixIndex from synthetic titles (or the real terms with
+--from-db), then times lookups for random 1-8 character prefixes of
+indexed words and reports build time, size and latency percentiles.
+The target is p99 under 5 ms.
+
+    python scripts/benchmark_suggest.py --titles 200000 --lookups 20000
+    python scripts/benchmark_suggest.py --from-db
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.suggest_index import PrefixIndex, load_terms
+
+WORDS = (
+    "light winter harbour kitchen letter mother river quiet morning garden "
+    "goodbye summer train window grief memory salt orchard silence return "
+    "bread lantern fever island night road stone sister small house"
+).split()
+
+
+def synthetic_terms(titles: int, rng: random.Random) -> list[tuple[str, str, int]]:
+    terms = [
+        (" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).capitalize() + f" {n}", "title", 1)
+        for n in range(titles)
+    ]
+    terms += [(word, "mood", rng.randint(1, 5000)) for word in WORDS]
+    return terms
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--from-db", action="store_true", help="Index the real terms instead")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.from_db:
+        from app.database import SessionLocal
+        db = SessionLocal()
+        try:
+            terms = load_terms(db)
+        finally:
+            db.close()
+    else:
+        terms = synthetic_terms(args.titles, rng)
+
+    start = time.perf_counter()
+    index = PrefixIndex(terms)
+    print(f"🏗️  Indexed {len(terms)} terms as {len(index)} keys in {time.perf_counter() - start:.1f} s")
+
+    words = [word for display, _, _ in rng.sample(terms, min(len(terms), 1000)) for word in display.split()]
+    prefixes = [word[:rng.randint(1, min(len(word), 8))] for word in rng.choices(words, k=args.lookups)]
+
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.search(prefix, args.limit)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"⏱️  {args.lookups} lookups: p50 {statistics.median(timings):.3f} ms, "
+          f"p99 {percentile(timings, 99):.3f} ms, max {timings[-1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
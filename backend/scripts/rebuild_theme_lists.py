@@ -0,0 +1,55 @@
+"""
+Rebuild or check the per-theme chapter lists in Redis.
+
+    python scripts/rebuild_theme_lists.py              # rebuild every theme (cold start)
+    python scripts/rebuild_theme_lists.py --theme 3    # one theme
+    python scripts/rebuild_theme_lists.py --check      # report drifted lists, change nothing
+
+Lists are otherwise built lazily on first read and repaired hourly by
+the check_theme_lists job.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal
+from app.models import Theme
+from app.services.theme_lists import rebuild_theme_list, check_theme_lists
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--theme", type=int, action="append", dest="theme_ids", help="Limit to a theme id (repeatable)")
+    parser.add_argument("--check", action="store_true", help="Only report lists that differ from the database")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            result = check_theme_lists(db, repair=False)
+            if result["drifted"]:
+                print(f"✗ Drifted themes: {', '.join(map(str, result['drifted']))}")
+                sys.exit(1)
+            print("✓ Built theme lists match the database")
+            return
+
+        query = db.query(Theme.id, Theme.slug).order_by(Theme.id)
+        if args.theme_ids:
+            query = query.filter(Theme.id.in_(args.theme_ids))
+        for theme_id, slug in query.all():
+            length = rebuild_theme_list(db, theme_id)
+            if length is None:
+                print(f"  {slug:<24} skipped (tagged while rebuilding; run again)")
+            else:
+                print(f"  {slug:<24} {length:>6} chapters")
+    finally:
+        db.close()
+
+    print("✓ Theme lists rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Replay the XP ledger and compare with users.muse_xp / muse_level.
+
+    python scripts/replay_xp.py                 # report mismatches
+    python scripts/replay_xp.py --user 42       # one user
+    python scripts/replay_xp.py --apply         # fix mismatched snapshots
+
+Run scripts/run_job.py aggregate_xp first so pending events are folded in.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal
+from app.services.muse_progression import replay_xp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Limit to a user id (repeatable)")
+    parser.add_argument("--apply", action="store_true", help="Overwrite mismatched snapshots with replayed values")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mismatches = replay_xp(db, args.user_ids, apply=args.apply)
+    finally:
+        db.close()
+
+    for entry in mismatches:
+        print(f"  user {entry['user_id']:<8} stored {entry['stored_xp']:>6} ({entry['stored_level']})"
+              f"  replayed {entry['replayed_xp']:>6} ({entry['replayed_level']})")
+
+    if not mismatches:
+        print("✓ Snapshots match the ledger")
+    elif args.apply:
+        print(f"✓ Fixed {len(mismatches)} users")
+    else:
+        print(f"⚠️  {len(mismatches)} users differ (re-run with --apply to fix)")
+
+
+if __name__ == "__main__":
+    main()
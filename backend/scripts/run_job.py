@@ -0,0 +1,39 @@
+"""
+Run a periodic background job once.
+
+    python scripts/run_job.py --list
+    python scripts/run_job.py reconcile_heart_counts
+
+Useful from cron when the in-process scheduler is disabled
+(SCHEDULER_ENABLED=false) or to repair data on demand.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.scheduler import load_jobs, run_job
+
+
+def main():
+    jobs = load_jobs()
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("job", nargs="?", choices=sorted(jobs))
+    parser.add_argument("--list", action="store_true", help="List registered jobs")
+    args = parser.parse_args()
+
+    if args.list or not args.job:
+        for name, job in sorted(jobs.items()):
+            print(f"  {name:<28} every {job.interval:g}s")
+        return
+
+    print(f"⏱️  Running {args.job}...")
+    result = run_job(args.job)
+    print(f"✓ {args.job}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Seed theme centroids from theme descriptions (calls the OpenAI embeddings API).
+
+    python scripts/seed_theme_centroids.py            # themes without a seed
+    python scripts/seed_theme_centroids.py --reseed   # every theme (after editing descriptions)
+
+Seeds give themes with few or no tagged chapters a starting point for
+Muse theme suggestions; tagged chapters then pull each centroid toward
+how the theme is actually used.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal
+from app.muse.embeddings import client
+from app.muse.theme_centroids import seed_theme_centroids
+
+
+def embed(texts: list[str]) -> list[list[float]]:
+    response = client.embeddings.create(model="text-embedding-3-small", input=texts)
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reseed", action="store_true", help="Replace existing seeds too")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        seeded = seed_theme_centroids(db, embed, reseed=args.reseed)
+    finally:
+        db.close()
+
+    print(f"✓ Seeded {seeded} theme centroids")
+
+
+if __name__ == "__main__":
+    main()
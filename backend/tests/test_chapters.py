@@ -18,10 +18,11 @@ def cleanup_test_data():
     """Clean up test data"""
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.email == "chaptertest@example.com").first()
-        if user:
-            db.delete(user)
-            db.commit()
+        for email in ("chaptertest@example.com", "chapterprivate@example.com"):
+            user = db.query(User).filter(User.email == email).first()
+            if user:
+                db.delete(user)
+        db.commit()
     finally:
         db.close()
 
@@ -100,6 +101,12 @@ def test_create_chapter(token: str):
     assert chapter["blocks"][0]["block_type"] == "text"
     assert chapter["blocks"][1]["block_type"] == "image"
     
+    # Derived at publish time
+    assert chapter["word_count"] == 9
+    assert chapter["reading_time_minutes"] == 1
+    assert chapter["block_summary"] == {"text": 1, "image": 1}
+    assert chapter["first_image_url"] == "https://example.com/image.jpg"
+    
     print("✅ Chapter created successfully!")
     print(f"   Chapter ID: {chapter['id']}")
     print(f"   Title: {chapter['title']}")
@@ -236,6 +243,17 @@ def test_update_chapter(token: str, chapter_id: int):
     assert chapter["title"] == "Updated Title"
     assert chapter["mood"] == "joyful"
     
+    # Editing blocks re-derives the stored fields
+    response = client.patch(
+        f"/chapters/{chapter_id}",
+        json={"blocks": [{"position": 0, "block_type": "text", "content": {"text": "Just three words"}}]},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    chapter = response.json()
+    assert chapter["word_count"] == 3
+    assert chapter["first_image_url"] is None
+    
     print("✅ Chapter updated successfully!")
 
 
@@ -257,6 +275,83 @@ def test_list_chapters(token: str):
     print(f"✅ Listed {len(chapters)} chapter(s)")
 
 
+def test_search_blocks(token: str, chapter_id: int):
+    """Test finding chapters by block content"""
+    print("\n🧪 Testing block content search...")
+    
+    response = client.get(
+        "/search/blocks",
+        params={"text": "three words"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    assert chapter_id in [c["id"] for c in response.json()["chapters"]]
+    
+    # At least one filter is required
+    response = client.get("/search/blocks", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+    
+    print("✅ Found chapter by its text blocks")
+
+
+def test_search_blocks_private_author(token: str):
+    """Test block content search hides private books the viewer does not follow"""
+    print("\n🧪 Testing block content search privacy...")
+    
+    response = client.post("/auth/register", json={
+        "email": "chapterprivate@example.com",
+        "username": "chapterprivate",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    private_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    response = client.post(
+        "/chapters",
+        json={
+            "title": "Behind Closed Doors",
+            "blocks": [{"position": 0, "block_type": "text", "content": {"text": "A quietly private sentence"}}]
+        },
+        headers=private_headers
+    )
+    assert response.status_code == 201
+    chapter_id = response.json()["id"]
+    assert client.patch("/privacy/book", json={"is_private": True}, headers=private_headers).status_code == 200
+    
+    params = {"text": "quietly private sentence"}
+    response = client.get("/search/blocks", params=params, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert chapter_id not in [c["id"] for c in response.json()["chapters"]]
+    
+    # The author still finds their own chapter
+    response = client.get("/search/blocks", params=params, headers=private_headers)
+    assert chapter_id in [c["id"] for c in response.json()["chapters"]]
+    
+    print("✅ Private chapters hidden from block search!")
+
+
+def test_related_chapters(token: str, chapter_id: int):
+    """Test "more like this" for a chapter"""
+    print("\n🧪 Testing related chapters...")
+    
+    response = client.get(
+        f"/chapters/{chapter_id}/related",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    related = response.json()
+    assert related["chapter_id"] == chapter_id
+    assert chapter_id not in [c["id"] for c in related["chapters"]]
+    
+    response = client.get(
+        "/chapters/999999999/related",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 404
+    
+    print(f"✅ {len(related['chapters'])} related chapter(s)")
+
+
 def test_no_open_pages(token: str):
     """Test that publishing fails without Open Pages"""
     print("\n🧪 Testing Open Pages enforcement...")
@@ -332,6 +427,9 @@ if __name__ == "__main__":
         test_get_chapter(token, chapter_id)
         test_update_chapter(token, chapter_id)
         test_list_chapters(token)
+        test_search_blocks(token, chapter_id)
+        test_search_blocks_private_author(token)
+        test_related_chapters(token, chapter_id)
         test_no_open_pages(token)
         test_delete_chapter(token, chapter_id)
         
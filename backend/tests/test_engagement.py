@@ -166,6 +166,12 @@ def test_follow_book(token1: str, token2: str):
     
     print(f"✅ Book has {len(followers)} follower(s)!")
     
+    # Stored stats follow along
+    profile = client.get("/users/book-profile", headers={"Authorization": f"Bearer {token1}"}).json()
+    assert profile["follower_count"] == 1
+    profile = client.get("/users/book-profile", headers={"Authorization": f"Bearer {token2}"}).json()
+    assert profile["following_count"] == 1
+    
     # Unfollow
     response = client.delete(
         f"/engagement/books/{book1_id}/follow",
@@ -173,6 +179,9 @@ def test_follow_book(token1: str, token2: str):
     )
     assert response.status_code == 204
     
+    profile = client.get("/users/book-profile", headers={"Authorization": f"Bearer {token1}"}).json()
+    assert profile["follower_count"] == 0
+    
     print("✅ Book unfollowed successfully!")
 
 
@@ -260,6 +269,140 @@ def test_margins(token1: str, token2: str):
     print("✅ Margin deleted successfully!")
 
 
+def test_idempotent_writes_and_batch(token1: str, token2: str):
+    """Test double-taps are no-ops and batched actions apply in one request"""
+    print("\n🧪 Testing idempotent writes and batch engagement...")
+    
+    # Reuse the chapter from test_heart_chapter (hearted then unhearted, never bookmarked)
+    db = SessionLocal()
+    try:
+        from app.models import Chapter
+        chapter_id = db.query(Chapter.id).filter(Chapter.title == "Heartable Chapter").order_by(Chapter.id.desc()).first()[0]
+    finally:
+        db.close()
+    book_id = get_book_id(token1)
+    headers = {"Authorization": f"Bearer {token2}"}
+    
+    # Double-tap heart counts once
+    first = client.post(f"/engagement/chapters/{chapter_id}/heart", headers=headers)
+    second = client.post(f"/engagement/chapters/{chapter_id}/heart", headers=headers)
+    assert first.status_code == 201 and second.status_code == 201
+    assert first.json()["id"] == second.json()["id"]
+    
+    response = client.get(f"/chapters/{chapter_id}", headers=headers)
+    assert response.json()["heart_count"] == 1
+    print("✅ Double heart is a no-op!")
+    
+    # Offline queue replay
+    response = client.post("/engagement/batch", json={"actions": [
+        {"action": "unheart", "target_id": chapter_id},
+        {"action": "bookmark", "target_id": chapter_id},
+        {"action": "bookmark", "target_id": chapter_id},
+        {"action": "shelf", "target_id": book_id},
+        {"action": "heart", "target_id": 999999999},
+    ]}, headers=headers)
+    assert response.status_code == 200
+    statuses = [r["status"] for r in response.json()["results"]]
+    assert statuses == ["applied", "applied", "noop", "applied", "not_found"]
+    
+    response = client.get(f"/chapters/{chapter_id}", headers=headers)
+    assert response.json()["heart_count"] == 0
+    
+    # Own book can't be followed
+    response = client.post("/engagement/batch", json={"actions": [
+        {"action": "follow", "target_id": book_id},
+    ]}, headers={"Authorization": f"Bearer {token1}"})
+    assert response.json()["results"][0]["status"] == "invalid"
+    print("✅ Batch applied with per-action status!")
+
+
+def test_flush_and_reconcile_concurrently(token1: str, token2: str):
+    """Test a flush racing a reconcile applies each buffered heart once"""
+    print("\n🧪 Testing heart flush and reconcile concurrency...")
+    
+    import threading
+    from app.scheduler import run_job
+    
+    chapter_id = create_chapter(token1, "Contended Hearts")
+    headers = {"Authorization": f"Bearer {token2}"}
+    
+    errors = []
+    
+    def run(name: str):
+        try:
+            run_job(name)
+        except Exception as e:
+            errors.append(e)
+    
+    for _ in range(5):
+        # A heart whose delta is still buffered in Redis
+        assert client.post(f"/engagement/chapters/{chapter_id}/heart", headers=headers).status_code == 201
+        threads = [
+            threading.Thread(target=run, args=(name,))
+            for name in ("flush_heart_counters", "reconcile_heart_counts", "flush_heart_counters")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        run_job("flush_heart_counters")
+        
+        db = SessionLocal()
+        try:
+            from app.models import Chapter
+            assert db.query(Chapter.heart_count).filter(Chapter.id == chapter_id).scalar() == 1
+        finally:
+            db.close()
+        
+        response = client.get(f"/chapters/{chapter_id}", headers=headers)
+        assert response.json()["heart_count"] == 1
+        
+        assert client.delete(f"/engagement/chapters/{chapter_id}/heart", headers=headers).status_code == 204
+        run_job("flush_heart_counters")
+    
+    print("✅ Buffered hearts counted once under concurrent flush and reconcile!")
+
+
+def test_bulk_engagement_state(token2: str):
+    """Test viewer state for many chapters comes back in one request"""
+    print("\n🧪 Testing bulk engagement state...")
+    
+    # State left by test_idempotent_writes_and_batch: unhearted, bookmarked, book shelved
+    db = SessionLocal()
+    try:
+        from app.models import Chapter
+        chapter_id = db.query(Chapter.id).filter(Chapter.title == "Heartable Chapter").order_by(Chapter.id.desc()).first()[0]
+    finally:
+        db.close()
+    headers = {"Authorization": f"Bearer {token2}"}
+    
+    response = client.post(
+        "/engagement/state",
+        json={"chapter_ids": [chapter_id, 999999999, chapter_id]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    states = response.json()["states"]
+    assert [s["chapter_id"] for s in states] == [chapter_id, 999999999]
+    assert states[0]["is_hearted"] is False
+    assert states[0]["is_bookmarked"] is True
+    assert states[0]["is_shelved"] is True
+    assert states[1] == {
+        "chapter_id": 999999999, "is_hearted": False, "is_bookmarked": False,
+        "margin_count": 0, "is_shelved": False
+    }
+    
+    response = client.post("/engagement/state", json={"chapter_ids": list(range(1, 102))}, headers=headers)
+    assert response.status_code == 422
+    
+    # Lists embed the same state
+    bookmarks = client.get("/engagement/bookmarks", headers=headers).json()
+    bookmark = next(b for b in bookmarks if b["chapter_id"] == chapter_id)
+    assert bookmark["is_shelved"] is True and bookmark["is_hearted"] is False
+    print("✅ Bulk state returned and embedded in lists!")
+
+
 def test_margin_rate_limit(token1: str, token2: str):
     """Test margin rate limiting (20 per hour)"""
     print("\n🧪 Testing margin rate limiting...")
@@ -312,6 +455,9 @@ if __name__ == "__main__":
         token1, token2 = test_heart_chapter()
         test_follow_book(token1, token2)
         test_bookmark_chapter(token1, token2)
+        test_idempotent_writes_and_batch(token1, token2)
+        test_flush_and_reconcile_concurrently(token1, token2)
+        test_bulk_engagement_state(token2)
         test_margins(token1, token2)
         test_margin_rate_limit(token1, token2)
         
@@ -326,6 +472,7 @@ if __name__ == "__main__":
         print("  ✅ Follower listing")
         print("  ✅ Bookmark chapters (cross-follow)")
         print("  ✅ Bookmark listing")
+        print("  ✅ Idempotent writes and batch actions")
         print("  ✅ Margins (comments) on chapters")
         print("  ✅ Margin listing")
         print("  ✅ Margin rate limiting (20/hour)")
@@ -0,0 +1,85 @@
+"""Property tests for lazy Open Pages accrual (no database needed)"""
+import sys
+import os
+from datetime import datetime, timezone, timedelta
+
+backend_dir = os.path.dirname(os.path.dirname(__file__))
+os.chdir(backend_dir)
+sys.path.insert(0, backend_dir)
+
+from hypothesis import given, assume, strategies as st
+
+from app.services.open_pages import (
+    MAX_OPEN_PAGES,
+    ACCRUAL_PERIOD,
+    effective_open_pages,
+    after_consume,
+)
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+balances = st.integers(min_value=0, max_value=MAX_OPEN_PAGES)
+anchors = st.one_of(st.none(), st.timedeltas(min_value=timedelta(0), max_value=timedelta(days=30)).map(lambda d: EPOCH + d))
+gaps = st.timedeltas(min_value=timedelta(0), max_value=timedelta(days=10))
+
+
+@given(balances, anchors, gaps)
+def test_accrual_is_capped_min_of_stored_plus_days(stored, anchor, gap):
+    """effective = min(3, stored + whole days since anchor)"""
+    now = (anchor or EPOCH) + gap
+    expected = stored if anchor is None else min(MAX_OPEN_PAGES, stored + gap // ACCRUAL_PERIOD)
+    
+    assert effective_open_pages(stored, anchor, now) == expected
+    assert 0 <= effective_open_pages(stored, anchor, now) <= MAX_OPEN_PAGES
+
+
+@given(balances, anchors, gaps, gaps)
+def test_accrual_never_decreases_over_time(stored, anchor, gap, later):
+    now = (anchor or EPOCH) + gap
+    assert effective_open_pages(stored, anchor, now + later) >= effective_open_pages(stored, anchor, now)
+
+
+@given(balances, anchors, gaps, gaps)
+def test_consume_spends_exactly_one_page(stored, anchor, gap, later):
+    """Spending one page costs one page now and at most one page later"""
+    # Only new users (full balance) have no anchor; migration 009 anchors the rest
+    assume(anchor is not None or stored == MAX_OPEN_PAGES)
+    now = (anchor or EPOCH) + gap
+    before = effective_open_pages(stored, anchor, now)
+    if before == 0:
+        return
+    
+    new_stored, new_anchor = after_consume(stored, anchor, now)
+    
+    assert effective_open_pages(new_stored, new_anchor, now) == before - 1
+    
+    # Partial-day progress is not lost (or gained) by publishing
+    future = now + later
+    before_future = effective_open_pages(stored, anchor, future)
+    after_future = effective_open_pages(new_stored, new_anchor, future)
+    assert before_future - 1 <= after_future <= before_future
+
+
+@given(st.lists(st.timedeltas(min_value=timedelta(0), max_value=timedelta(hours=30)), max_size=40))
+def test_no_double_spend_over_a_publish_sequence(waits):
+    """Total publishes never exceed the initial 3 plus one per elapsed day"""
+    stored, anchor, now = MAX_OPEN_PAGES, None, EPOCH
+    published = 0
+    
+    for wait in waits:
+        now += wait
+        if effective_open_pages(stored, anchor, now) > 0:
+            stored, anchor = after_consume(stored, anchor, now)
+            published += 1
+        assert 0 <= stored <= MAX_OPEN_PAGES - 1 or published == 0
+    
+    assert published <= MAX_OPEN_PAGES + (now - EPOCH) // ACCRUAL_PERIOD
+
+
+if __name__ == "__main__":
+    print("🧪 Running Open Pages property tests...\n")
+    test_accrual_is_capped_min_of_stored_plus_days()
+    test_accrual_never_decreases_over_time()
+    test_consume_spends_exactly_one_page()
+    test_no_double_spend_over_a_publish_sequence()
+    print("✅ All Open Pages properties hold!")
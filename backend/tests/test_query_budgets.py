@@ -0,0 +1,286 @@
+"""Test SQL query budgets for hot endpoints (catches N+1 regressions)"""
+import sys
+import os
+
+backend_dir = os.path.dirname(os.path.dirname(__file__))
+os.chdir(backend_dir)
+sys.path.insert(0, backend_dir)
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal
+from app.models import User, Book, Theme
+from app.query_stats import assert_max_queries
+from app.services.search_cache import get_search_cache_stats, reset_search_cache_stats
+
+client = TestClient(app)
+
+
+def cleanup_test_data():
+    """Clean up test data"""
+    db = SessionLocal()
+    try:
+        for email in ("budget1@example.com", "budget2@example.com"):
+            user = db.query(User).filter(User.email == email).first()
+            if user:
+                db.delete(user)
+        db.query(Theme).filter(Theme.slug == "budget-theme").delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def register_user(email: str, username: str):
+    """Register a user and return token"""
+    response = client.post("/auth/register", json={
+        "email": email,
+        "username": username,
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    return response.json()["access_token"]
+
+
+def create_chapter(token: str, title: str):
+    """Create a chapter and return chapter ID"""
+    response = client.post(
+        "/chapters",
+        json={
+            "title": title,
+            "blocks": [
+                {"position": 0, "block_type": "text", "content": {"text": f"Content for {title}"}}
+            ]
+        },
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def get_book_id(email: str):
+    """Get a user's book ID"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        return db.query(Book).filter(Book.user_id == user.id).first().id
+    finally:
+        db.close()
+
+
+def setup_reader_and_author():
+    """Author publishes 3 chapters, reader follows the author's book"""
+    cleanup_test_data()
+    author_token = register_user("budget1@example.com", "budget1")
+    reader_token = register_user("budget2@example.com", "budget2")
+
+    chapter_ids = [create_chapter(author_token, f"Budget Chapter {i}") for i in range(3)]
+
+    response = client.post(
+        f"/engagement/books/{get_book_id('budget1@example.com')}/follow",
+        headers={"Authorization": f"Bearer {reader_token}"}
+    )
+    assert response.status_code == 201
+
+    return reader_token, author_token, chapter_ids
+
+
+def test_get_chapter_budget(token: str, chapter_id: int):
+    """Reading a chapter stays within its query budget"""
+    print("\n🧪 Testing GET /chapters/{id} query budget...")
+
+    with assert_max_queries(6) as stats:
+        response = client.get(
+            f"/chapters/{chapter_id}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+    assert response.status_code == 200
+
+    print(f"✅ Chapter read used {stats.count} queries")
+
+
+def test_get_chapter_cached(token: str, author_token: str, chapter_id: int):
+    """A cached chapter read costs only the auth lookup and the viewer-flags query"""
+    print("\n🧪 Testing GET /chapters/{id} from the chapter cache...")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.get(f"/chapters/{chapter_id}", headers=headers)  # Warm the cache
+    with assert_max_queries(2) as stats:
+        response = client.get(f"/chapters/{chapter_id}", headers=headers)
+    assert response.status_code == 200
+
+    # An edit invalidates the entry once the update commits
+    response = client.patch(
+        f"/chapters/{chapter_id}",
+        json={"title": "Edited after caching"},
+        headers={"Authorization": f"Bearer {author_token}"}
+    )
+    assert response.status_code == 200
+    response = client.get(f"/chapters/{chapter_id}", headers=headers)
+    assert response.json()["title"] == "Edited after caching"
+
+    print(f"✅ Cached chapter read used {stats.count} queries and saw the edit")
+
+    # A miss whose load races an invalidation must not cache what it loaded
+    from app.services import chapter_cache
+    chapter_cache.invalidate_chapters([chapter_id])
+    load = chapter_cache.load_chapter_entry
+
+    def load_then_edit(db, loaded_id):
+        entry = load(db, loaded_id)
+        chapter_cache.invalidate_chapters([loaded_id])  # An edit commits meanwhile
+        return entry
+
+    chapter_cache.load_chapter_entry = load_then_edit
+    try:
+        client.get(f"/chapters/{chapter_id}", headers=headers)
+    finally:
+        chapter_cache.load_chapter_entry = load
+    assert chapter_cache.redis_client.get(chapter_cache._key(chapter_id)) is None
+    print("✅ Raced cache fill was not written back")
+
+
+def test_feed_budget(token: str):
+    """New chapters feed stays within its query budget"""
+    print("\n🧪 Testing GET /library/new query budget...")
+
+    # auth, follows, count, chapters + authors, then 4 viewer-state queries
+    with assert_max_queries(8) as stats:
+        response = client.get(
+            "/library/new",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+    assert response.status_code == 200
+    assert len(response.json()["chapters"]) == 3
+
+    print(f"✅ Feed used {stats.count} queries")
+
+
+def test_search_cache(token: str):
+    """A repeated search is served from cached id pages"""
+    print("\n🧪 Testing GET /search result cache...")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    reset_search_cache_stats()
+    first = client.get("/search", params={"q": "Budget"}, headers=headers)
+    with assert_max_queries(8) as stats:
+        second = client.get("/search", params={"q": "  budget "}, headers=headers)  # Same normalized query
+    assert second.status_code == 200
+    assert second.json()["chapters"] == first.json()["chapters"]
+
+    search_stats = get_search_cache_stats()["search"]
+    assert search_stats["hits"] == 1 and search_stats["misses"] == 1
+
+    print(f"✅ Cached search used {stats.count} queries")
+
+
+def test_publish_statement_count_is_fixed(token: str):
+    """Publishing issues the same number of statements for 1 or 12 blocks"""
+    print("\n🧪 Testing POST /chapters statement count...")
+
+    counts = []
+    for block_count in (1, 12):
+        # Budget includes the auth lookup, the book stats update, the facet
+        # count upsert, the blocks snapshot write and the background
+        # embedding task's reads
+        with assert_max_queries(11) as stats:
+            response = client.post(
+                "/chapters",
+                json={
+                    "title": f"Budget {block_count} blocks",
+                    "blocks": [
+                        {"position": i, "block_type": "text", "content": {"text": f"Paragraph {i}"}}
+                        for i in range(block_count)
+                    ]
+                },
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        assert response.status_code == 201
+        assert len(response.json()["blocks"]) == block_count
+        counts.append(stats.count)
+
+    assert counts[0] == counts[1], f"Statement count grew with blocks: {counts}"
+
+    print(f"✅ Publish used {counts[0]} queries for 1 and 12 blocks")
+
+
+def test_theme_catalog(token: str, author_token: str, chapter_id: int):
+    """Theme listing is served from memory; tagging updates its counts"""
+    print("\n🧪 Testing GET /search/themes from the theme catalog...")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    db = SessionLocal()
+    try:
+        theme = Theme(name="Budget Theme", slug="budget-theme")
+        db.add(theme)
+        db.commit()
+        theme_id = theme.id
+    finally:
+        db.close()
+
+    response = client.post(
+        f"/search/chapters/{chapter_id}/themes",
+        params={"theme_id": theme_id},
+        headers={"Authorization": f"Bearer {author_token}"}
+    )
+    assert response.status_code == 200
+
+    client.get("/search/themes", headers=headers)  # Load the catalog
+    with assert_max_queries(1) as stats:
+        response = client.get("/search/themes", headers=headers)
+    assert response.status_code == 200
+    theme = next(t for t in response.json() if t["slug"] == "budget-theme")
+    assert theme["chapter_count"] == 1 and theme["recent_chapter_count"] == 1
+
+    response = client.get("/search/themes/budget-theme", headers=headers)
+    assert [c["id"] for c in response.json()["chapters"]] == [chapter_id]
+
+    # Browse counts follow tagging through the facet count table
+    response = client.get("/search/browse", params={"theme": "budget-theme"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert [c["id"] for c in response.json()["chapters"]] == [chapter_id]
+    assert {"value": "budget-theme", "label": "Budget Theme", "count": 1} in response.json()["facets"]["theme"]
+
+    response = client.delete(
+        f"/search/chapters/{chapter_id}/themes/{theme_id}",
+        headers={"Authorization": f"Bearer {author_token}"}
+    )
+    assert response.status_code == 200
+    response = client.get("/search/themes/budget-theme", headers=headers)
+    assert response.json()["theme"]["chapter_count"] == 0
+    assert response.json()["chapters"] == []
+
+    print(f"✅ Theme list used {stats.count} queries and tracked tagging")
+
+
+if __name__ == "__main__":
+    print("🧪 Running query budget tests...\n")
+    print("=" * 60)
+
+    try:
+        reader_token, author_token, chapter_ids = setup_reader_and_author()
+        test_get_chapter_budget(reader_token, chapter_ids[0])
+        test_get_chapter_cached(reader_token, author_token, chapter_ids[1])
+        test_feed_budget(reader_token)
+        test_theme_catalog(reader_token, author_token, chapter_ids[2])
+        test_search_cache(reader_token)
+        test_publish_statement_count_is_fixed(reader_token)
+
+        print("\n" + "=" * 60)
+        print("🎉 All tests passed!")
+
+        print("\n🧹 Cleaning up test data...")
+        cleanup_test_data()
+        print("✅ Cleanup complete!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        cleanup_test_data()
+
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        cleanup_test_data()
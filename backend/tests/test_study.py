@@ -146,6 +146,201 @@ def test_update_draft(token: str, draft_id: int):
     print("✅ Draft updated successfully!")
 
 
+def test_update_draft_blocks_minimal_writes(token: str, draft_id: int):
+    """Saving blocks rewrites only what changed and keeps block ids"""
+    print("\n🧪 Testing draft block reconciliation...")
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    blocks = client.get(f"/study/drafts/{draft_id}", headers=headers).json()["blocks"]
+    payload = [
+        {"position": b["position"], "block_type": b["block_type"], "content": b["content"]}
+        for b in blocks
+    ]
+    
+    # Unchanged save touches nothing
+    response = client.patch(f"/study/drafts/{draft_id}", json={"blocks": payload}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Blocks-Touched"] == f"inserted=0, updated=0, deleted=0, unchanged={len(blocks)}"
+    assert [b["id"] for b in response.json()["blocks"]] == [b["id"] for b in blocks]
+    
+    # Editing one block and appending another writes two rows
+    payload[0]["content"] = {"text": "A rewritten opening line"}
+    payload.append({"position": len(payload), "block_type": "text", "content": {"text": "A new ending"}})
+    response = client.patch(f"/study/drafts/{draft_id}", json={"blocks": payload}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Blocks-Touched"].startswith("inserted=1, updated=1, deleted=0")
+    assert response.json()["blocks"][0]["id"] == blocks[0]["id"]
+    
+    print("✅ Only changed blocks were written!")
+
+
+def test_draft_ops_autosave(token: str, draft_id: int):
+    """Delta autosave applies ops against a revision and rejects stale ones"""
+    print("\n🧪 Testing delta autosave...")
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    draft = client.get(f"/study/drafts/{draft_id}", headers=headers).json()
+    revision = draft["revision"]
+    first, second = draft["blocks"][0], draft["blocks"][1]
+    text = first["content"]["text"]
+    
+    response = client.post(
+        f"/study/drafts/{draft_id}/ops",
+        json={
+            "base_revision": revision,
+            "ops": [
+                {"op": "set_field", "field": "mood", "value": "restless"},
+                {"op": "replace_text", "block_id": first["id"], "start": 0, "end": 1, "text": "An"},
+                {"op": "move_block", "block_id": second["id"], "position": 0},
+                {"op": "insert_block", "position": 1, "block_type": "text", "content": {"text": "Inserted"}},
+            ]
+        },
+        headers=headers
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["revision"] == revision + 1
+    assert len(result["inserted_block_ids"]) == 1
+    
+    draft = client.get(f"/study/drafts/{draft_id}", headers=headers).json()
+    assert draft["mood"] == "restless"
+    assert [b["id"] for b in draft["blocks"][:3]] == [second["id"], result["inserted_block_ids"][0], first["id"]]
+    assert [b["position"] for b in draft["blocks"]] == list(range(len(draft["blocks"])))
+    assert draft["blocks"][2]["content"]["text"] == "An" + text[1:]
+    
+    # A second editor still on the old revision conflicts
+    response = client.post(
+        f"/study/drafts/{draft_id}/ops",
+        json={"base_revision": revision, "ops": [{"op": "delete_block", "block_id": first["id"]}]},
+        headers=headers
+    )
+    assert response.status_code == 409
+    assert response.headers["X-Draft-Revision"] == str(revision + 1)
+    
+    # Ops get the same content and length checks as a full save
+    for op in (
+        {"op": "set_block_content", "block_id": first["id"], "content": {"url": "https://example.com/a.jpg"}},
+        {"op": "insert_block", "position": 0, "block_type": "audio", "content": {"url": "https://example.com/a.mp3"}},
+        {"op": "set_field", "field": "mood", "value": "x" * 51},
+    ):
+        response = client.post(
+            f"/study/drafts/{draft_id}/ops",
+            json={"base_revision": revision + 1, "ops": [op]},
+            headers=headers
+        )
+        assert response.status_code == 422, f"{op['op']}: {response.status_code}"
+    
+    print("✅ Delta autosave applied and stale revision rejected!")
+
+
+def test_draft_ops_sparse_positions(token: str):
+    """Ops on a draft saved with gaps in its positions move blocks as shown"""
+    print("\n🧪 Testing delta autosave over sparse positions...")
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    response = client.post("/study/drafts", json={
+        "title": "Sparse Draft",
+        "blocks": [
+            {"position": position, "block_type": "text", "content": {"text": f"At {position}"}}
+            for position in (0, 5, 10)
+        ]
+    }, headers=headers)
+    assert response.status_code == 201
+    draft = response.json()
+    first, second, third = [b["id"] for b in draft["blocks"]]
+    
+    response = client.post(
+        f"/study/drafts/{draft['id']}/ops",
+        json={"base_revision": draft["revision"], "ops": [{"op": "move_block", "block_id": first, "position": 2}]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    
+    draft = client.get(f"/study/drafts/{draft['id']}", headers=headers).json()
+    assert [b["id"] for b in draft["blocks"]] == [second, third, first]
+    assert [b["position"] for b in draft["blocks"]] == [0, 1, 2]
+    
+    client.delete(f"/study/drafts/{draft['id']}", headers=headers)
+    print("✅ Sparse positions renumbered before applying ops!")
+
+
+def test_draft_history(token: str, draft_id: int):
+    """Every save is recorded and earlier revisions can be rebuilt and restored"""
+    print("\n🧪 Testing draft revision history...")
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    current = client.get(f"/study/drafts/{draft_id}", headers=headers).json()
+    revisions = client.get(f"/study/drafts/{draft_id}/revisions", headers=headers).json()
+    assert [r["revision"] for r in revisions] == list(range(current["revision"], -1, -1))
+    assert revisions[-1]["is_snapshot"]
+    
+    # Revision 1 is the metadata-only update, so it still has the original blocks
+    original = client.get(f"/study/drafts/{draft_id}/revisions/0", headers=headers).json()
+    first_update = client.get(f"/study/drafts/{draft_id}/revisions/1", headers=headers).json()
+    assert first_update["title"] == "Updated Draft Title"
+    assert first_update["blocks"] == original["blocks"]
+    
+    latest = client.get(f"/study/drafts/{draft_id}/revisions/{current['revision']}", headers=headers).json()
+    assert [b["id"] for b in latest["blocks"]] == [b["id"] for b in current["blocks"]]
+    assert latest["mood"] == current["mood"]
+    
+    # Restoring is a new revision
+    response = client.post(f"/study/drafts/{draft_id}/revisions/1/restore", headers=headers)
+    assert response.status_code == 200
+    restored = response.json()
+    assert restored["revision"] == current["revision"] + 1
+    assert [b["content"] for b in restored["blocks"]] == [b["content"] for b in original["blocks"]]
+    
+    assert client.get(f"/study/drafts/{draft_id}/revisions/999", headers=headers).status_code == 404
+    
+    print("✅ Revisions rebuilt and restored!")
+
+
+def test_concurrent_full_saves_history(token: str, draft_id: int):
+    """Concurrent full saves each record a revision that rebuilds to what was saved"""
+    print("\n🧪 Testing concurrent draft saves...")
+    
+    import threading
+    
+    headers = {"Authorization": f"Bearer {token}"}
+    start = client.get(f"/study/drafts/{draft_id}", headers=headers).json()
+    payload = [
+        {"position": b["position"], "block_type": b["block_type"], "content": b["content"]}
+        for b in start["blocks"]
+    ]
+    
+    saved, errors = {}, []
+    
+    def save(i: int):
+        try:
+            blocks = payload + [{"position": len(payload), "block_type": "text", "content": {"text": f"Ending {i}"}}]
+            response = client.patch(
+                f"/study/drafts/{draft_id}",
+                json={"title": f"Concurrent {i}", "blocks": blocks},
+                headers=headers
+            )
+            assert response.status_code == 200
+            draft = response.json()
+            saved[draft["revision"]] = draft
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    assert sorted(saved) == list(range(start["revision"] + 1, start["revision"] + 5))
+    
+    for revision, draft in saved.items():
+        rebuilt = client.get(f"/study/drafts/{draft_id}/revisions/{revision}", headers=headers).json()
+        assert rebuilt["title"] == draft["title"], revision
+        assert [b["content"] for b in rebuilt["blocks"]] == [b["content"] for b in draft["blocks"]], revision
+    
+    print("✅ Every concurrent save rebuilt correctly!")
+
+
 def test_create_note(token: str):
     """Test creating a note"""
     print("\n🧪 Testing note creation...")
@@ -276,6 +471,30 @@ def test_promote_draft(token: str, draft_id: int):
     return chapter["id"]
 
 
+def test_promote_empty_draft(token: str):
+    """Test promoting a draft with no blocks yet"""
+    print("\n🧪 Testing empty draft promotion...")
+    
+    response = client.post(
+        "/study/drafts",
+        json={"title": "Just a Title"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    draft_id = response.json()["id"]
+    
+    response = client.post(
+        f"/study/drafts/{draft_id}/promote",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201, f"Expected 201, got {response.status_code}: {response.text}"
+    chapter = response.json()
+    assert chapter["title"] == "Just a Title"
+    assert chapter["blocks"] == []
+    
+    print("✅ Empty draft promoted!")
+
+
 def test_draft_still_exists(token: str, draft_id: int):
     """Test that original draft still exists after promotion"""
     print("\n🧪 Testing draft persistence after promotion...")
@@ -347,12 +566,18 @@ if __name__ == "__main__":
         test_list_drafts(token)
         test_get_draft(token, draft_id)
         test_update_draft(token, draft_id)
+        test_update_draft_blocks_minimal_writes(token, draft_id)
+        test_draft_ops_autosave(token, draft_id)
+        test_draft_ops_sparse_positions(token)
+        test_draft_history(token, draft_id)
+        test_concurrent_full_saves_history(token, draft_id)
         note_id = test_create_note(token)
         test_list_notes(token)
         test_list_notes_by_tag(token)
         test_update_note(token, note_id)
         chapter_id = test_promote_draft(token, draft_id)
         test_draft_still_exists(token, draft_id)
+        test_promote_empty_draft(token)
         test_delete_note(token, note_id)
         test_delete_draft(token, draft_id)
         
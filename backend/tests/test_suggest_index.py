@@ -0,0 +1,121 @@
+"""Test the in-memory prefix index behind /search/suggest"""
+import sys
+import os
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(backend_dir)
+sys.path.insert(0, backend_dir)
+
+from app.services.suggest_index import PrefixIndex, MAX_LIMIT
+
+TERMS = [
+    ("The Long Goodbye", "title", 5),
+    ("Goodnight Moon", "title", 2),
+    ("Good Omens", "title", 9),
+    ("gold", "mood", 1),
+    ("Grief", "theme", 4),
+    ("Going Home", "title", 3),
+]
+
+
+def texts(results: list[dict]) -> list[str]:
+    return [result["text"] for result in results]
+
+
+def test_short_prefix_top_k():
+    """Test prefixes of up to three characters return the most used completions"""
+    print("\n🧪 Testing short-prefix completions...")
+
+    index = PrefixIndex(TERMS)
+    assert texts(index.search("g", 3)) == ["Good Omens", "The Long Goodbye", "Grief"]
+    assert texts(index.search("goo", 10)) == ["Good Omens", "The Long Goodbye", "Goodnight Moon"]
+    assert index.search("Go", 1)[0] == {"text": "Good Omens", "kind": "title", "count": 9}
+    assert index.search("", 5) == []
+    assert index.search("x", 5) == []
+
+    # More terms than a precomputed list holds still yields the top ones
+    many = PrefixIndex([(f"Gallery {i}", "title", i) for i in range(MAX_LIMIT * 3)])
+    assert texts(many.search("ga", 2)) == [f"Gallery {MAX_LIMIT * 3 - 1}", f"Gallery {MAX_LIMIT * 3 - 2}"]
+
+    print("✅ Short prefixes use the precomputed top completions")
+
+
+def test_mid_title_word_start():
+    """Test a title is found from a later word"""
+    print("\n🧪 Testing completion from a mid-title word...")
+
+    index = PrefixIndex(TERMS)
+    assert texts(index.search("goodbye", 5)) == ["The Long Goodbye"]
+    assert texts(index.search("long good", 5)) == ["The Long Goodbye"]
+    assert texts(index.search("GOODB!", 5)) == ["The Long Goodbye"]  # Case and punctuation ignored
+    assert index.search("moon", 5) == [{"text": "Goodnight Moon", "kind": "title", "count": 2}]
+
+    # Only titles are indexed from each word
+    index = PrefixIndex([("Quiet Grief", "theme", 1)])
+    assert index.search("grief", 5) == []
+
+    print("✅ Titles complete from any word")
+
+
+def test_add_updates_top_lists():
+    """Test add() counts new uses in both the key range and the precomputed lists"""
+    print("\n🧪 Testing incremental adds...")
+
+    index = PrefixIndex(TERMS)
+    for _ in range(10):
+        index.add("Grief", "theme")
+    assert index.search("g", 1) == [{"text": "Grief", "kind": "theme", "count": 14}]
+    assert texts(index.search("gr", 5)) == ["Grief"]
+
+    index.add("Gardens at Dusk", "title")
+    assert texts(index.search("gar", 5)) == ["Gardens at Dusk"]
+    assert texts(index.search("dusk", 5)) == ["Gardens at Dusk"]
+    assert texts(index.search("gardens a", 5)) == ["Gardens at Dusk"]
+    assert len(index) == len(PrefixIndex(TERMS)) + 3  # One key per title word
+
+    print("✅ Adds show up in short and long prefix searches")
+
+
+def test_dedup_by_kind_and_text():
+    """Test each (kind, text) is suggested once, and the same text of another kind separately"""
+    print("\n🧪 Testing suggestion dedup...")
+
+    index = PrefixIndex([
+        ("Home Home", "title", 3),  # Indexed from both words, matches "home" twice
+        ("Home", "theme", 2),
+        ("Home", "mood", 1),
+    ])
+    assert index.search("hom", 10) == [
+        {"text": "Home Home", "kind": "title", "count": 3},
+        {"text": "Home", "kind": "theme", "count": 2},
+        {"text": "Home", "kind": "mood", "count": 1},
+    ]
+    assert [(r["kind"], r["text"]) for r in index.search("home", 10)] == [
+        ("title", "Home Home"), ("theme", "Home"), ("mood", "Home")
+    ]
+
+    # Repeated terms are merged into one weighted key
+    index = PrefixIndex([("Rain", "mood", 2), ("Rain", "mood", 3)])
+    assert index.search("rain", 5) == [{"text": "Rain", "kind": "mood", "count": 5}]
+
+    print("✅ One suggestion per kind and text")
+
+
+if __name__ == "__main__":
+    print("🧪 Running suggest index tests...\n")
+    print("=" * 60)
+
+    try:
+        test_short_prefix_top_k()
+        test_mid_title_word_start()
+        test_add_updates_top_lists()
+        test_dedup_by_kind_and_text()
+
+        print("\n" + "=" * 60)
+        print("🎉 All tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
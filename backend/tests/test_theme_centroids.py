@@ -0,0 +1,185 @@
+"""Test Muse theme centroids: incremental tag/untag updates and suggestions"""
+import sys
+import os
+from datetime import datetime, timezone, timedelta
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(backend_dir)
+sys.path.insert(0, backend_dir)
+
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import User, Chapter, ChapterEmbedding, Theme, ThemeCentroid, chapter_themes
+from app.muse.theme_centroids import (
+    chapter_tagged, chapter_untagged, refresh_theme_centroids, suggest_themes
+)
+
+rng = np.random.default_rng(42)
+
+
+def random_vector() -> np.ndarray:
+    return rng.standard_normal(1536).astype(np.float32)
+
+
+def cleanup_test_data():
+    """Clean up test data"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "centroids@example.com").first()
+        if user:
+            db.delete(user)
+        db.query(Theme).filter(Theme.slug.in_(["centroid-seeded", "centroid-plain"])).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def setup_chapters(db, count: int) -> list[tuple[int, np.ndarray]]:
+    """A user with `count` embedded chapters, as (chapter_id, embedding)"""
+    user = User(email="centroids@example.com", username="centroids", password_hash="hashed_password")
+    db.add(user)
+    db.flush()
+
+    chapters = []
+    for i in range(count):
+        chapter = Chapter(
+            author_id=user.id,
+            title=f"Centroid Chapter {i}",
+            edit_window_expires=datetime.now(timezone.utc) + timedelta(minutes=30)
+        )
+        db.add(chapter)
+        db.flush()
+        vector = random_vector()
+        db.add(ChapterEmbedding(chapter_id=chapter.id, embedding=vector))
+        chapters.append((chapter.id, vector))
+    db.commit()
+    return chapters
+
+
+def stored_centroid(db, theme_id: int) -> tuple[np.ndarray, int]:
+    db.expire_all()
+    centroid = db.query(ThemeCentroid).filter(ThemeCentroid.theme_id == theme_id).one()
+    return np.asarray(centroid.centroid, dtype=np.float32), centroid.chapter_count
+
+
+def tag(db, theme_id: int, chapter_id: int):
+    db.execute(chapter_themes.insert().values(chapter_id=chapter_id, theme_id=theme_id))
+    chapter_tagged(db, theme_id, chapter_id)
+    db.commit()
+
+
+def untag(db, theme_id: int, chapter_id: int):
+    db.execute(chapter_themes.delete().where(
+        chapter_themes.c.chapter_id == chapter_id, chapter_themes.c.theme_id == theme_id
+    ))
+    chapter_untagged(db, theme_id, chapter_id)
+    db.commit()
+
+
+def test_tag_untag_round_trip():
+    """Test incremental tag/untag updates match a full recompute"""
+    print("\n🧪 Testing centroid tag/untag round trip...")
+
+    db = SessionLocal()
+    try:
+        chapters = setup_chapters(db, 4)
+        seed = random_vector()
+        seeded = Theme(name="Centroid Seeded", slug="centroid-seeded")
+        plain = Theme(name="Centroid Plain", slug="centroid-plain")
+        db.add_all([seeded, plain])
+        db.flush()
+        db.add(ThemeCentroid(theme_id=seeded.id, seed=seed, centroid=seed, chapter_count=0))
+        db.commit()
+
+        # First tag of a theme without a centroid inserts the chapter's embedding
+        tag(db, plain.id, chapters[0][0])
+        centroid, count = stored_centroid(db, plain.id)
+        assert count == 1
+        assert np.allclose(centroid, chapters[0][1], atol=1e-5)
+
+        # Tags fold in with the seed counted once, untags take them back out
+        for chapter_id, _ in chapters:
+            tag(db, seeded.id, chapter_id)
+        untag(db, seeded.id, chapters[1][0])
+        tag(db, plain.id, chapters[2][0])
+
+        expected = np.mean([seed] + [vector for i, (_, vector) in enumerate(chapters) if i != 1], axis=0)
+        incremental, count = stored_centroid(db, seeded.id)
+        assert count == 3
+        assert np.allclose(incremental, expected, atol=1e-4)
+
+        plain_incremental, _ = stored_centroid(db, plain.id)
+        assert np.allclose(plain_incremental, (chapters[0][1] + chapters[2][1]) / 2, atol=1e-4)
+
+        refresh_theme_centroids(db)
+        for theme_id, before in ((seeded.id, incremental), (plain.id, plain_incremental)):
+            recomputed, _ = stored_centroid(db, theme_id)
+            assert np.allclose(before, recomputed, atol=1e-4), theme_id
+
+        # Untagging the last chapter of a theme without a seed removes its centroid
+        untag(db, plain.id, chapters[0][0])
+        untag(db, plain.id, chapters[2][0])
+        db.expire_all()
+        assert db.query(ThemeCentroid).filter(ThemeCentroid.theme_id == plain.id).first() is None
+
+        print("✅ Incremental centroids match the full recompute!")
+        return seeded.id
+    finally:
+        db.close()
+
+
+def test_suggest_themes(theme_id: int):
+    """Test suggestions respect the score threshold and exclusions"""
+    print("\n🧪 Testing theme suggestions...")
+
+    db = SessionLocal()
+    try:
+        refresh_theme_centroids(db)  # Bumps the version, so the matrix reloads
+        centroid, _ = stored_centroid(db, theme_id)
+
+        suggestions = suggest_themes(db, centroid, limit=50)
+        assert suggestions[0] == (theme_id, 1.0)
+        assert all(score >= settings.theme_suggestion_min_score for _, score in suggestions)
+        assert [score for _, score in suggestions] == sorted((score for _, score in suggestions), reverse=True)
+
+        excluded = suggest_themes(db, centroid, exclude_theme_ids=[theme_id], limit=50)
+        assert theme_id not in [suggested for suggested, _ in excluded]
+
+        # Pointing away from every centroid leaves nothing above the threshold for it
+        opposite = suggest_themes(db, -centroid, limit=50)
+        assert theme_id not in [suggested for suggested, _ in opposite]
+
+        print(f"✅ {len(suggestions)} suggestion(s) above {settings.theme_suggestion_min_score}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Running theme centroid tests...\n")
+    print("=" * 60)
+
+    try:
+        cleanup_test_data()
+        theme_id = test_tag_untag_round_trip()
+        test_suggest_themes(theme_id)
+
+        print("\n" + "=" * 60)
+        print("🎉 All tests passed!")
+
+        print("\n🧹 Cleaning up test data...")
+        cleanup_test_data()
+        print("✅ Cleanup complete!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        cleanup_test_data()
+
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        cleanup_test_data()